@@ -0,0 +1,230 @@
+"""
+Breadth-first crawl of the match graph: summoners -> their recent games -> the fellow players of those games.
+"""
+
+import base64
+from collections import deque
+import fcntl
+import gzip
+import hashlib
+import json
+import math
+import time
+import zlib
+
+from lol_stats.base import CRAWLER_CHECKPOINT
+from api.models import Summoner
+from api.utils import riot_api, get_recent_matches, _write_atomic
+
+# Most API calls a visit can make, see get_recent_matches().
+VISIT_REQUESTS = 4
+
+
+class BloomFilter:
+    """
+    Set of strings that may report false positives (at about `error_rate` up to `capacity` items),
+    but never false negatives, in a fixed amount of memory (about 1.8 MB per million items at 0.1%).
+    """
+    def __init__(self, capacity=2000000, error_rate=0.001, bits=None, hashes=None, data=None):
+        self.bits = bits or int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, int(round(self.bits / capacity * math.log(2))))
+        self.data = bytearray(data) if data is not None else bytearray((self.bits + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, item):
+        """Adds `item`, returns False if it was (probably) already there."""
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.data[position >> 3] & mask:
+                self.data[position >> 3] |= mask
+                added = True
+        return added
+
+    def __contains__(self, item):
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class MatchCrawler:
+    """
+    Grows the match corpus by visiting summoners breadth-first, seeded from the summoners in the DB.
+
+    Visiting a summoner stores their recent games (get_recent_matches()) and queues their fellow players.
+    Each region has its own frontier (a FIFO of summoner IDs, at most `max_frontier` long; summoners found
+    while it is full are left for a later seed()). A summoner is queued at most once at a time, and not again
+    once visited. Visited summoners are tracked by a BloomFilter, so a few in a hundred thousand are skipped
+    as false positives; a summoner is only added to it once their games are stored, so one whose visit
+    failed can be queued again.
+
+    Regions are visited in turn, skipping regions without room for a whole visit (VISIT_REQUESTS calls) in
+    the lane's share of the rate limit at the moment, so one region being throttled doesn't hold up the others.
+    A visit that fails is counted in stats['errors'] and the crawl moves on. `budgets` caps the number of
+    summoners visited per region in each run() (all regions, if it has a None key).
+
+    The frontiers and visited set are saved to `checkpoint` every `checkpoint_every` visits and when a run
+    ends, however it ends, and loaded back by the first run() of the next crawler, so a crawl survives
+    restarts. A checkpoint that can't be read is ignored (the crawl starts over). A summoner leaves its
+    frontier once its visit is over. Only one crawler can use a checkpoint at a time: run() takes a lock
+    on it before loading it.
+
+    Requests go through riot_api's background lane, so user searches are served first.
+    """
+    def __init__(self, checkpoint=CRAWLER_CHECKPOINT, budgets=None, max_frontier=100000, checkpoint_every=50,
+                 capacity=2000000, error_rate=0.001):
+        self.checkpoint = checkpoint
+        self.budgets = budgets or {}
+        self.max_frontier = max_frontier
+        self.checkpoint_every = checkpoint_every
+        self.frontiers = {}
+        self.stats = {'visited': 0, 'queued': 0, 'dropped': 0, 'errors': 0}
+        self.visited = BloomFilter(capacity, error_rate)
+        # Summoner IDs in each frontier.
+        self._queued = {}
+        self._loaded = False
+        self._lock_file = None
+
+    def _load(self):
+        """Restore the state saved to the checkpoint, if there is a readable one."""
+        try:
+            with gzip.open(self.checkpoint, 'rt', encoding='utf-8') as f:
+                state = json.load(f)
+            bloom = state['visited']
+            visited = BloomFilter(bits=bloom['bits'], hashes=bloom['hashes'], data=base64.b64decode(bloom['data']))
+            frontiers = dict((region, deque(ids)) for region, ids in state['frontiers'].items())
+            stats = dict(state['stats'])
+        except FileNotFoundError:
+            return
+        except (OSError, EOFError, zlib.error, ValueError, KeyError, TypeError) as e:
+            print('WARNING ignoring unreadable crawler checkpoint {}: {!r}'.format(self.checkpoint, e))
+            return
+        self.visited = visited
+        self.frontiers = frontiers
+        self._queued = dict((region, set(ids)) for region, ids in frontiers.items())
+        self.stats.update(stats)
+
+    def save(self):
+        """Write the frontiers and visited set to the checkpoint file."""
+        state = {
+            'frontiers': dict((region, list(ids)) for region, ids in self.frontiers.items()),
+            'visited': {'bits': self.visited.bits, 'hashes': self.visited.hashes,
+                        'data': base64.b64encode(bytes(self.visited.data)).decode('ascii')},
+            'stats': self.stats,
+        }
+        _write_atomic(self.checkpoint, gzip.compress(json.dumps(state).encode('utf-8')))
+
+    def enqueue(self, region, summoner_id):
+        """Queue a summoner to visit, unless it is queued or was visited, or its region's frontier is full."""
+        frontier = self.frontiers.setdefault(region, deque())
+        queued = self._queued.setdefault(region, set())
+        if summoner_id in queued or '{}:{}'.format(region, summoner_id) in self.visited:
+            return False
+        if len(frontier) >= self.max_frontier:
+            self.stats['dropped'] += 1
+            return False
+        frontier.append(summoner_id)
+        queued.add(summoner_id)
+        self.stats['queued'] += 1
+        return True
+
+    def seed(self, regions=None, limit=None):
+        """
+        Queue summoners from the DB that aren't queued and weren't visited yet, most recently updated first.
+        Returns the number of summoners queued.
+        """
+        summoners = Summoner.objects.order_by('-last_update')
+        if regions is not None:
+            summoners = summoners.filter(region__in=list(regions))
+
+        queued = 0
+        for region, summoner_id in summoners.values_list('region', 'summoner_id').iterator():
+            if self.enqueue(region, summoner_id):
+                queued += 1
+                if limit is not None and queued >= limit:
+                    break
+        return queued
+
+    def visit(self, region, summoner_id):
+        """Store a summoner's recent games and queue their fellow players."""
+        try:
+            fellow_players = get_recent_matches(summoner_id, region)
+        except Exception as e:
+            print('ERROR crawling summoner {} ({}): {}'.format(summoner_id, region, e))
+            self.stats['errors'] += 1
+            return
+        self.visited.add('{}:{}'.format(region, summoner_id))
+        for fellow_id in fellow_players or ():
+            self.enqueue(region, fellow_id)
+        self.stats['visited'] += 1
+
+    def run(self, max_visits=None, max_seconds=None):
+        """
+        Visit summoners until the frontiers are empty, a budget (see `budgets`), `max_visits`
+        or `max_seconds` runs out. Seeds from the DB first if there is nothing to visit.
+        Returns the number of summoners visited.
+        """
+        self._lock()
+        try:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            if not any(self.frontiers.values()):
+                print('Seeded crawler with {} summoners'.format(self.seed()))
+
+            deadline = time.time() + max_seconds if max_seconds is not None else None
+            default_budget = self.budgets.get(None, float('inf'))
+            spent = {}
+            visits = 0
+            while max_visits is None or visits < max_visits:
+                if deadline is not None and time.time() >= deadline:
+                    break
+                regions = [region for region, frontier in self.frontiers.items()
+                           if frontier and spent.get(region, 0) < self.budgets.get(region, default_budget)]
+                if not regions:
+                    break
+
+                ready = [region for region in regions
+                         if riot_api.can_make_request(region=region, requests=VISIT_REQUESTS)]
+                if not ready:
+                    time.sleep(0.1)
+                    continue
+
+                for region in ready:
+                    frontier = self.frontiers[region]
+                    self.visit(region, frontier[0])
+                    self._queued[region].discard(frontier.popleft())
+                    spent[region] = spent.get(region, 0) + 1
+                    visits += 1
+                    if visits % self.checkpoint_every == 0:
+                        self.save()
+                    if max_visits is not None and visits >= max_visits:
+                        break
+
+            print('Crawled {} summoners: {} ({} queued)'.format(
+                visits, self.stats, sum(len(frontier) for frontier in self.frontiers.values())))
+            return visits
+        finally:
+            try:
+                # Unless the checkpoint was never loaded, which would lose it.
+                if self._loaded:
+                    self.save()
+            finally:
+                self._unlock()
+
+    def _lock(self):
+        self._lock_file = open(self.checkpoint + '.lock', 'w')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError('Another crawler is using {}'.format(self.checkpoint))
+
+    def _unlock(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
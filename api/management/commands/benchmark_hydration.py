@@ -0,0 +1,47 @@
+"""
+Benchmark of building RawStat and AggregatedStat objects from Riot API DTOs.
+
+Usage: python manage.py benchmark_hydration [iterations]
+"""
+
+import timeit
+
+import inflection
+from django.core.management.base import BaseCommand
+
+from api.mappers import raw_stat_mapper, aggregated_stat_mapper
+from api.models import RawStat, AggregatedStat
+
+
+def sample_dto(mapper):
+    """A DTO with a value for every field of the mapper's model, plus a key the model doesn't have."""
+    dto = dict((key, i) for i, key in enumerate(mapper._keys))
+    dto['notAField'] = True
+    return dto
+
+
+def setattr_underscore(model, dto):
+    """How stats were built before FieldMapper: one inflection.underscore() per key."""
+    obj = model()
+    for i in dto:
+        setattr(obj, inflection.underscore(i), dto[i])
+    return obj
+
+
+class Command(BaseCommand):
+    help = 'Compares building stat objects from DTOs with inflection.underscore() and with FieldMapper.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('iterations', nargs='?', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        for model, mapper in ((RawStat, raw_stat_mapper), (AggregatedStat, aggregated_stat_mapper)):
+            dto = sample_dto(mapper)
+            self.stdout.write('{} ({} DTO keys), microseconds per object:'.format(model.__name__, len(dto)))
+            for name, build in (('setattr + underscore', lambda: setattr_underscore(model, dto)),
+                                ('FieldMapper.build', lambda: mapper.build(dto)),
+                                ('FieldMapper.row', lambda: mapper.row(dto))):
+                seconds = min(timeit.repeat(build, number=iterations, repeat=3))
+                self.stdout.write('    {:<22}{:>10.1f}'.format(name, seconds / iterations * 1e6))
@@ -0,0 +1,20 @@
+"""
+Crawl the match graph from known summoners, see api.crawler.MatchCrawler.
+
+Usage: python manage.py crawl_matches [max_visits] [max_seconds]
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.crawler import MatchCrawler
+
+
+class Command(BaseCommand):
+    help = 'Crawls recent games of summoners breadth-first, resuming from the last checkpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('max_visits', nargs='?', type=int)
+        parser.add_argument('max_seconds', nargs='?', type=float)
+
+    def handle(self, *args, **options):
+        MatchCrawler().run(max_visits=options['max_visits'], max_seconds=options['max_seconds'])
@@ -0,0 +1,66 @@
+"""
+Mapping of Riot API DTOs (camelCase keys) onto model fields (snake_case), for stat models with many fields.
+"""
+
+import inflection
+
+from api.models import RawStat, AggregatedStat
+
+
+class FieldMapper:
+    """
+    Builds `model` rows from DTO dicts whose keys are the camelCase names of its fields.
+
+    The key of each field is worked out once, when the mapper is created, instead of running
+    inflection.underscore() on every key of every DTO. Keys that aren't fields of the model are dropped.
+
+    row() returns a tuple of values in the order of `field_names` (the model's concrete fields, primary key first),
+    which can be inserted as-is or passed to the model, whose __init__ takes positional values in that order.
+    """
+    def __init__(self, model):
+        self.model = model
+        fields = model._meta.concrete_fields
+        self.field_names = tuple(f.attname for f in fields)
+        self._defaults = tuple(f.get_default() for f in fields)
+        self._index = dict((name, i) for i, name in enumerate(self.field_names))
+        # DTO key -> position in a row (None for unknown keys).
+        # Relations and the primary key are never part of a DTO.
+        self._positions = dict((f.name, i) for i, f in enumerate(fields) if not f.primary_key and not f.is_relation)
+        self._keys = dict((inflection.camelize(name, False), i) for name, i in self._positions.items())
+
+    def _position(self, key):
+        # A key spelled differently than camelize() would, mapped the way it used to be (once per key).
+        position = self._positions.get(inflection.underscore(key))
+        self._keys[key] = position
+        return position
+
+    def row(self, dto, **extra):
+        """
+        Values of a row for `dto`, plus `extra` values given by field attname (ex. player_stats_id=...).
+        """
+        row = list(self._defaults)
+        keys = self._keys
+        for key, value in dto.items():
+            i = keys[key] if key in keys else self._position(key)
+            if i is not None:
+                row[i] = value
+        for name, value in extra.items():
+            row[self._index[name]] = value
+        return tuple(row)
+
+    def values(self, dto, **extra):
+        """
+        Field values for `dto` by attname, without the primary key (ex. for an UPDATE of an existing row).
+        Fields `dto` doesn't have get their defaults, like in row().
+        """
+        values = dict(zip(self.field_names, self.row(dto, **extra)))
+        del values[self.model._meta.pk.attname]
+        return values
+
+    def build(self, dto, **extra):
+        """An unsaved `model` instance for `dto`, see row()."""
+        return self.model(*self.row(dto, **extra))
+
+
+raw_stat_mapper = FieldMapper(RawStat)
+aggregated_stat_mapper = FieldMapper(AggregatedStat)
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 09:50
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AggregatedStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('average_assists', models.IntegerField(blank=True, null=True)),
+                ('average_champions_killed', models.IntegerField(blank=True, null=True)),
+                ('average_combat_player_score', models.IntegerField(blank=True, null=True)),
+                ('average_node_capture', models.IntegerField(blank=True, null=True)),
+                ('average_node_capture_assist', models.IntegerField(blank=True, null=True)),
+                ('average_node_neutralize', models.IntegerField(blank=True, null=True)),
+                ('average_node_neutralize_assist', models.IntegerField(blank=True, null=True)),
+                ('average_num_deaths', models.IntegerField(blank=True, null=True)),
+                ('average_objective_player_score', models.IntegerField(blank=True, null=True)),
+                ('average_team_objective', models.IntegerField(blank=True, null=True)),
+                ('average_total_player_score', models.IntegerField(blank=True, null=True)),
+                ('bot_games_played', models.IntegerField(blank=True, null=True)),
+                ('killing_spree', models.IntegerField(blank=True, null=True)),
+                ('max_assists', models.IntegerField(blank=True, null=True)),
+                ('max_champions_killed', models.IntegerField(blank=True, null=True)),
+                ('max_combat_player_score', models.IntegerField(blank=True, null=True)),
+                ('max_largest_critical_strike', models.IntegerField(blank=True, null=True)),
+                ('max_largest_killing_spree', models.IntegerField(blank=True, null=True)),
+                ('max_node_capture', models.IntegerField(blank=True, null=True)),
+                ('max_node_capture_assist', models.IntegerField(blank=True, null=True)),
+                ('max_node_neutralize', models.IntegerField(blank=True, null=True)),
+                ('max_node_neutralize_assist', models.IntegerField(blank=True, null=True)),
+                ('max_num_deaths', models.IntegerField(blank=True, null=True)),
+                ('max_objective_player_score', models.IntegerField(blank=True, null=True)),
+                ('max_team_objective', models.IntegerField(blank=True, null=True)),
+                ('max_time_played', models.IntegerField(blank=True, null=True)),
+                ('max_time_spent_living', models.IntegerField(blank=True, null=True)),
+                ('max_total_player_score', models.IntegerField(blank=True, null=True)),
+                ('most_champion_kills_per_session', models.IntegerField(blank=True, null=True)),
+                ('most_spells_cast', models.IntegerField(blank=True, null=True)),
+                ('normal_games_played', models.IntegerField(blank=True, null=True)),
+                ('ranked_premade_games_played', models.IntegerField(blank=True, null=True)),
+                ('ranked_solo_games_played', models.IntegerField(blank=True, null=True)),
+                ('total_assists', models.IntegerField(blank=True, null=True)),
+                ('total_champion_kills', models.IntegerField(blank=True, null=True)),
+                ('total_damage_dealt', models.IntegerField(blank=True, null=True)),
+                ('total_damage_taken', models.IntegerField(blank=True, null=True)),
+                ('total_deaths_per_session', models.IntegerField(blank=True, null=True)),
+                ('total_double_kills', models.IntegerField(blank=True, null=True)),
+                ('total_first_blood', models.IntegerField(blank=True, null=True)),
+                ('total_gold_earned', models.IntegerField(blank=True, null=True)),
+                ('total_heal', models.IntegerField(blank=True, null=True)),
+                ('total_magic_damage_dealt', models.IntegerField(blank=True, null=True)),
+                ('total_minion_kills', models.IntegerField(blank=True, null=True)),
+                ('total_neutral_minions_killed', models.IntegerField(blank=True, null=True)),
+                ('total_node_capture', models.IntegerField(blank=True, null=True)),
+                ('total_node_neutralize', models.IntegerField(blank=True, null=True)),
+                ('total_penta_kills', models.IntegerField(blank=True, null=True)),
+                ('total_physical_damage_dealt', models.IntegerField(blank=True, null=True)),
+                ('total_quadra_kills', models.IntegerField(blank=True, null=True)),
+                ('total_sessions_lost', models.IntegerField(blank=True, null=True)),
+                ('total_sessions_played', models.IntegerField(blank=True, null=True)),
+                ('total_sessions_won', models.IntegerField(blank=True, null=True)),
+                ('total_triple_kills', models.IntegerField(blank=True, null=True)),
+                ('total_turrets_killed', models.IntegerField(blank=True, null=True)),
+                ('total_unreal_kills', models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Champion',
+            fields=[
+                ('champion_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=32)),
+                ('name', models.CharField(max_length=32)),
+                ('key', models.CharField(max_length=32)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Game',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('create_date', models.BigIntegerField()),
+                ('game_id', models.BigIntegerField()),
+                ('game_mode', models.CharField(max_length=16)),
+                ('game_type', models.CharField(max_length=16)),
+                ('invalid', models.BooleanField()),
+                ('ip_earned', models.IntegerField()),
+                ('level', models.IntegerField()),
+                ('map_id', models.IntegerField()),
+                ('sub_type', models.CharField(max_length=24)),
+                ('team_id', models.IntegerField()),
+                ('region', models.CharField(max_length=4)),
+                ('last_update', models.DateTimeField(auto_now=True)),
+                ('champion_key', models.CharField(max_length=32)),
+                ('champion_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Champion')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Item',
+            fields=[
+                ('item_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('description', models.CharField(max_length=1024)),
+                ('name', models.CharField(max_length=64)),
+                ('plain_text', models.CharField(blank=True, max_length=256, null=True)),
+                ('group', models.CharField(blank=True, max_length=64, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='League',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(max_length=4)),
+                ('queue', models.CharField(max_length=32)),
+                ('name', models.CharField(max_length=32)),
+                ('tier', models.CharField(max_length=12)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LeagueEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('division', models.CharField(max_length=3)),
+                ('is_fresh_blood', models.BooleanField()),
+                ('is_hot_streak', models.BooleanField()),
+                ('is_inactive', models.BooleanField()),
+                ('is_veteran', models.BooleanField()),
+                ('league_points', models.IntegerField()),
+                ('player_or_team_id', models.CharField(max_length=64)),
+                ('player_or_team_name', models.CharField(max_length=24)),
+                ('wins', models.IntegerField()),
+                ('series_losses', models.SmallIntegerField(blank=True, null=True)),
+                ('series_progress', models.CharField(blank=True, max_length=5, null=True)),
+                ('series_target', models.SmallIntegerField(blank=True, null=True)),
+                ('series_wins', models.SmallIntegerField(blank=True, null=True)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.League')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MatchHistorySummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assists', models.IntegerField()),
+                ('date', models.BigIntegerField()),
+                ('deaths', models.IntegerField()),
+                ('game_id', models.BigIntegerField()),
+                ('game_mode', models.CharField(max_length=16)),
+                ('invalid', models.BooleanField()),
+                ('kills', models.IntegerField()),
+                ('map_id', models.IntegerField()),
+                ('opposing_team_kills', models.IntegerField()),
+                ('opposing_team_name', models.CharField(max_length=24)),
+                ('win', models.BooleanField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Player',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_id', models.IntegerField()),
+                ('champion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Champion')),
+                ('participant_of', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Game')),
+            ],
+            options={
+                'ordering': ('team_id',),
+            },
+        ),
+        migrations.CreateModel(
+            name='PlayerStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlayerStatsSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('losses', models.IntegerField(blank=True, null=True)),
+                ('wins', models.IntegerField()),
+                ('modify_date', models.BigIntegerField()),
+                ('player_stat_summary_type', models.CharField(max_length=16)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.PlayerStat')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RawStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assists', models.IntegerField(blank=True, null=True)),
+                ('barracks_killed', models.IntegerField(blank=True, null=True)),
+                ('champions_killed', models.IntegerField(blank=True, null=True)),
+                ('combat_player_score', models.IntegerField(blank=True, null=True)),
+                ('consumables_purchased', models.IntegerField(blank=True, null=True)),
+                ('damage_dealt_player', models.IntegerField(blank=True, null=True)),
+                ('double_kills', models.IntegerField(blank=True, null=True)),
+                ('first_blood', models.IntegerField(blank=True, null=True)),
+                ('gold', models.IntegerField(blank=True, null=True)),
+                ('gold_earned', models.IntegerField(blank=True, null=True)),
+                ('gold_spent', models.IntegerField(blank=True, null=True)),
+                ('item0', models.IntegerField(blank=True, null=True)),
+                ('item1', models.IntegerField(blank=True, null=True)),
+                ('item2', models.IntegerField(blank=True, null=True)),
+                ('item3', models.IntegerField(blank=True, null=True)),
+                ('item4', models.IntegerField(blank=True, null=True)),
+                ('item5', models.IntegerField(blank=True, null=True)),
+                ('item6', models.IntegerField(blank=True, null=True)),
+                ('items_purchased', models.IntegerField(blank=True, null=True)),
+                ('killing_sprees', models.IntegerField(blank=True, null=True)),
+                ('largest_critical_strike', models.IntegerField(blank=True, null=True)),
+                ('largest_killing_spree', models.IntegerField(blank=True, null=True)),
+                ('largest_multi_kill', models.IntegerField(blank=True, null=True)),
+                ('legendary_items_created', models.IntegerField(blank=True, null=True)),
+                ('level', models.IntegerField(blank=True, null=True)),
+                ('magic_damage_dealt_player', models.IntegerField(blank=True, null=True)),
+                ('magic_damage_dealt_to_champions', models.IntegerField(blank=True, null=True)),
+                ('magic_damage_taken', models.IntegerField(blank=True, null=True)),
+                ('minions_denied', models.IntegerField(blank=True, null=True)),
+                ('minions_killed', models.IntegerField(blank=True, null=True)),
+                ('neutral_minions_killed', models.IntegerField(blank=True, null=True)),
+                ('neutral_minions_killed_enemy_jungle', models.IntegerField(blank=True, null=True)),
+                ('neutral_minions_killed_your_jungle', models.IntegerField(blank=True, null=True)),
+                ('nexus_killed', models.NullBooleanField()),
+                ('node_capture', models.IntegerField(blank=True, null=True)),
+                ('node_capture_assist', models.IntegerField(blank=True, null=True)),
+                ('node_neutralize', models.IntegerField(blank=True, null=True)),
+                ('node_neutralize_assist', models.IntegerField(blank=True, null=True)),
+                ('num_deaths', models.IntegerField(blank=True, null=True)),
+                ('num_items_bought', models.IntegerField(blank=True, null=True)),
+                ('objective_player_score', models.IntegerField(blank=True, null=True)),
+                ('penta_kills', models.IntegerField(blank=True, null=True)),
+                ('physical_damage_dealt_player', models.IntegerField(blank=True, null=True)),
+                ('physical_damage_dealt_to_champions', models.IntegerField(blank=True, null=True)),
+                ('physical_damage_taken', models.IntegerField(blank=True, null=True)),
+                ('quadra_kills', models.IntegerField(blank=True, null=True)),
+                ('sight_wards_bought', models.IntegerField(blank=True, null=True)),
+                ('spell_1_cast', models.IntegerField(blank=True, null=True)),
+                ('spell_2_cast', models.IntegerField(blank=True, null=True)),
+                ('spell_3_cast', models.IntegerField(blank=True, null=True)),
+                ('spell_4_cast', models.IntegerField(blank=True, null=True)),
+                ('summon_spell_1_cast', models.IntegerField(blank=True, null=True)),
+                ('summon_spell_2_cast', models.IntegerField(blank=True, null=True)),
+                ('super_monster_killed', models.IntegerField(blank=True, null=True)),
+                ('team', models.IntegerField(blank=True, null=True)),
+                ('team_objective', models.IntegerField(blank=True, null=True)),
+                ('time_played', models.IntegerField(blank=True, null=True)),
+                ('total_damage_dealt', models.IntegerField(blank=True, null=True)),
+                ('total_damage_dealt_to_champions', models.IntegerField(blank=True, null=True)),
+                ('total_damage_taken', models.IntegerField(blank=True, null=True)),
+                ('total_heal', models.IntegerField(blank=True, null=True)),
+                ('total_player_score', models.IntegerField(blank=True, null=True)),
+                ('total_score_rank', models.IntegerField(blank=True, null=True)),
+                ('total_time_crowd_control_dealt', models.IntegerField(blank=True, null=True)),
+                ('total_units_healed', models.IntegerField(blank=True, null=True)),
+                ('triple_kills', models.IntegerField(blank=True, null=True)),
+                ('true_damage_dealt_player', models.IntegerField(blank=True, null=True)),
+                ('true_damage_dealt_to_champions', models.IntegerField(blank=True, null=True)),
+                ('true_damage_taken', models.IntegerField(blank=True, null=True)),
+                ('turrets_killed', models.IntegerField(blank=True, null=True)),
+                ('unreal_kills', models.IntegerField(blank=True, null=True)),
+                ('victory_point_total', models.IntegerField(blank=True, null=True)),
+                ('vision_wards_bought', models.IntegerField(blank=True, null=True)),
+                ('ward_killed', models.IntegerField(blank=True, null=True)),
+                ('ward_placed', models.IntegerField(blank=True, null=True)),
+                ('win', models.NullBooleanField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Roster',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner_id', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Summoner',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summoner_id', models.BigIntegerField()),
+                ('name', models.CharField(max_length=24)),
+                ('std_name', models.CharField(max_length=24)),
+                ('profile_icon_id', models.IntegerField()),
+                ('revision_date', models.BigIntegerField()),
+                ('summoner_level', models.IntegerField()),
+                ('region', models.CharField(max_length=4)),
+                ('last_update', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SummonerSpell',
+            fields=[
+                ('spell_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('summoner_level', models.IntegerField()),
+                ('name', models.CharField(max_length=16)),
+                ('key', models.CharField(max_length=32)),
+                ('description', models.CharField(max_length=256)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('create_date', models.BigIntegerField()),
+                ('full_id', models.CharField(max_length=64)),
+                ('last_game_date', models.BigIntegerField(blank=True, null=True)),
+                ('last_joined_ranked_team_queue_date', models.BigIntegerField()),
+                ('modify_date', models.BigIntegerField()),
+                ('name', models.CharField(max_length=24)),
+                ('last_join_date', models.BigIntegerField()),
+                ('second_last_join_date', models.BigIntegerField()),
+                ('third_last_join_date', models.BigIntegerField()),
+                ('status', models.CharField(max_length=16)),
+                ('tag', models.CharField(max_length=6)),
+                ('region', models.CharField(max_length=4)),
+                ('roster', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='api.Roster')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TeamMemberInfo',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invite_date', models.BigIntegerField()),
+                ('join_date', models.BigIntegerField()),
+                ('player_id', models.BigIntegerField()),
+                ('status', models.CharField(max_length=16)),
+                ('roster', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Roster')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TeamStatDetail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_stat_type', models.CharField(max_length=16)),
+                ('average_games_played', models.IntegerField()),
+                ('wins', models.IntegerField()),
+                ('losses', models.IntegerField()),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Team')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='summoner',
+            unique_together=set([('summoner_id', 'region')]),
+        ),
+        migrations.AddField(
+            model_name='playerstat',
+            name='summoner',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='api.Summoner'),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='summoner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Summoner'),
+        ),
+        migrations.AddField(
+            model_name='matchhistorysummary',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Team'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='league',
+            unique_together=set([('region', 'queue', 'name', 'tier')]),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='spell_1',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spell_1', to='api.SummonerSpell'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='spell_2',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spell_2', to='api.SummonerSpell'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='stats',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='api.RawStat'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='summoner_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Summoner'),
+        ),
+        migrations.AddField(
+            model_name='aggregatedstat',
+            name='player_stats',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='api.PlayerStatsSummary'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='teammemberinfo',
+            unique_together=set([('player_id', 'roster')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='team',
+            unique_together=set([('region', 'full_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='leagueentry',
+            unique_together=set([('player_or_team_id', 'league')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='game',
+            unique_together=set([('region', 'game_id', 'summoner_id')]),
+        ),
+    ]
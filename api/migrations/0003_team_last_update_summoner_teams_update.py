@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 09:50
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_league_last_update'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summoner',
+            name='teams_update',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='last_update',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -25,6 +25,7 @@ class Summoner(models.Model):
     summoner_level = models.IntegerField()  # 'long' in DTO, but we know it's <= 30
     region = models.CharField(max_length=4)
     last_update = models.DateTimeField(auto_now=True)
+    teams_update = models.DateTimeField(null=True, blank=True)  # when their teams were last asked for, if ever
 
     def __unicode__(self):
         return self.name
@@ -280,6 +281,7 @@ class League(models.Model):
     queue = models.CharField(max_length=32)     # ex. RANKED_SOLO_5x5
     name = models.CharField(max_length=32)      # ex. Orianna's Warlocks
     tier = models.CharField(max_length=12)      # ex. CHALLENGER
+    last_update = models.DateTimeField(null=True, blank=True)   # when its entries were last written
 
     def __unicode__(self):
         return '' + self.region + ' ' + self.queue + ' ' + self.name + ' ' + self.tier
@@ -350,6 +352,7 @@ class Team(models.Model):
     tag = models.CharField(max_length=6)                # ex. TSM
     roster = models.OneToOneField('Roster')
     region = models.CharField(max_length=4)
+    last_update = models.DateTimeField(null=True, blank=True)   # when it was last fetched from Riot API
 
     def create_date_str(self):
         """Convert create_date epoch milliseconds timestamp to human-readable date string."""
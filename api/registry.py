@@ -0,0 +1,69 @@
+"""
+In-process lookup tables for static data (champions, summoner spells and items).
+"""
+
+import threading
+import time
+
+from api.models import Champion, SummonerSpell, Item
+
+
+class StaticRegistry:
+    """
+    Champion, SummonerSpell and Item rows, keyed by their Riot IDs and loaded once per static data version.
+
+    Static data only changes once per patch, so ingest code and serializers look rows up here instead of
+    querying the DB for each one.
+
+    `stamp` is a function returning a value that changes whenever the static data tables are reloaded
+    (by any process). It is checked at most every `check_interval` seconds; invalidate() forces a reload
+    on the next lookup.
+    """
+    def __init__(self, stamp, check_interval=30):
+        self._stamp = stamp
+        self.check_interval = check_interval
+        self._tables = None
+        self._loaded_stamp = None
+        self._checked = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._tables = None
+
+    def _load(self):
+        return {
+            Champion: dict((c.champion_id, c) for c in Champion.objects.all()),
+            SummonerSpell: dict((s.spell_id, s) for s in SummonerSpell.objects.all()),
+            Item: dict((i.item_id, i) for i in Item.objects.all()),
+        }
+
+    def _get_tables(self):
+        tables = self._tables
+        if tables is not None and time.time() - self._checked < self.check_interval:
+            return tables
+
+        with self._lock:
+            if self._tables is not None and time.time() - self._checked < self.check_interval:
+                return self._tables
+            stamp = self._stamp()
+            if self._tables is None or stamp != self._loaded_stamp:
+                self._tables = self._load()
+                self._loaded_stamp = stamp
+            self._checked = time.time()
+            return self._tables
+
+    def _lookup(self, model, riot_id):
+        obj = self._get_tables()[model].get(riot_id)
+        if obj is None:
+            # Not loaded (ex. a champion added since), so ask the DB, which raises DoesNotExist if it's not there either.
+            obj = model.objects.get(pk=riot_id)
+        return obj
+
+    def champion(self, champion_id):
+        return self._lookup(Champion, champion_id)
+
+    def summoner_spell(self, spell_id):
+        return self._lookup(SummonerSpell, spell_id)
+
+    def item(self, item_id):
+        return self._lookup(Item, item_id)
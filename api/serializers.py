@@ -5,6 +5,7 @@ Django REST Framework serializers.
 from rest_framework import serializers
 
 from api.models import *
+from api.utils import static_registry
 
 
 class SparseSummonerSerializer(serializers.ModelSerializer):
@@ -30,14 +31,19 @@ class ChampionSerializer(serializers.ModelSerializer):
 class PlayerSerializer(serializers.ModelSerializer):
     """
     A serializer that returns match participant data.
+
+    The champion comes from the static registry rather than a query per player.
     """
-    champion = ChampionSerializer()
+    champion = serializers.SerializerMethodField()
     summoner = SparseSummonerSerializer()
 
     class Meta:
         model = Player
         fields = ('summoner', 'champion', 'team_id')
 
+    def get_champion(self, obj):
+        return ChampionSerializer(static_registry.champion(obj.champion_id)).data
+
 
 class RawStatSerializer(serializers.ModelSerializer):
     """
@@ -82,6 +88,7 @@ class ItemSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Item
+        fields = '__all__'
 
 
 class SummonerSpellSerializer(serializers.ModelSerializer):
@@ -90,6 +97,7 @@ class SummonerSpellSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = SummonerSpell
+        fields = '__all__'
 
 
 class LeagueForLeagueEntrySerializer(serializers.ModelSerializer):
@@ -143,9 +151,9 @@ class TeamMemberInfoSerializer(serializers.ModelSerializer):
     which yields the summoner's name, otherwise returns `player_id`.
     Timestamps are converted into human-readable format.
     """
-    summoner = serializers.Field(source='get_summoner')
-    invite_date_str = serializers.Field(source='invite_date_str')
-    join_date_str = serializers.Field(source='join_date_str')
+    summoner = serializers.CharField(source='get_summoner', read_only=True)
+    invite_date_str = serializers.ReadOnlyField()
+    join_date_str = serializers.ReadOnlyField()
 
     class Meta:
         model = TeamMemberInfo
@@ -161,7 +169,7 @@ class RosterSerializer(serializers.ModelSerializer):
     Team members of the roster are nested within.
     """
     teammemberinfo_set = TeamMemberInfoSerializer(many=True)
-    owner = serializers.Field(source='get_summoner')
+    owner = serializers.CharField(source='get_summoner', read_only=True)
     class Meta:
         model = Roster
         fields = ('owner', 'teammemberinfo_set')
@@ -184,21 +192,21 @@ class TeamSerializer(serializers.ModelSerializer):
     """
     roster = RosterSerializer(many=False)
 
-    create_date = serializers.Field(source='create_date_str')
-    last_game_date = serializers.Field(source='last_game_date_str')
-    last_joined_ranked_team_queue_date = serializers.Field(source='last_joined_ranked_team_queue_str')
-    modify_date = serializers.Field(source='modify_date_str')
-    last_join_date = serializers.Field(source='last_join_date_str')
-    second_last_join_date = serializers.Field(source='second_last_join_date_str')
-    third_last_join_date = serializers.Field(source='third_last_join_date_str')
-    league_entries = LeagueEntrySerializer(source='get_league_entries')
-    team_stat_detail = TeamStatDetailSerializer(source='get_team_stat_detail')
+    create_date = serializers.ReadOnlyField(source='create_date_str')
+    last_game_date = serializers.ReadOnlyField(source='last_game_date_str')
+    last_joined_ranked_team_queue_date = serializers.ReadOnlyField(source='last_joined_ranked_team_queue_date_str')
+    modify_date = serializers.ReadOnlyField(source='modify_date_str')
+    last_join_date = serializers.ReadOnlyField(source='last_join_date_str')
+    second_last_join_date = serializers.ReadOnlyField(source='second_last_join_date_str')
+    third_last_join_date = serializers.ReadOnlyField(source='third_last_join_date_str')
+    league_entries = LeagueEntrySerializer(many=True, source='get_league_entries')
+    team_stat_detail = TeamStatDetailSerializer(many=True, source='get_team_stat_detail')
 
     class Meta:
         model = Team
-        fields = ('create_date', 'full_id', 'last_game_date', 'modify_date', 'name', 'last_join_date',
-        'second_last_join_date', 'third_last_join_date', 'status', 'tag', 'roster', 'region', 'league_entries',
-        'team_stat_detail')
+        fields = ('create_date', 'full_id', 'last_game_date', 'last_joined_ranked_team_queue_date', 'modify_date',
+        'name', 'last_join_date', 'second_last_join_date', 'third_last_join_date', 'status', 'tag', 'roster', 'region',
+        'league_entries', 'team_stat_detail')
 
 
 class AggregatedStatSerializer(serializers.ModelSerializer):
@@ -218,7 +226,7 @@ class PlayerStatsSummarySerializer(serializers.ModelSerializer):
     This is nested within PlayerStatSerializer.
     """
     aggregated_stats = AggregatedStatSerializer(many=False, source='get_aggregated_stat')
-    modify_date_str = serializers.Field(source='modify_date_str')
+    modify_date_str = serializers.ReadOnlyField()
 
     class Meta:
         model = PlayerStatsSummary
@@ -230,7 +238,7 @@ class PlayerStatSerializer(serializers.ModelSerializer):
 
     Also contains related PlayerStatsSummary and AggregatedStat data.
     """
-    summoner = serializers.Field(source='summoner.name')
+    summoner = serializers.ReadOnlyField(source='summoner.name')
     player_stats_summary_set = PlayerStatsSummarySerializer(many=True, source='playerstatssummary_set')
 
     class Meta:
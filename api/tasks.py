@@ -9,9 +9,13 @@ from datetime import datetime
 
 from celery import shared_task
 from django.core.exceptions import ObjectDoesNotExist
+from riotwatcher.riotwatcher import INTERACTIVE
 
+from api.crawler import MatchCrawler
 from api.models import Summoner
-from api.utils import riot_api, CACHE_SUMMONER, get_recent_matches, get_league_by_summoner_id, get_teams_by_summoner_id
+from api.utils import (riot_api, CACHE_SUMMONER, get_recent_matches, get_league_by_summoner_id,
+                       get_leagues_by_summoner_ids, get_teams_by_summoner_id, get_teams_by_summoner_ids,
+                       team_refresh_summoner_ids)
 
 @shared_task
 def async_get_summoner_by_name(summoner_name, region):
@@ -20,8 +24,14 @@ def async_get_summoner_by_name(summoner_name, region):
 
     Specifically, it gets basic summoner data as well as match history (last 10 games).
     Riot API is only queried if Summoner object is older than `CACHE_SUMMONER`.
+    A user is waiting on this task, so its requests use the interactive lane.
     """
+    # Entered here rather than with a decorator, which would build riot_api when this module is imported.
+    with riot_api.lane(INTERACTIVE):
+        _get_summoner_by_name(summoner_name, region)
 
+
+def _get_summoner_by_name(summoner_name, region):
     print('summoner_name =', summoner_name)
     print('region =', region)
 
@@ -77,6 +87,7 @@ def async_get_summoner_by_name(summoner_name, region):
             get_league_by_summoner_id(summoner_id=summoner.summoner_id, region=region)
             print('Getting teams...')
             get_teams_by_summoner_id(summoner_id=summoner.summoner_id, region=region)
+            async_refresh_teams.delay(list(team_refresh_summoner_ids(summoner.summoner_id, region)), region)
 
     # We don't have this summoner in the cache, so grab it from API and create new entry.
     else:
@@ -99,4 +110,41 @@ def async_get_summoner_by_name(summoner_name, region):
         print('Getting leagues...')
         get_league_by_summoner_id(summoner_id=summoner.summoner_id, region=region)
         print('Getting teams...')
-        get_teams_by_summoner_id(summoner_id=summoner.summoner_id, region=region)
\ No newline at end of file
+        get_teams_by_summoner_id(summoner_id=summoner.summoner_id, region=region)
+        async_refresh_teams.delay(list(team_refresh_summoner_ids(summoner.summoner_id, region)), region)
+
+
+@shared_task
+def async_refresh_leagues(summoner_ids, region):
+    """
+    Refresh the leagues of several summoners with a single get_league() call (split into requests of
+    max_ids['league'] IDs by riotwatcher). Leagues shared by several of them are written once,
+    and leagues refreshed less than `CACHE_LEAGUE` ago are skipped.
+    """
+    refreshed = get_leagues_by_summoner_ids(summoner_ids, region)
+    print('Refreshed {} leagues for {} summoners ({})'.format(refreshed, len(summoner_ids), region))
+
+
+@shared_task
+def async_refresh_teams(summoner_ids, region):
+    """
+    Refresh the teams of several summoners (ex. the players of a summoner's recent games and teammates)
+    with a single get_teams_for_summoners() call. Teams shared by several of them are written once,
+    and summoners on a team refreshed less than `CACHE_TEAM` ago are skipped.
+    """
+    refreshed = get_teams_by_summoner_ids(summoner_ids, region)
+    print('Refreshed {} teams for {} summoners ({})'.format(refreshed, len(summoner_ids), region))
+
+
+@shared_task
+def crawl_matches(max_visits=None, max_seconds=None, budgets=None):
+    """
+    Grow the match corpus by crawling the match graph breadth-first from known summoners, resuming from
+    the last checkpoint (see api.crawler.MatchCrawler). Schedule it periodically, ex. with max_seconds
+    a little below the period, to crawl with whatever key throughput user searches leave free.
+    `budgets` caps the summoners visited per region, ex. {'na': 500}.
+    """
+    try:
+        MatchCrawler(budgets=budgets).run(max_visits=max_visits, max_seconds=max_seconds)
+    except RuntimeError as e:
+        print('Not crawling:', e)
@@ -1,3 +1,392 @@
-from django.test import TestCase
+"""
+Tests of the api app.
+"""
 
-# Create your tests here.
\ No newline at end of file
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from riotwatcher.riotwatcher import RiotWatcher, RateLimit
+from riotwatcher.transport import ReplayTransport, GENERATORS
+
+import api.utils as utils
+from api.crawler import BloomFilter, MatchCrawler
+from api.mappers import raw_stat_mapper, aggregated_stat_mapper
+from api.models import *
+
+
+def recent_games():
+    games = []
+    for g in range(10):
+        games.append({'gameId': 1000 + g, 'championId': 1 + g % 5, 'createDate': g, 'gameMode': 'CLASSIC',
+                      'gameType': 'MATCHED_GAME', 'invalid': False, 'ipEarned': 10, 'level': 30, 'mapId': 1,
+                      'spell1': 4, 'spell2': 14, 'subType': 'NORMAL', 'teamId': 100,
+                      'stats': {'championsKilled': g, 'goldEarned': 1000, 'win': True, 'item0': 1001},
+                      'fellowPlayers': [{'summonerId': 5000 + g * 9 + p, 'championId': 1 + p % 5, 'teamId': 200}
+                                        for p in range(9)]})
+    return games
+
+
+def recent_games_by_summoner(match, params):
+    return {'summonerId': int(match.group('id')), 'games': recent_games()}
+
+
+def league_entry(i, league_points=0):
+    return {'division': 'I', 'isFreshBlood': False, 'isHotStreak': False, 'isInactive': False, 'isVeteran': False,
+            'leaguePoints': league_points, 'playerOrTeamId': str(i), 'playerOrTeamName': 'P{}'.format(i), 'wins': 5}
+
+
+# Entries of the league the replayed API returns, see league().
+LEAGUE_ENTRIES = {}
+
+
+def league(match, params):
+    return dict((summoner_id, [{'name': "Orianna's Warlocks", 'tier': 'GOLD', 'queue': 'RANKED_SOLO_5x5',
+                                'participantId': summoner_id, 'entries': list(LEAGUE_ENTRIES.values())}])
+                for summoner_id in match.group('ids').split(','))
+
+
+def team_dto(k, modify_date=1, games=3, members=5):
+    """Team k, owned by summoner 100 * k, with members 100 * k to 100 * k + members - 1."""
+    return {'createDate': 1, 'fullId': 'TEAM-{}'.format(k), 'lastGameDate': games, 'lastJoinedRankedTeamQueueDate': 1,
+            'modifyDate': modify_date, 'name': 'T{}'.format(k), 'lastJoinDate': 1, 'secondLastJoinDate': 1,
+            'thirdLastJoinDate': 1, 'status': 'RANKED', 'tag': 'T',
+            'roster': {'ownerId': 100 * k,
+                       'memberList': [{'inviteDate': 1, 'joinDate': 1, 'playerId': 100 * k + m, 'status': 'MEMBER'}
+                                      for m in range(members)]},
+            'teamStatDetails': [{'teamStatType': 'RANKED_TEAM_5x5', 'averageGamesPlayed': 0, 'wins': games,
+                                 'losses': 0}],
+            'matchHistory': [{'assists': 1, 'date': 1, 'deaths': 1, 'gameId': g, 'gameMode': 'CLASSIC',
+                              'invalid': False, 'kills': 1, 'mapId': 1, 'opposingTeamKills': 1,
+                              'opposingTeamName': 'x', 'win': True} for g in range(games)]}
+
+
+def teams_by_summoner(match, params):
+    # Summoners below 100 are on no team, so the API answers 404 if there are only those.
+    teams = dict((summoner_id, [team_dto(int(summoner_id) // 100)])
+                 for summoner_id in match.group('ids').split(',') if int(summoner_id) >= 100)
+    return teams or None
+
+
+REPLAY_GENERATORS = GENERATORS + (
+    (r'^v1\.3/game/by-summoner/(?P<id>\d+)/recent$', recent_games_by_summoner),
+    (r'^v2\.4/league/by-summoner/(?P<ids>\d+(,\d+)*)$', league),
+    (r'^v2\.3/team/by-summoner/(?P<ids>\d+(,\d+)*)$', teams_by_summoner),
+)
+
+
+def create_summoner(summoner_id, region='na'):
+    return Summoner.objects.create(summoner_id=summoner_id, name='S{}'.format(summoner_id),
+                                   std_name='s{}'.format(summoner_id), profile_icon_id=1, revision_date=1,
+                                   summoner_level=30, region=region)
+
+
+def create_static_data():
+    for i in range(1, 6):
+        Champion.objects.create(champion_id=i, title='t', name='C{}'.format(i), key='C{}'.format(i))
+    for i in (4, 14):
+        SummonerSpell.objects.create(spell_id=i, summoner_level=1, name='S{}'.format(i), key='S{}'.format(i),
+                                     description='')
+    Item.objects.create(item_id=1001, description='', name='Boots')
+    utils.static_registry.invalidate()
+
+
+class ReplayTestCase(TestCase):
+    """
+    Swaps api.utils.riot_api for a RiotWatcher answered by REPLAY_GENERATORS, which has its own in-memory
+    rate limiter and no response cache.
+    """
+    def setUp(self):
+        self.saved_riot_api = utils.riot_api
+        self.transport = ReplayTransport(generators=REPLAY_GENERATORS)
+        utils.riot_api = RiotWatcher('test', sessions=self.transport, limits=(RateLimit(100, 1), ))
+
+    def tearDown(self):
+        utils.riot_api = self.saved_riot_api
+
+    def requests(self):
+        return self.transport.stats()['requests']
+
+
+class FieldMapperTest(SimpleTestCase):
+    def test_row(self):
+        row = dict(zip(raw_stat_mapper.field_names,
+                       raw_stat_mapper.row({'championsKilled': 3, 'item0': 1001, 'win': True, 'unknownKey': 1})))
+        self.assertEqual(row['champions_killed'], 3)
+        self.assertEqual(row['item0'], 1001)
+        self.assertEqual(row['win'], True)
+        self.assertIsNone(row['assists'])
+        self.assertNotIn('unknown_key', row)
+
+    def test_row_order(self):
+        # Positional values in the order of the model's __init__, primary key first.
+        stat = raw_stat_mapper.build({'assists': 2, 'doubleKills': 1})
+        self.assertIsNone(stat.pk)
+        self.assertEqual((stat.assists, stat.double_kills), (2, 1))
+
+    def test_relations_are_not_mapped(self):
+        row = dict(zip(aggregated_stat_mapper.field_names,
+                       aggregated_stat_mapper.row({'playerStats': 7, 'id': 9, 'totalChampionKills': 4},
+                                                  player_stats_id=5)))
+        self.assertEqual(row['player_stats_id'], 5)
+        self.assertIsNone(row['id'])
+        self.assertEqual(row['total_champion_kills'], 4)
+
+    def test_values(self):
+        values = aggregated_stat_mapper.values({'totalChampionKills': 4}, player_stats_id=5)
+        self.assertNotIn('id', values)
+        self.assertEqual((values['total_champion_kills'], values['player_stats_id']), (4, 5))
+
+
+class RecentGamesTest(TestCase):
+    def setUp(self):
+        create_static_data()
+        create_summoner(1)
+        # All participants but 5000 (of game 1000) are known.
+        for summoner_id in range(5001, 5090):
+            create_summoner(summoner_id)
+
+    def test_save(self):
+        utils.save_recent_games(1, 'na', recent_games())
+        games = Game.objects.filter(summoner_id__summoner_id=1).order_by('game_id')
+        self.assertEqual([game.game_id for game in games], list(range(1000, 1010)))
+        self.assertEqual([game.stats.champions_killed for game in games], list(range(10)))
+        self.assertEqual(Player.objects.count(), 89)
+        self.assertEqual(Player.objects.filter(participant_of=games[0]).count(), 8)
+        self.assertEqual(set(Player.objects.filter(participant_of=games[3]).values_list(
+            'summoner_id__summoner_id', flat=True)), set(range(5027, 5036)))
+
+    def test_known_games_are_skipped(self):
+        utils.save_recent_games(1, 'na', recent_games()[:4])
+        utils.save_recent_games(1, 'na', recent_games())
+        self.assertEqual(Game.objects.count(), 10)
+        self.assertEqual(RawStat.objects.count(), 10)
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_add(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        self.assertTrue(bloom.add('na:1'))
+        self.assertFalse(bloom.add('na:1'))
+        self.assertIn('na:1', bloom)
+        self.assertNotIn('euw:1', bloom)
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add('na:{}'.format(i))
+        self.assertTrue(all('na:{}'.format(i) in bloom for i in range(1000)))
+        false_positives = sum('euw:{}'.format(i) in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_copy(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        bloom.add('na:1')
+        copy = BloomFilter(bits=bloom.bits, hashes=bloom.hashes, data=bytes(bloom.data))
+        self.assertIn('na:1', copy)
+        self.assertNotIn('na:2', copy)
+
+
+class CrawlerTest(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.checkpoint = os.path.join(directory, 'checkpoint.json.gz')
+
+    def crawler(self):
+        return MatchCrawler(checkpoint=self.checkpoint, capacity=1000)
+
+    def test_visit(self):
+        crawler = self.crawler()
+        with mock.patch('api.crawler.get_recent_matches', return_value={2, 3}):
+            crawler.visit('na', 1)
+        self.assertIn('na:1', crawler.visited)
+        self.assertEqual(list(crawler.frontiers['na']), [2, 3])
+        self.assertFalse(crawler.enqueue('na', 1))
+        self.assertFalse(crawler.enqueue('na', 2))
+
+    def test_failed_visit_is_not_marked(self):
+        crawler = self.crawler()
+        with mock.patch('api.crawler.get_recent_matches', side_effect=ValueError('Bad request')):
+            crawler.visit('na', 1)
+        self.assertNotIn('na:1', crawler.visited)
+        self.assertEqual(crawler.stats['errors'], 1)
+        self.assertTrue(crawler.enqueue('na', 1))
+
+    def test_checkpoint(self):
+        crawler = self.crawler()
+        crawler.enqueue('na', 2)
+        crawler.enqueue('euw', 3)
+        crawler.visited.add('na:1')
+        crawler.save()
+
+        crawler = self.crawler()
+        crawler.run(max_visits=0)
+        self.assertEqual(dict((region, list(ids)) for region, ids in crawler.frontiers.items()),
+                         {'na': [2], 'euw': [3]})
+        self.assertIn('na:1', crawler.visited)
+        self.assertEqual(crawler.stats['queued'], 2)
+        self.assertFalse(crawler.enqueue('na', 2))
+
+    def test_unreadable_checkpoint(self):
+        for data in (b'not gzip', gzip.compress(b'{"frontiers": ')[:-4], gzip.compress(b'{"stats": {}}')):
+            with open(self.checkpoint, 'wb') as f:
+                f.write(data)
+            crawler = self.crawler()
+            crawler.run(max_visits=0)
+            self.assertEqual(crawler.stats['queued'], 0)
+            # And is replaced by a readable one.
+            with gzip.open(self.checkpoint, 'rt', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['frontiers'], {})
+
+    def test_lock(self):
+        first = self.crawler()
+        first.enqueue('na', 2)
+        first.save()
+        first._lock()
+        self.addCleanup(first._unlock)
+        second = self.crawler()
+        with mock.patch.object(second, '_load') as load:
+            self.assertRaises(RuntimeError, second.run, max_visits=0)
+        self.assertFalse(load.called)
+
+
+class SyncRowsTest(TestCase):
+    def setUp(self):
+        self.league = League.objects.create(region='na', queue='RANKED_SOLO_5x5', name='L', tier='GOLD')
+        self.entries = dict((str(i), utils.league_entry_values(league_entry(i))) for i in range(10))
+
+    def sync(self, entries, delete=True):
+        return utils.sync_rows(self.league.leagueentry_set.all(), 'player_or_team_id', utils.LEAGUE_ENTRY_FIELDS,
+                               entries, delete=delete, league=self.league)
+
+    def test_insert_update_delete(self):
+        self.assertEqual(self.sync(self.entries), (10, 0, 0))
+
+        self.entries['3'] = utils.league_entry_values(league_entry(3, league_points=50))
+        del self.entries['9']
+        self.entries['10'] = utils.league_entry_values(league_entry(10))
+        self.assertEqual(self.sync(self.entries), (1, 1, 1))
+        self.assertEqual(LeagueEntry.objects.get(player_or_team_id='3').league_points, 50)
+        self.assertEqual(sorted(self.league.leagueentry_set.values_list('player_or_team_id', flat=True)),
+                         sorted(self.entries))
+
+    def test_unchanged_is_one_query(self):
+        self.sync(self.entries)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.sync(self.entries), (0, 0, 0))
+
+    def test_keep_departed(self):
+        self.sync(self.entries)
+        del self.entries['0']
+        self.assertEqual(self.sync(self.entries, delete=False), (0, 0, 1))
+        self.assertEqual(self.league.leagueentry_set.count(), 10)
+
+
+class LeagueTest(ReplayTestCase):
+    def setUp(self):
+        ReplayTestCase.setUp(self)
+        LEAGUE_ENTRIES.clear()
+        LEAGUE_ENTRIES.update((i, league_entry(i)) for i in range(200))
+
+    def test_refresh(self):
+        utils.get_league_by_summoner_id(1, 'na')
+        league = League.objects.get()
+        self.assertEqual(league.leagueentry_set.count(), 200)
+
+        # Fresh leagues aren't written again (the queries are a savepoint, its release, the lookup and the claim).
+        with self.assertNumQueries(4):
+            utils.get_league_by_summoner_id(1, 'na')
+
+        LEAGUE_ENTRIES[5] = league_entry(5, league_points=75)
+        del LEAGUE_ENTRIES[6]
+        utils.get_league_by_summoner_id(1, 'na', max_age=utils.timedelta(0))
+        self.assertEqual(league.leagueentry_set.get(player_or_team_id='5').league_points, 75)
+        self.assertEqual(league.leagueentry_set.count(), 199)
+        self.assertEqual(League.objects.count(), 1)
+
+
+class TeamTest(ReplayTestCase):
+    def test_save_team(self):
+        self.assertTrue(utils.save_team(team_dto(1), 'na'))
+        team = Team.objects.get()
+        self.assertEqual(team.roster.teammemberinfo_set.count(), 5)
+        self.assertEqual(team.matchhistorysummary_set.count(), 3)
+
+        with self.assertNumQueries(4):
+            self.assertFalse(utils.save_team(team_dto(1), 'na'))
+
+        self.assertTrue(utils.save_team(team_dto(1, modify_date=2, games=4, members=4), 'na'))
+        team = Team.objects.get()
+        self.assertEqual(sorted(team.roster.teammemberinfo_set.values_list('player_id', flat=True)),
+                         [100, 101, 102, 103])
+        self.assertEqual(team.matchhistorysummary_set.count(), 4)
+        self.assertEqual(team.teamstatdetail_set.get().wins, 4)
+
+    def test_fresh_summoners_are_skipped(self):
+        for summoner_id in (1, 2, 100, 101):
+            create_summoner(summoner_id)
+
+        self.assertEqual(utils.get_teams_by_summoner_ids([1, 2, 100], 'na'), 1)
+        requests = self.requests()
+        # 101 is on a fresh team, 1 and 2 were asked about already (and are on no team).
+        self.assertEqual(utils.get_teams_by_summoner_ids([1, 2, 101], 'na'), 0)
+        self.assertEqual(self.requests(), requests)
+
+        Summoner.objects.update(teams_update=None)
+        Team.objects.update(last_update=None)
+        utils.get_teams_by_summoner_ids([1, 2], 'na')
+        self.assertEqual(self.requests(), requests + 1)
+
+
+class StatsSummaryTest(TestCase):
+    def stats(self, modify_dates):
+        return {'playerStatSummaries': [{'playerStatSummaryType': summary_type, 'wins': 10, 'losses': 5,
+                                         'modifyDate': modify_date,
+                                         'aggregatedStats': {'totalChampionKills': modify_date}}
+                                        for summary_type, modify_date in modify_dates.items()]}
+
+    def test_upsert(self):
+        summoner = create_summoner(1)
+        self.assertEqual(utils.save_stats_summary(summoner, self.stats({'Unranked': 1, 'RankedSolo5x5': 1})), 2)
+
+        with self.assertNumQueries(4):
+            self.assertEqual(utils.save_stats_summary(summoner, self.stats({'Unranked': 1, 'RankedSolo5x5': 1})), 0)
+
+        self.assertEqual(utils.save_stats_summary(summoner, self.stats({'Unranked': 2, 'RankedSolo5x5': 1,
+                                                                        'AramUnranked5x5': 1})), 2)
+        summaries = PlayerStatsSummary.objects.filter(player__summoner=summoner)
+        self.assertEqual(summaries.count(), 3)
+        unranked = summaries.get(player_stat_summary_type='Unranked')
+        self.assertEqual(unranked.modify_date, 2)
+        self.assertEqual(unranked.get_aggregated_stat().total_champion_kills, 2)
+
+
+class StaticDataTest(ReplayTestCase):
+    def champions(self, *ids):
+        return {'data': dict(('C{}'.format(i), {'id': i, 'title': 'title {}'.format(i), 'name': 'C{}'.format(i),
+                                                'key': 'C{}'.format(i)}) for i in ids)}
+
+    def test_sync_keeps_referenced_rows(self):
+        create_static_data()
+        Champion.objects.create(champion_id=6, title='t', name='C6', key='C6')
+        create_summoner(1)
+        utils.get_recent_matches(1, 'na')
+
+        # Champion 1 is gone from the API but played in stored games, 6 isn't played anywhere.
+        utils.update_champions(self.champions(2, 3, 4, 5, 7))
+        self.assertEqual(sorted(Champion.objects.values_list('champion_id', flat=True)), [1, 2, 3, 4, 5, 7])
+        self.assertEqual(Champion.objects.get(champion_id=2).title, 'title 2')
+        self.assertEqual(Game.objects.count(), 10)
+
+    def test_unchanged_writes_nothing(self):
+        utils.update_champions(self.champions(1, 2, 3))
+        with self.assertNumQueries(4):
+            utils.sync_static_data(Champion, ('title', 'name', 'key'),
+                                   dict((i, ('title {}'.format(i), 'C{}'.format(i), 'C{}'.format(i)))
+                                        for i in (1, 2, 3)))
@@ -2,7 +2,8 @@
 URL map for API module.
 """
 
-from django.conf.urls import url, patterns, include
+from django.conf import settings
+from django.conf.urls import url, include
 
 from api.views import (
     SummonerList,
@@ -31,14 +32,16 @@ from api.views import (
     TeamMemberInfoDetail,
     PlayerStatList,
     PlayerStatDetail,
-    api_root)
+    api_root,
+    get_task_state,
+    riot_api_metrics)
 
 # TODO: Consider allowing lookup by ID (check for number instead of \w+)
 # TODO: Consider separating out summoner-list and summoner-region-list classes (same name in browseable API)
 # TODO: Add action prefixes to endpoints such as `by-id`, `by-name`, etc.
-urlpatterns = patterns('api',
+urlpatterns = [
     url(r'^api-auth/', include('rest_framework.urls', namespace='rest_framework')),
-    url(r'^task_state$', 'views.get_task_state', name='task_state'),
+    url(r'^task_state$', get_task_state, name='task_state'),
 
     # Note: trailing slashes
     url(r'^$', api_root),
@@ -92,4 +95,9 @@ urlpatterns = patterns('api',
     url(r'^playerstats$', PlayerStatList.as_view(), name='playerstat-list'),
     url(r'^playerstats/(?P<region>\w+)/(?P<name>\w+( *\w+)*)$', PlayerStatDetail.as_view(), name='playerstat-detail'),
 
-)
\ No newline at end of file
+]
+
+if settings.RIOT_API_METRICS:
+    urlpatterns += [
+        url(r'^riot-api-metrics$', riot_api_metrics, name='riot-api-metrics'),
+    ]
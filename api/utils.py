@@ -2,14 +2,20 @@
 Utility functions and constants for API module.
 """
 
+import gzip
+import json
+import os
 from datetime import datetime, timedelta
 
-import inflection
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils.functional import SimpleLazyObject
+from riotwatcher import riotwatcher
+from riotwatcher.cache import ResponseCache, SQLiteCacheBackend, DEFAULT_TTLS
 from riotwatcher.riotwatcher import LoLException, error_404
 
-from lol_stats.base import riot_api
+from lol_stats.base import RIOT_API_KEY, RIOT_API_SHARED_DB, RIOT_API_CACHE_DB, STATIC_DATA_DIR
 from api.models import (
     Summoner,
     Player,
@@ -24,10 +30,39 @@ from api.models import (
     MatchHistorySummary,
     Roster,
     TeamMemberInfo,
-    TeamStatDetail,
     PlayerStat,
     PlayerStatsSummary,
     AggregatedStat)
+from api.mappers import raw_stat_mapper, aggregated_stat_mapper
+from api.registry import StaticRegistry
+
+
+# Response cache TTLs of riot_api. The champion and item lists are only read by update_champions() and update_items(),
+# which store them in the DB, so they aren't cached: uncached, they are streamed (with ijson installed) rather than
+# decoded whole. League lookups stay cached so concurrent lookups share one request, which means they are decoded
+# whole (see RiotWatcher.stream_request()).
+RIOT_API_TTLS = ((r'^static-data/[^/]+/(champion|item)$', 0), ) + DEFAULT_TTLS
+
+
+def build_riot_api():
+    """
+    The RiotWatcher used by the api app. Rate limit windows, in-flight requests and telemetry are shared by every
+    process (Celery workers, dev server) through RIOT_API_SHARED_DB, and responses are cached in RIOT_API_CACHE_DB.
+
+    Requests go through the background lane unless marked as interactive (a user is waiting on them).
+    """
+    return riotwatcher.RiotWatcher(RIOT_API_KEY,
+                                   limiter=riotwatcher.SQLiteRateLimiter(RIOT_API_SHARED_DB),
+                                   default_lane=riotwatcher.BACKGROUND,
+                                   flights=riotwatcher.SingleFlight(
+                                       store=riotwatcher.SQLiteFlightStore(RIOT_API_SHARED_DB)),
+                                   cache=ResponseCache(SQLiteCacheBackend(RIOT_API_CACHE_DB), RIOT_API_TTLS),
+                                   telemetry=riotwatcher.Telemetry(
+                                       store=riotwatcher.SQLiteTelemetryStore(RIOT_API_SHARED_DB)))
+
+
+# Built on first use, so importing settings or this module (ex. manage.py check, docs) writes no files.
+riot_api = SimpleLazyObject(build_riot_api)
 
 
 ## Constants ##
@@ -46,11 +81,10 @@ TURKEY = 'tr'
 
 # Cache Durations
 CACHE_SUMMONER = timedelta(seconds=10)  # Sensible value in production would be avg game length?
+CACHE_LEAGUE = timedelta(minutes=5)     # A league is the same for all its members, so any of them can refresh it.
+CACHE_TEAM = timedelta(minutes=10)      # Likewise for a team and its roster.
 
 # Riot API
-MAX_IDS = 40  # number of summoner IDs that can be queried at once
-
-
 def get_summoner_by_name(summoner_name, region):
     """
     Get summoner info, by name, from Riot API, into cache.
@@ -167,16 +201,6 @@ def summoner_name_to_id(summoner_name, region):
     return summoner.summoner_id
 
 
-def chunks(l, n):
-    """
-    Yield successive n-sized chunks from l.
-
-    l must be a list.
-    """
-    for i in range(0, len(l), n):
-        yield l[i:i + n]
-
-
 def reset_recent():
     """
     Clear all DB objects related to recent match history.
@@ -189,76 +213,265 @@ def reset_recent():
     Game.objects.all().delete()
 
 
-def update_champions():
+def update_champions(champs=None):
     """
     Update the DB table containing champion info from Riot API.
+
+    `champs` is a champion list DTO to use instead of querying the API (ex. from a static data snapshot).
+    Otherwise champions are streamed from the API one at a time.
     """
     # get fresh champ list from API
-    champs = riot_api.static_get_champion_list()
-
-    # delete all champ data in cache
-    Champion.objects.all().delete()
+    if champs is None:
+        champ_list = riot_api.static_iter_champion_list()
+    else:
+        champ_list = champs['data'].values()
 
-    # can this be more pythonic? why doesn't ex. k['id'] work?
-    for k in champs['data']:
-        champ = Champion(champion_id=champs['data'][k]['id'],
-                         title=champs['data'][k]['title'],
-                         name=champs['data'][k]['name'],
-                         key=champs['data'][k]['key'])
-        champ.save()
-    return
+    rows = dict((champ_dto['id'], (champ_dto['title'], champ_dto['name'], champ_dto['key']))
+                for champ_dto in champ_list)
+    sync_static_data(Champion, ('title', 'name', 'key'), rows,
+                     (Game, 'champion_id'), (Player, 'champion'))
 
 
-def update_items():
+def update_items(items=None):
     """
     Update the DB table containing item info from Riot API.
+
+    `items` is an item list DTO to use instead of querying the API.
+    Otherwise items are streamed from the API one at a time.
     """
-    items = riot_api.static_get_item_list()
-    Item.objects.all().delete()
+    if items is None:
+        item_list = riot_api.static_iter_item_list()
+    else:
+        item_list = items['data'].values()
 
-    for k in items['data']:
-        # plaintext and group are not present for every item
-        if 'plaintext' in items['data'][k]:
-            plain_text = items['data'][k]['plaintext']
-        else:
-            plain_text = None
+    # plaintext and group are not present for every item
+    rows = dict((item_dto['id'], (item_dto['description'], item_dto['name'],
+                                  item_dto.get('plaintext'), item_dto.get('group')))
+                for item_dto in item_list)
+    sync_static_data(Item, ('description', 'name', 'plain_text', 'group'), rows)
 
-        if 'group' in items['data'][k]:
-            group = items['data'][k]['group']
-        else:
-            group = None
 
-        item = Item(item_id=items['data'][k]['id'],
-                    description=items['data'][k]['description'],
-                    name=items['data'][k]['name'],
-                    plain_text=plain_text,
-                    group=group)
-        item.save()
+def update_summoner_spells(spells=None):
+    """
+    Update the DB table containing summoner spell info from Riot API.
+
+    `spells` is a summoner spell list DTO to use instead of querying the API.
+    """
+    if spells is None:
+        spells = riot_api.static_get_summoner_spell_list()
+
+    rows = dict((spell['id'], (spell['summonerLevel'], spell['name'], spell['key'], spell['description']))
+                for spell in spells['data'].values())
+    sync_static_data(SummonerSpell, ('summoner_level', 'name', 'key', 'description'), rows,
+                     (Game, 'spell_1'), (Game, 'spell_2'))
 
 
-def update_summoner_spells():
+def sync_static_data(model, fields, rows, *references):
     """
-    Update the DB table containing summoner spell info from Riot API.
+    Make a static data table match `rows`, a dict of {Riot ID: tuple of `fields` values}, in one transaction.
+
+    New IDs are INSERTed and changed rows UPDATEd (see sync_rows()), so the table is never empty, not even
+    within the transaction. IDs that are gone are only deleted if no row of `references`, (model, field name)
+    pairs of foreign keys to `model`, refers to them (ex. a removed champion that was played in a stored game
+    stays).
+    """
+    with transaction.atomic():
+        new, updated, _ = sync_rows(model.objects.all(), model._meta.pk.name, fields, rows, delete=False)
+
+        gone = set(model.objects.exclude(pk__in=list(rows)).values_list('pk', flat=True))
+        for ref_model, field in references:
+            if gone:
+                gone -= set(ref_model.objects.filter(**{field + '__in': list(gone)}).values_list(field, flat=True))
+        if gone:
+            model.objects.filter(pk__in=list(gone)).delete()
+
+    static_registry.invalidate()
+    print('{}: {} new, {} updated, {} retired'.format(model.__name__, new, updated, len(gone)))
+
+
+def _version_key(version):
+    """Sort key for static data version strings, ex. '4.14.2'."""
+    return [int(i) if i.isdigit() else i for i in version.split('.')]
+
+
+def static_data_snapshot_path(version):
+    return os.path.join(STATIC_DATA_DIR, '{}.json.gz'.format(version))
+
+
+def static_data_snapshot_versions():
     """
-    spells = riot_api.static_get_summoner_spell_list()
-    SummonerSpell.objects.all().delete()
+    Returns the versions of static data snapshots on disk, newest first.
+    """
+    if not os.path.isdir(STATIC_DATA_DIR):
+        return []
+    versions = [f[:-len('.json.gz')] for f in os.listdir(STATIC_DATA_DIR) if f.endswith('.json.gz')]
+    return sorted(versions, key=_version_key, reverse=True)
+
 
-    for k in spells['data']:
-        sum_spell = SummonerSpell(spell_id=spells['data'][k]['id'],
-                                  summoner_level=spells['data'][k]['summonerLevel'],
-                                  name=spells['data'][k]['name'],
-                                  key=spells['data'][k]['key'],
-                                  description=spells['data'][k]['description'])
-        sum_spell.save()
+def current_static_data_version():
+    """
+    Returns the version of the static data last loaded into the DB, or None.
+    """
+    try:
+        with open(os.path.join(STATIC_DATA_DIR, 'CURRENT')) as f:
+            return f.read().strip() or None
+    except IOError:
+        return None
 
 
-def update_static_data():
+def static_data_stamp():
+    """
+    Returns a value that changes whenever static data is loaded into the DB (by any process), or None.
+
+    The version alone doesn't change when the same version is loaded again, so the CURRENT file's
+    modification time is part of it.
+    """
+    path = os.path.join(STATIC_DATA_DIR, 'CURRENT')
+    try:
+        return current_static_data_version(), os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+# Champion, SummonerSpell and Item lookups for ingest code and serializers, reloaded when static data changes.
+static_registry = StaticRegistry(static_data_stamp)
+
+
+def _write_atomic(path, data):
+    """Write `data` (bytes) to `path` so that readers never see a partial file."""
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.rename(tmp_path, path)
+
+
+def save_static_data_snapshot(snapshot):
+    """
+    Write a static data snapshot (see fetch_static_data_snapshot()) to disk as gzipped JSON.
+    """
+    if not os.path.isdir(STATIC_DATA_DIR):
+        os.makedirs(STATIC_DATA_DIR)
+    _write_atomic(static_data_snapshot_path(snapshot['version']),
+                  gzip.compress(json.dumps(snapshot).encode('utf-8')))
+
+
+def load_static_data_snapshot(version=None):
+    """
+    Read a static data snapshot from disk, the newest one if `version` is not given.
+
+    Returns None if there is no such snapshot.
+    """
+    if version is None:
+        versions = static_data_snapshot_versions()
+        if not versions:
+            return None
+        version = versions[0]
+    try:
+        with gzip.open(static_data_snapshot_path(version), 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+    except IOError:
+        return None
+
+
+def fetch_static_data_snapshot(version):
+    """
+    Get champion, item and summoner spell lists for a given static data version from Riot API.
+    """
+    return {'version': version,
+            'champions': riot_api.static_get_champion_list(version=version),
+            'items': riot_api.static_get_item_list(version=version),
+            'summoner_spells': riot_api.static_get_summoner_spell_list(version=version)}
+
+
+def load_static_data(snapshot=None):
+    """
+    Fill the static data tables from a snapshot, the newest one on disk if not given, without querying Riot API.
+
+    Returns the version loaded, or None if there was no snapshot.
+    """
+    if snapshot is None:
+        snapshot = load_static_data_snapshot()
+        if snapshot is None:
+            print('No static data snapshot found in', STATIC_DATA_DIR)
+            return None
+
+    # Before touching the tables, so CURRENT can always be written once they have been updated.
+    os.makedirs(STATIC_DATA_DIR, exist_ok=True)
+
+    # All three tables change together (ex. on patch day), or not at all.
+    with transaction.atomic():
+        update_champions(snapshot['champions'])
+        update_items(snapshot['items'])
+        update_summoner_spells(snapshot['summoner_spells'])
+
+    _write_atomic(os.path.join(STATIC_DATA_DIR, 'CURRENT'), snapshot['version'].encode('utf-8'))
+    static_registry.invalidate()
+    print('Loaded static data version', snapshot['version'])
+    return snapshot['version']
+
+
+def update_static_data(force=False):
     """
     Update the DB with all static data from Riot API.
+
+    Only the version list is queried unless the static data version has changed since the last update.
+    A snapshot of each version is kept in STATIC_DATA_DIR, so it is only ever fetched once.
+    Pass `force` to reload the tables even if the version hasn't changed.
+    """
+    # Newest version first.
+    version = riot_api.static_get_versions()[0]
+
+    if not force and version == current_static_data_version() and Champion.objects.exists():
+        print('Static data is up to date, version', version)
+        return version
+
+    snapshot = load_static_data_snapshot(version)
+    if snapshot is None:
+        print('Fetching static data version', version)
+        snapshot = fetch_static_data_snapshot(version)
+        save_static_data_snapshot(snapshot)
+
+    return load_static_data(snapshot)
+
+
+def summoners_in_db(summoner_ids, region):
+    """
+    Returns the set of `summoner_ids` that have a Summoner in the DB for `region`, using a single query.
+    """
+    return set(Summoner.objects.filter(region=region, summoner_id__in=list(summoner_ids)).values_list(
+        'summoner_id', flat=True))
+
+
+def bulk_create_summoners(summoner_dtos, region, attempts=3):
     """
-    update_champions()
-    update_items()
-    update_summoner_spells()
+    Insert a Summoner for each summoner DTO with a single INSERT, skipping summoners already in the DB.
+
+    Sometimes requests will go out synchronously for the same summoner (ex. two tasks caching the same
+    match participants), so a summoner may be inserted by someone else after we checked for it.
+    Duplicate summoners are prevented via the unique_together constraint on summoner_id and region:
+    when the insert hits it, nothing is inserted, and we drop the summoners that now exist and try again.
+    """
+    summoners = dict((dto['id'], dto) for dto in summoner_dtos)
+
+    for attempt in range(attempts):
+        if not summoners:
+            return
+        try:
+            with transaction.atomic():
+                Summoner.objects.bulk_create([Summoner(summoner_id=dto['id'],
+                                                       name=dto['name'],
+                                                       std_name=dto['name'].replace(' ', '').lower(),
+                                                       profile_icon_id=dto['profileIconId'],
+                                                       revision_date=dto['revisionDate'],
+                                                       summoner_level=dto['summonerLevel'],
+                                                       region=region)
+                                              for dto in summoners.values()])
+            return
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+            for summoner_id in summoners_in_db(summoners, region):
+                del summoners[summoner_id]
 
 
 def get_recent_matches(summoner_id, region):
@@ -269,8 +482,9 @@ def get_recent_matches(summoner_id, region):
     -first, we get match history.
         -game stats
         -IDs of participants
-    -then we make a list of summoner IDs that we don't have in the DB
-        -this gets broken up into MAX_IDS chunks and each chunk is a queried as a single call for basic summoner data
+    -then we make a list of summoner IDs that we don't have in the DB (a single query)
+        -this is queried with a single get_summoners() call, which riotwatcher splits into requests of
+         at most 40 IDs and sends concurrently
 
     Since match history returns the last 10 games, and each game can have 9 other players
     (assuming non-hexakill mode) - that's 90 potentially unknown summoner IDs + 1 for the summoner in question,
@@ -279,6 +493,11 @@ def get_recent_matches(summoner_id, region):
     91 / 40 = 2.275 rounded up is 3 queries at most for summoner ID data.
 
     3 + 1 (for the initial match history call) = 4 calls at most.
+
+    The new summoners and games (with their stats and players) are then written in one transaction,
+    using bulk INSERTs (see save_recent_games()).
+
+    Returns the set of summoner IDs of the fellow players of those games (ex. for api.crawler to visit next).
     """
 
     #print 'get_recent_matches()', summoner_id, region
@@ -292,115 +511,112 @@ def get_recent_matches(summoner_id, region):
             for p in g['fellowPlayers']:
                 unique_players.add(p['summonerId'])
 
-    # Now we take note of any summoner IDs we already have cached (so we can remove them).
-    to_remove = set()
-    for p in unique_players:
-        try:
-            Summoner.objects.filter(region=region).get(summoner_id=p)
-            to_remove.add(p)
-        except ObjectDoesNotExist:
-            pass
-
-    # Remove the already cached summoner IDs from the working set.
-    for p in to_remove:
-        unique_players.remove(p)
-
-    player_list = list(unique_players)  # make a list of the set, so we can call chunks() on it
+    fellow_players = set(unique_players)
 
     # Don't forget, we have to check for the summoner ID whose history we're examining as well!
-    try:
-        Summoner.objects.filter(region=region).get(summoner_id=summoner_id)
-    except ObjectDoesNotExist:  # if it isn't cached, and it isn't in the list yet, add it
-        if summoner_id not in player_list:
-            player_list.append(summoner_id)
+    unique_players.add(summoner_id)
 
-    query_list = list(chunks(player_list, MAX_IDS))  # query_list now holds a list of lists of at most MAX_ID elements
+    # Remove the summoner IDs we already have cached from the working set, in a single query.
+    unique_players -= summoners_in_db(unique_players, region)
 
-    # Now ask the API for info on summoners, at most MAX_ID at a time.
+    # Now ask the API for info on summoners.
     #print 'Now asking for participants...'
-    summoner_dto = []
-    for i in query_list:
-        summoner_dto.append(riot_api.get_summoners(ids=i, region=region))
+    summoner_dto = riot_api.get_summoners(ids=list(unique_players), region=region) if unique_players else {}
 
     #print 'Done getting participants!'
 
-    # TODO: This part is sometimes getting duplicate summoners! (fixed?)
-    # Now put those summoner DTOs in the cache.
-    for chunk in summoner_dto:
-        for player in chunk:
-            # for v in chunk[player]:
-            #     print v, len(v)
-            #print u'ADDING summoner {}'.format(chunk[player]['name'])
-            summoner = Summoner(summoner_id=chunk[player]['id'],
-                                name=chunk[player]['name'],
-                                std_name=chunk[player]['name'].replace(' ', '').lower(),
-                                profile_icon_id=chunk[player]['profileIconId'],
-                                revision_date=chunk[player]['revisionDate'],
-                                summoner_level=chunk[player]['summonerLevel'],
-                                region=region)
-
-            # Sometimes requests will go out synchronously for the same summoner.
-            # This means the cache is not hit and a double query for a single summoner occurs.
-            # Duplicate summoners are prevented via the unique_together constraint on summoner_id and region,
-            # which will throw IntegrityError and prevent the dupe from being made.
-            try:
-                #print summoner.name, len(summoner.name)
-                summoner.save()
-            except IntegrityError:
-                pass
-
-    # Requires summoners (as well as all related field values) to be cached before-hand (summoner caching done above).
-    for match in recent['games']:
-        # first fill in the simple stuff
-        game = Game(summoner_id=Summoner.objects.filter(region=region).get(summoner_id=summoner_id),
-                    champion_id=Champion.objects.get(champion_id=match['championId']),
-                    create_date=match['createDate'],
-                    game_id=match['gameId'],
-                    game_mode=match['gameMode'],
-                    game_type=match['gameType'],
-                    invalid=match['invalid'],
-                    ip_earned=match['ipEarned'],
-                    level=match['level'],
-                    map_id=match['mapId'],
-                    spell_1=SummonerSpell.objects.get(spell_id=match['spell1']),
-                    spell_2=SummonerSpell.objects.get(spell_id=match['spell2']),
-                    sub_type=match['subType'],
-                    team_id=match['teamId'],
-                    region=region,
-                    champion_key=Champion.objects.get(champion_id=match['championId']).key)
-
-        stats = RawStat()
-
-        # Here we add stats that were returned (only stats that aren't None or 0 will be returned by API)
-        for i in match['stats']:
-            setattr(stats, inflection.underscore(i), match['stats'][i])
-
-        stats.save()
-
-        # associate the RawStat object with this game
-        game.stats = stats
-
-        game_saved = False
-
-        # Ensures no dupes of Game (or any related objects).
+    # Now put those summoner DTOs and the games in the cache, all in one transaction.
+    # Another task saving the same summoner's games at the same time makes our insert fail on the unique_together
+    # constraint of Game; then everything is rolled back and we try again, skipping the games it saved.
+    for attempt in range(2):
         try:
-            game.save()
-            game_saved = True
+            with transaction.atomic():
+                bulk_create_summoners(summoner_dto.values(), region)
+                save_recent_games(summoner_id, region, recent['games'])
+            return fellow_players
         except IntegrityError:
-            pass
-
-        # if game saved, we're good and just need to add the participating players
-        if game_saved:
-            # associate each Player object with this game
-            if 'fellowPlayers' in match:
-                for p in match['fellowPlayers']:
-                    player = Player(champion=Champion.objects.get(champion_id=p['championId']),
-                                    summoner=Summoner.objects.filter(region=region).get(summoner_id=p['summonerId']),
-                                    team_id=p['teamId'],
-                                    participant_of=game)
-                    player.save()
-        else:  # if it didn't save, we can get rid of the stats object too.
-            stats.delete()
+            if attempt:
+                raise
+
+
+def _bulk_create_with_ids(model, objs):
+    """
+    bulk_create() that also sets the primary keys of `objs`, so other rows can point to them.
+
+    bulk_create() sets them where the database returns the ids of a bulk INSERT (PostgreSQL).
+    Other databases get one INSERT per object.
+    """
+    if not objs:
+        return
+    if connection.features.can_return_ids_from_bulk_insert:
+        model.objects.bulk_create(objs)
+    else:
+        for obj in objs:
+            obj.save(force_insert=True)
+
+
+def save_recent_games(summoner_id, region, games):
+    """
+    Store games from a recent games DTO, with their stats and participants, using a few bulk INSERTs.
+
+    Games already in the DB (matched by region, game_id and summoner) are skipped before anything is written
+    for them. Requires summoners (as well as all related field values) to be cached before-hand.
+    Should be called in a transaction.
+    """
+    summoner = Summoner.objects.get(region=region, summoner_id=summoner_id)
+
+    # Ensures no dupes of Game (or any related objects).
+    known_games = set(Game.objects.filter(region=region, summoner_id=summoner,
+                                          game_id__in=[match['gameId'] for match in games]).values_list(
+        'game_id', flat=True))
+    new_games = [match for match in games if match['gameId'] not in known_games]
+    if not new_games:
+        return
+
+    # Primary keys of the participating summoners, by summoner ID.
+    participant_ids = set(p['summonerId'] for match in new_games for p in match.get('fellowPlayers', ()))
+    participants = dict(Summoner.objects.filter(region=region, summoner_id__in=list(participant_ids)).values_list(
+        'summoner_id', 'id'))
+
+    # Here we add stats that were returned (only stats that aren't None or 0 will be returned by API)
+    stats_list = [raw_stat_mapper.build(match['stats']) for match in new_games]
+    _bulk_create_with_ids(RawStat, stats_list)
+
+    game_list = []
+    for match, stats in zip(new_games, stats_list):
+        # Static data comes from static_registry, no queries needed.
+        champion = static_registry.champion(match['championId'])
+        game_list.append(Game(summoner_id=summoner,
+                              champion_id=champion,
+                              create_date=match['createDate'],
+                              game_id=match['gameId'],
+                              game_mode=match['gameMode'],
+                              game_type=match['gameType'],
+                              invalid=match['invalid'],
+                              ip_earned=match['ipEarned'],
+                              level=match['level'],
+                              map_id=match['mapId'],
+                              spell_1=static_registry.summoner_spell(match['spell1']),
+                              spell_2=static_registry.summoner_spell(match['spell2']),
+                              stats=stats,
+                              sub_type=match['subType'],
+                              team_id=match['teamId'],
+                              region=region,
+                              champion_key=champion.key))
+    _bulk_create_with_ids(Game, game_list)
+
+    # associate each Player object with its game
+    player_list = []
+    for match, game in zip(new_games, game_list):
+        for p in match.get('fellowPlayers', ()):
+            if p['summonerId'] not in participants:
+                print('No summoner {} ({}) to add to game {}'.format(p['summonerId'], region, game.game_id))
+                continue
+            player_list.append(Player(champion=static_registry.champion(p['championId']),
+                                      summoner_id=participants[p['summonerId']],
+                                      team_id=p['teamId'],
+                                      participant_of=game))
+    Player.objects.bulk_create(player_list)
 
 
 # summoner_ids is expected to be a list of 1 or more summoner IDs
@@ -428,13 +644,14 @@ def standardize_name(str):
     return str.replace(' ', '').lower()
 
 
-def get_league_by_summoner_id(summoner_id, region):
+def get_league_by_summoner_id(summoner_id, region, max_age=None):
     """
     Gets league data, given a summoner ID and region, and stores it in the DB.
 
     Checks for a matching league in the DB and updates that if it exists,
     otherwise creates a new League.
     Matches are made by comparing: region, queue, name, and tier.
+    Leagues written less than `max_age` (default `CACHE_LEAGUE`) ago are left as they are, see save_league().
 
     League queries to the Riot API return the following data, with entries for each league that
     the summoner is involved in (ex. solo queue league, ranked team A league, ranked team B league, etc:
@@ -451,63 +668,144 @@ def get_league_by_summoner_id(summoner_id, region):
         -wins
         -division
     """
-    # get_league() returns a dict with the keys being equal to the summoner_ids
-    # We only ask for a single summoner's info here, so we only care about the one value.
-    league_dto = riot_api.get_league(summoner_ids=[summoner_id], region=region)[str(summoner_id)]
-    
-    # league_dto is a list with elements for each ladder-team combination
+    # iter_league() yields (summoner ID, league) for each ladder-team combination the summoner is in,
     # ex. Solo Queue, Team A (5x5), Team B (5x5), Team C (3x3), etc
-    for i in league_dto:
-        league_ele = i
+    # The response is cached for a while (see riotwatcher.cache.DEFAULT_TTLS), so it is decoded whole and shared
+    # with concurrent lookups of the same summoner instead of being streamed one league at a time.
+    # We only ask for a single summoner's info here, so the ID is always summoner_id.
+    for participant_id, league_ele in riot_api.iter_league(summoner_ids=[summoner_id], region=region):
 
         # Keys of league_dto: tier, queue, participantId, name, entries
-    
-        # Can we match this data to an League in the DB?
-        try:
-            matching_league = League.objects.filter(
-                region=region).filter(
-                queue=league_ele['queue']).filter(
-                name=league_ele['name']).get(
-                tier=league_ele['tier'])
-            matched = True
-            print('Found matching League: {} {} {} {}'.format(matching_league.region, matching_league.queue, matching_league.name, matching_league.tier))
-
-        # We couldn't find a matching League, so we need to create one.
-        except ObjectDoesNotExist:
-            matched = False
-            matching_league = League(region=region, queue=league_ele['queue'], name=league_ele['name'], tier=league_ele['tier'])
-            print('Creating new League: {} {} {} {}'.format(matching_league.region, matching_league.queue, matching_league.name, matching_league.tier))
-            matching_league.save()
-    
+        save_league(league_ele, region, max_age)
+
+
+def get_leagues_by_summoner_ids(summoner_ids, region, max_age=None):
+    """
+    Gets league data for several summoners with a single get_league() call, and stores it in the DB.
+
+    Members of a league get the same league back, so each league is stored once, see save_league().
+    Returns the number of leagues that were written.
+    """
+    leagues = {}
+    for league_list in riot_api.get_league(summoner_ids=list(summoner_ids), region=region).values():
+        for league_ele in league_list:
+            leagues[(league_ele['queue'], league_ele['name'], league_ele['tier'])] = league_ele
+
+    return sum(1 for league_ele in leagues.values() if save_league(league_ele, region, max_age))
+
+
+def save_league(league_ele, region, max_age=None):
+    """
+    Stores a League DTO and its entries, unless the league was written less than `max_age`
+    (default `CACHE_LEAGUE`) ago, by this or any other member's lookup.
+
+    Matches are made by comparing: region, queue, name, and tier.
+    Returns True if the league was written.
+    """
+    if max_age is None:
+        max_age = CACHE_LEAGUE
+
+    # Can we match this data to an League in the DB? If not, we create one.
+    # The league and its entries are written together, so nobody reads a half-updated league.
+    with transaction.atomic():
+        matching_league, created = League.objects.get_or_create(region=region,
+                                                                queue=league_ele['queue'],
+                                                                name=league_ele['name'],
+                                                                tier=league_ele['tier'])
+        label = '{} {} {} {}'.format(matching_league.region, matching_league.queue,
+                                     matching_league.name, matching_league.tier)
+
+        # Claim the refresh: only one of several lookups racing for a stale league gets to write it.
+        now = datetime.now()
+        stale = League.objects.filter(pk=matching_league.pk).filter(
+            Q(last_update__isnull=True) | Q(last_update__lt=now - max_age))
+        if not stale.update(last_update=now):
+            print('League FRESH: {}'.format(label))
+            return False
+
+        print('{} League: {}'.format('Creating new' if created else 'Found matching', label))
+
         # Now we handle the entries, which are players (solo queue) or teams (team queue)
+        save_league_entries(matching_league, league_ele['entries'], created)
+        return True
+
+
+# Fields of LeagueEntry compared by save_league_entries(), in the order of league_entry_values().
+LEAGUE_ENTRY_FIELDS = ('division', 'is_fresh_blood', 'is_hot_streak', 'is_inactive', 'is_veteran',
+                       'league_points', 'player_or_team_name', 'wins',
+                       'series_losses', 'series_progress', 'series_target', 'series_wins')
+
+
+def league_entry_values(entry_dto):
+    """
+    Values of LEAGUE_ENTRY_FIELDS for a LeagueEntry DTO (the series fields are None unless it is in a series).
+    """
+    series = entry_dto.get('miniSeries', {})
+    return (entry_dto['division'],
+            entry_dto['isFreshBlood'],
+            entry_dto['isHotStreak'],
+            entry_dto['isInactive'],
+            entry_dto['isVeteran'],
+            entry_dto['leaguePoints'],
+            entry_dto['playerOrTeamName'],
+            entry_dto['wins'],
+            series.get('losses'),
+            series.get('progress'),
+            series.get('target'),
+            series.get('wins'))
+
+
+def save_league_entries(league, entries, created=False):
+    """
+    Make the LeagueEntries of `league` match `entries`, an exhaustive list of LeagueEntry DTOs of its participants.
+
+    Entries are matched on player_or_team_id (unique per league), see sync_rows().
+    Pass created=True for a league that was just created (it has no entries). Should be called in a transaction.
+    """
+    rows = dict((entry['playerOrTeamId'], league_entry_values(entry)) for entry in entries)
+    stored = LeagueEntry.objects.none() if created else league.leagueentry_set.all()
+    new, updated, departed = sync_rows(stored, 'player_or_team_id', LEAGUE_ENTRY_FIELDS, rows, league=league)
+
+    print('{} {} {} {} entries: {} new, {} updated, {} departed'.format(league.region, league.queue, league.name, league.tier,
+                                                                        new, updated, departed))
+
+
+def sync_rows(queryset, key, fields, rows, delete=True, **parent):
+    """
+    Make the rows of `queryset` match `rows`, a dict of {`key` value: tuple of `fields` values}.
+
+    Stored rows are read with one query and compared with `rows`, so only new rows are INSERTed (in bulk, with
+    the `parent` field values), only changed ones UPDATEd, and those missing from `rows` DELETEd with a single
+    statement (unless `delete` is False). Returns the number of new, updated and departed rows.
+    Should be called in a transaction.
+    """
+    model = queryset.model
+    stored = {}
+    for row in queryset.values_list('pk', key, *fields):
+        stored[row[1]] = (row[0], row[2:])
+
+    new_objs = []
+    updated = 0
+    for key_value, values in rows.items():
+        values = tuple(values)
+        if key_value not in stored:
+            field_values = dict(zip(fields, values))
+            field_values[key] = key_value
+            field_values.update(parent)
+            new_objs.append(model(**field_values))
+            continue
+        pk, stored_values = stored[key_value]
+        if values != stored_values:
+            model.objects.filter(pk=pk).update(**dict(zip(fields, values)))
+            updated += 1
+
+    departed = [pk for key_value, (pk, _) in stored.items() if key_value not in rows]
+    if departed and delete:
+        model.objects.filter(pk__in=departed).delete()
+    model.objects.bulk_create(new_objs)
+
+    return len(new_objs), updated, len(departed)
 
-        # Since this is an exhaustive list of participants in this league,
-        # we replace all entries of this league with the fresh data.
-        for j in matching_league.leagueentry_set.all():
-            j.delete()
-
-        for k in league_ele['entries']:
-            # First we fill in the info we know will exist.
-            new_entry = LeagueEntry(division=k['division'],
-                                    is_fresh_blood=k['isFreshBlood'],
-                                    is_hot_streak=k['isHotStreak'],
-                                    is_inactive=k['isInactive'],
-                                    is_veteran=k['isVeteran'],
-                                    league_points=k['leaguePoints'],
-                                    player_or_team_id=k['playerOrTeamId'],
-                                    player_or_team_name=k['playerOrTeamName'],
-                                    wins=k['wins'])
-
-            # If the entry is in a series:
-            if 'miniSeries' in k:
-                new_entry.series_losses = k['miniSeries']['losses']
-                new_entry.series_progress = k['miniSeries']['progress']
-                new_entry.series_target = k['miniSeries']['target']
-                new_entry.series_wins = k['miniSeries']['wins']
-
-            new_entry.league = matching_league
-
-            new_entry.save()
 
 def get_teams_by_summoner_id(summoner_id, region):
     """
@@ -515,7 +813,7 @@ def get_teams_by_summoner_id(summoner_id, region):
 
     Each summoner can have 0 or more teams. This checks for matching teams in the DB
     and updates them if they are present, otherwise it creates a new team.
-    Matches are made by comparing region and full_id.
+    Matches are made by comparing region and full_id, see save_team().
 
     Team queries to the Riot API return the following data, per team:
     -timestamps for roster invites
@@ -527,109 +825,167 @@ def get_teams_by_summoner_id(summoner_id, region):
     -team basic data (e.g. tag, name, etc)
     -timestamps for most recent game, team modified, team created
     """
-    # Riot API returns HTTP 404 if summoner is not on any teams.
+    # Skipped if one of the summoner's teams was fetched less than CACHE_TEAM ago,
+    # ex. while refreshing the teams of a teammate.
+    get_teams_by_summoner_ids([summoner_id], region)
+
+
+def team_refresh_summoner_ids(summoner_id, region, games=10):
+    """
+    IDs of the summoners whose teams are worth refreshing along with `summoner_id`'s: the summoner,
+    the participants of their `games` most recent stored games and the members of their stored teams.
+    """
+    recent_games = Game.objects.filter(region=region, summoner_id__summoner_id=summoner_id).order_by(
+        '-create_date').values_list('id', flat=True)[:games]
+    summoner_ids = set([summoner_id])
+    summoner_ids.update(Player.objects.filter(participant_of__in=list(recent_games)).values_list(
+        'summoner__summoner_id', flat=True))
+    summoner_ids.update(TeamMemberInfo.objects.filter(
+        roster__team__region=region,
+        roster__teammemberinfo__player_id=summoner_id).values_list('player_id', flat=True))
+    return summoner_ids
+
+
+def get_teams_by_summoner_ids(summoner_ids, region, max_age=None):
+    """
+    Get team data for several summoners with a single get_teams_for_summoners() call (split into requests of
+    max_ids['team'] IDs by riotwatcher), and store it in the DB.
+
+    Summoners asked about (see Summoner.teams_update) or on a team fetched less than `max_age`
+    (default `CACHE_TEAM`) ago aren't asked about again, including those who turned out to be on no team,
+    and teams returned for several of the summoners (ex. for a whole roster) are stored once, see save_team().
+    Returns the number of teams that were written.
+    """
+    if max_age is None:
+        max_age = CACHE_TEAM
+    now = datetime.now()
+
+    summoner_ids = set(summoner_ids)
+    summoner_ids -= set(Summoner.objects.filter(
+        summoner_id__in=list(summoner_ids),
+        region=region,
+        teams_update__gte=now - max_age).values_list('summoner_id', flat=True))
+    summoner_ids -= set(TeamMemberInfo.objects.filter(
+        player_id__in=list(summoner_ids),
+        roster__team__region=region,
+        roster__team__last_update__gte=now - max_age).values_list('player_id', flat=True))
+    if not summoner_ids:
+        return 0
+
+    # Riot API returns HTTP 404 if none of the summoners are on any teams.
     try:
-        teams_dto = riot_api.get_teams_for_summoner(summoner_id, region)
-        got_teams = True
+        teams_by_summoner = riot_api.get_teams_for_summoners(list(summoner_ids), region)
     except LoLException as e:
-        got_teams = False
-        if e == error_404:
-            print('Summoner ID', summoner_id, 'is not on any teams (error_404).')
-        else:
-            got_teams = False
+        if e != error_404:
             print('ERROR getting teams:', e)
+            return 0
+        teams_by_summoner = {}
+    Summoner.objects.filter(summoner_id__in=list(summoner_ids), region=region).update(teams_update=now)
+
+    teams = dict((team['fullId'], team) for team_list in teams_by_summoner.values() for team in team_list)
+    print('Got {} teams for {} summoners ({})'.format(len(teams), len(summoner_ids), region))
+    return sum(1 for team in teams.values() if save_team(team, region))
+
+
+def get_teams_by_team_ids(team_ids, region):
+    """
+    Get team data, given team (full) IDs, with a single get_teams() call and store it in the DB.
+    Returns the number of teams that were written.
+    """
+    try:
+        teams = riot_api.get_teams(list(set(team_ids)), region)
+    except LoLException as e:
+        print('ERROR getting teams:', e)
+        return 0
+    return sum(1 for team in teams.values() if save_team(team, region))
+
+
+# Fields of Team set by save_team() (everything that isn't a related field), with their Team DTO keys.
+TEAM_FIELDS = (('create_date', 'createDate'),
+               ('full_id', 'fullId'),
+               ('last_game_date', 'lastGameDate'),     # missing if the team hasn't played a game (this season?)
+               ('last_joined_ranked_team_queue_date', 'lastJoinedRankedTeamQueueDate'),
+               ('modify_date', 'modifyDate'),
+               ('name', 'name'),
+               ('last_join_date', 'lastJoinDate'),
+               ('second_last_join_date', 'secondLastJoinDate'),
+               ('third_last_join_date', 'thirdLastJoinDate'),
+               ('status', 'status'),
+               ('tag', 'tag'))
+
+TEAM_MEMBER_FIELDS = ('invite_date', 'join_date', 'status')
+TEAM_STAT_DETAIL_FIELDS = ('average_games_played', 'wins', 'losses')
+
+
+def save_team(team, region):
+    """
+    Stores a Team DTO, with its roster, stats and match history, upserting on region and full_id.
+
+    A stored team whose modify_date and last_game_date are unchanged is left as it is (besides last_update).
+    Otherwise only what changed is written: roster members and stats are diffed (see sync_rows()) and match
+    history summaries are INSERTed in bulk for games (by game_id) that aren't stored yet; nothing is deleted
+    and recreated.
+    Returns True if anything was written.
+    """
+    team_values = dict((field, team.get(dto_key)) for field, dto_key in TEAM_FIELDS)
+    team_values['last_update'] = datetime.now()
+    roster_dto = team['roster']
+
+    with transaction.atomic():
+        try:
+            matching_team = Team.objects.select_related('roster').filter(region=region).get(full_id=team['fullId'])
+        except ObjectDoesNotExist:
+            matching_team = None
+
+        if matching_team is None:
+            # No match found, so create a new Team (and its Roster first, which it points to).
+            print('No matching team found. Creating a new Team {} {}'.format(region, team['name']))
+            roster = Roster.objects.create(owner_id=roster_dto['ownerId'])
+            matching_team = Team.objects.create(roster=roster, region=region, **team_values)
+        else:
+            print('Found matching Team {} {}'.format(matching_team.region, matching_team.name))
+            # modify_date changes with the team (ex. its roster), last_game_date with every game it plays.
+            if (matching_team.modify_date == team_values['modify_date'] and
+                    matching_team.last_game_date == team_values['last_game_date']):
+                print('Team UNCHANGED: {} {}'.format(matching_team.region, matching_team.name))
+                Team.objects.filter(pk=matching_team.pk).update(last_update=team_values['last_update'])
+                return False
+            Team.objects.filter(pk=matching_team.pk).update(**team_values)
+            roster = matching_team.roster
+            if roster.owner_id != roster_dto['ownerId']:
+                Roster.objects.filter(pk=roster.pk).update(owner_id=roster_dto['ownerId'])
+
+        # Roster members are unique per roster by player_id, stats per team by team_stat_type.
+        sync_rows(roster.teammemberinfo_set.all(), 'player_id', TEAM_MEMBER_FIELDS,
+                  dict((member['playerId'], (member['inviteDate'], member['joinDate'], member['status']))
+                       for member in roster_dto['memberList']),
+                  roster=roster)
+        sync_rows(matching_team.teamstatdetail_set.all(), 'team_stat_type', TEAM_STAT_DETAIL_FIELDS,
+                  dict((stats['teamStatType'], (stats['averageGamesPlayed'], stats['wins'], stats['losses']))
+                       for stats in team['teamStatDetails']),
+                  team=matching_team)
+
+        # Setup and save the MatchHistorySummary models for the Team, if it has a history.
+        # A summary of a game doesn't change, so only games we don't have yet are added.
+        match_history_dto = team.get('matchHistory', [])
+        known_games = set(matching_team.matchhistorysummary_set.filter(
+            game_id__in=[match['gameId'] for match in match_history_dto]).values_list('game_id', flat=True))
+        MatchHistorySummary.objects.bulk_create([
+            MatchHistorySummary(assists=match['assists'],
+                                date=match['date'],
+                                deaths=match['deaths'],
+                                game_id=match['gameId'],
+                                game_mode=match['gameMode'],
+                                invalid=match['invalid'],
+                                kills=match['kills'],
+                                map_id=match['mapId'],
+                                opposing_team_kills=match['opposingTeamKills'],
+                                opposing_team_name=match['opposingTeamName'],
+                                win=match['win'],
+                                team=matching_team)
+            for match in match_history_dto if match['gameId'] not in known_games])
+        return True
 
-    if got_teams:
-        # teams_dto is a list that will contain an entry for each team the summoner is on.
-
-        for team in teams_dto:
-            # Can we match this data to a Team in the DB?
-            try:
-                matching_team = Team.objects.filter(region=region).get(full_id=team['fullId'])
-                # We found a match, so set the working Team to that.
-                print('Found matching Team {} {}'.format(matching_team.region, matching_team.name))
-                matched = True
-                new_team = matching_team
-            except ObjectDoesNotExist:
-                # No match found, so create a new Team.
-                matched = False
-                print('No matching team found. Creating a new Team...')
-                new_team = Team()
-
-            # We get all the Team data from Riot API call,
-            # so we can delete everything and just create new models below.
-            if matched:
-                new_team.roster.delete()
-                new_team.delete()
-
-            # Set everything in the Team model that isn't a related field.
-            new_team.create_date = team['createDate']
-            new_team.full_id = team['fullId']
-
-            # If team hasn't played a game (this season?)
-            if 'lastGameDate' in team:
-                new_team.last_game_date = team['lastGameDate']
-            new_team.last_joined_ranked_team_queue_date = team['lastJoinedRankedTeamQueueDate']
-            new_team.modify_date = team['modifyDate']
-            new_team.name = team['name']
-            new_team.last_join_date = team['lastJoinDate']
-            new_team.second_last_join_date = team['secondLastJoinDate']
-            new_team.third_last_join_date = team['thirdLastJoinDate']
-            new_team.status = team['status']
-            new_team.tag = team['tag']
-            new_team.region = region
-
-            # This leaves: roster, teamStatDetails, matchHistory.
-            roster_dto = team['roster']
-            team_stat_details_dto = team['teamStatDetails']
-
-            # If team hasn't played a game (extends past this season, so no games played ever!)
-            if 'matchHistory' in team:
-                match_history_dto = team['matchHistory']
-
-            # Setup and save the Roster model.
-            new_roster = Roster(owner_id=roster_dto['ownerId'])
-            new_roster.save()
-
-            # We can set the roster relation on the Team model now, and save it.
-            new_team.roster = new_roster
-            new_team.save()
-
-            # Setup and save the TeamMemberInfo models for this Roster.
-            for member in roster_dto['memberList']:
-                new_member = TeamMemberInfo(invite_date=member['inviteDate'],
-                                            join_date=member['joinDate'],
-                                            player_id=member['playerId'],
-                                            status=member['status'],
-                                            roster=new_roster)
-                new_member.save()
-
-            # Setup and save the TeamStatDetail models for the Team.
-            for stats in team_stat_details_dto:
-                new_stats = TeamStatDetail(team_stat_type=stats['teamStatType'],
-                                           average_games_played=stats['averageGamesPlayed'],
-                                           wins=stats['wins'],
-                                           losses=stats['losses'],
-                                           team=new_team)
-                new_stats.save()
-
-            # Setup and save the MatchHistorySummary models for the Team, if it has a history.
-
-            if match_history_dto:
-                for match in match_history_dto:
-                    new_match = MatchHistorySummary(assists=match['assists'],
-                                                    date=match['date'],
-                                                    deaths=match['deaths'],
-                                                    game_id=match['gameId'],
-                                                    game_mode=match['gameMode'],
-                                                    invalid=match['invalid'],
-                                                    kills=match['kills'],
-                                                    map_id=match['mapId'],
-                                                    opposing_team_kills=match['opposingTeamKills'],
-                                                    opposing_team_name=match['opposingTeamName'],
-                                                    win=match['win'],
-                                                    team=new_team)
-                    new_match.save()
 
 def reset_teams():
     """
@@ -654,28 +1010,57 @@ def get_stats_summary_by_summoner_id(summoner_id, region):
     stats_dto = riot_api.get_stat_summary(summoner_id, region)
 
     this_summoner = Summoner.objects.filter(region=region).get(summoner_id=summoner_id)
-    new_player_stat = PlayerStat(summoner=this_summoner)
-    new_player_stat.save()
+    save_stats_summary(this_summoner, stats_dto)
 
-    # There are 11 entries in stats_dto's playerStatSummaries.
-    for i in stats_dto['playerStatSummaries']:
-        new_player_stats_summary = PlayerStatsSummary(player=new_player_stat,
-                                                      wins=i['wins'],
-                                                      modify_date=i['modifyDate'],
-                                                      player_stat_summary_type=i['playerStatSummaryType'])
-        # Losses only listed for ranked queue types.
-        if 'losses' in i:
-            new_player_stats_summary.losses = i['losses']
 
-        new_player_stats_summary.save()
-
-        agg_stats_dto = i['aggregatedStats']
-
-        new_agg_stats = AggregatedStat()
-
-        # Assign each attr of agg_stats_dto to the model.
-        for j in agg_stats_dto:
-            setattr(new_agg_stats, inflection.underscore(j), agg_stats_dto[j])
+def save_stats_summary(summoner, stats_dto):
+    """
+    Stores a PlayerStatsSummaryList DTO for `summoner`, updating its stored stats in place.
 
-        new_agg_stats.player_stats = new_player_stats_summary
-        new_agg_stats.save()
\ No newline at end of file
+    Each summoner has one PlayerStat, with a PlayerStatsSummary (and its AggregatedStat) per summary type.
+    Summaries whose modify_date hasn't changed are skipped, changed ones are UPDATEd and new ones INSERTed
+    in bulk, so refreshing the stats of a summoner who hasn't played since is a couple of queries.
+    Returns the number of summaries that were written.
+    """
+    with transaction.atomic():
+        player_stat, created = PlayerStat.objects.get_or_create(summoner=summoner)
+
+        # Stored summaries, by type: (pk, modify_date).
+        stored = {}
+        if not created:
+            for pk, summary_type, modify_date in player_stat.playerstatssummary_set.values_list(
+                    'pk', 'player_stat_summary_type', 'modify_date'):
+                stored[summary_type] = (pk, modify_date)
+
+        new_summaries = []
+        new_agg_stats_dtos = []
+        updated = 0
+        # There are 11 entries in stats_dto's playerStatSummaries.
+        for i in stats_dto['playerStatSummaries']:
+            summary_type = i['playerStatSummaryType']
+            # Losses only listed for ranked queue types.
+            summary_values = dict(wins=i['wins'], losses=i.get('losses'), modify_date=i['modifyDate'])
+
+            if summary_type not in stored:
+                new_summaries.append(PlayerStatsSummary(player=player_stat,
+                                                        player_stat_summary_type=summary_type,
+                                                        **summary_values))
+                new_agg_stats_dtos.append(i['aggregatedStats'])
+                continue
+
+            pk, modify_date = stored[summary_type]
+            if modify_date == i['modifyDate']:
+                continue
+
+            PlayerStatsSummary.objects.filter(pk=pk).update(**summary_values)
+            agg_stats_values = aggregated_stat_mapper.values(i['aggregatedStats'], player_stats_id=pk)
+            if not AggregatedStat.objects.filter(player_stats_id=pk).update(**agg_stats_values):
+                AggregatedStat.objects.create(**agg_stats_values)
+            updated += 1
+
+        _bulk_create_with_ids(PlayerStatsSummary, new_summaries)
+        AggregatedStat.objects.bulk_create([aggregated_stat_mapper.build(agg_stats_dto, player_stats_id=summary.pk)
+                                            for summary, agg_stats_dto in zip(new_summaries, new_agg_stats_dtos)])
+
+    print('Stats summary of {}: {} new, {} updated'.format(summoner.name, len(new_summaries), updated))
+    return len(new_summaries) + updated
@@ -15,10 +15,17 @@ from celery.result import AsyncResult
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.reverse import reverse
 
 from api.serializers import *
-from api.utils import standardize_name
+from api.utils import riot_api, standardize_name
+
+
+class PageOfTen(PageNumberPagination):
+    """Pagination of the list views that can return many objects (`?page=N`)."""
+    page_size = 10
+
 
 @api_view(('GET',))
 def api_root(request, format=None):
@@ -46,7 +53,7 @@ class SummonerList(generics.ListAPIView):
     Optionally allows for filtering via the `region` portion of the URL.
     """
     serializer_class = SummonerSerializer
-    paginate_by = 10
+    pagination_class = PageOfTen
 
     def get_queryset(self, format=None):
         """
@@ -227,7 +234,7 @@ class GameList(generics.ListAPIView):
     """
     queryset = Game.objects.all()
     serializer_class = GameSerializer
-    paginate_by = 10
+    pagination_class = PageOfTen
 
     def get_queryset(self):
         region = self.kwargs.get('region', None)
@@ -271,7 +278,7 @@ class LeagueList(generics.ListAPIView):
     """
     queryset = League.objects.all()
     serializer_class = LeagueSerializer
-    paginate_by = 10
+    pagination_class = PageOfTen
 
     def get_queryset(self):
         region = self.kwargs.get('region', None)
@@ -326,7 +333,7 @@ class LeagueEntryList(generics.ListAPIView):
     """
     queryset = LeagueEntry.objects.all()
     serializer_class = LeagueEntrySerializer
-    paginate_by = 10
+    pagination_class = PageOfTen
 
     def get_queryset(self):
         region = self.kwargs.get('region', None)
@@ -365,7 +372,7 @@ class TeamList(generics.ListAPIView):
     """
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
-    paginate_by = 10
+    pagination_class = PageOfTen
 
     def get_queryset(self):
         region = self.kwargs.get('region', None)
@@ -410,7 +417,7 @@ class RosterList(generics.ListAPIView):
     """
     queryset = Roster.objects.all()
     serializer_class = RosterSerializer
-    paginate_by = 10
+    pagination_class = PageOfTen
 
     def get_queryset(self):
         region = self.kwargs.get('region', None)
@@ -449,7 +456,7 @@ class TeamMemberInfoList(generics.ListAPIView):
     """
     queryset = TeamMemberInfo.objects.all()
     serializer_class = TeamMemberInfoSerializer
-    paginate_by = 10
+    pagination_class = PageOfTen
 
     def get_queryset(self):
         # region = self.kwargs.get('region', None)
@@ -529,3 +536,11 @@ def get_task_state(request):
         data = 'get_task_state(): Invalid request type.'
 
     return HttpResponse(json.dumps(data), content_type='application/json')
+
+
+def riot_api_metrics(request):
+    """
+    Riot API telemetry of every process sharing riot_api's telemetry store (calls, status codes, bytes,
+    latency and rate limit waits per region and endpoint), in the Prometheus text format.
+    """
+    return HttpResponse(riot_api.telemetry.prometheus(), content_type='text/plain; version=0.0.4')
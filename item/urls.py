@@ -1,7 +1,7 @@
-from django.conf.urls import patterns, url
-from item.views import ItemListView
+from django.conf.urls import url
+from item.views import ItemListView, view_items
 
-urlpatterns = patterns('item',
-   url(r'^all/', 'views.view_items', name='view_items'),
+urlpatterns = [
+   url(r'^all/', view_items, name='view_items'),
    url(r'^', ItemListView.as_view(template_name='item/item_base.html'), name='item_list'),
-)
\ No newline at end of file
+]
\ No newline at end of file
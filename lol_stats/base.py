@@ -13,8 +13,6 @@ import sys
 
 from django.core.exceptions import ImproperlyConfigured
 
-from riotwatcher import riotwatcher
-
 
 def get_env_variable(var_name):
     """
@@ -35,8 +33,26 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
 # Following keys are stored as environment vars and in try blocks so RTD doesn't scream.
 
+# Rate limit windows and in-flight requests are shared by every process (Celery workers, dev server)
+# through this file.
+RIOT_API_SHARED_DB = os.path.join(BASE_DIR, 'riot_api_shared.sqlite3')
+
+# Static data (champions, items, summoner spells) snapshots, one gzipped JSON file per version.
+STATIC_DATA_DIR = os.path.join(BASE_DIR, 'static_data')
+
+# Riot API responses are cached here, with a TTL per endpoint (see riotwatcher.cache.DEFAULT_TTLS).
+RIOT_API_CACHE_DB = os.path.join(BASE_DIR, 'riot_api_cache.sqlite3')
+
+# api.crawler's frontier and visited set, saved so the crawl resumes where it stopped.
+CRAWLER_CHECKPOINT = os.path.join(BASE_DIR, 'crawler_checkpoint.json.gz')
+
+# Serve riot_api's per-endpoint telemetry (calls, latency, rate limit waits) in the Prometheus text format
+# at /api/riot-api-metrics. Every process (web and Celery workers) adds its counters up in RIOT_API_SHARED_DB.
+RIOT_API_METRICS = False
+
 # my Riot API key (keep secret!)
-riot_api = riotwatcher.RiotWatcher(get_env_variable('RIOT_API_KEY'))
+# api.utils.riot_api is built with it on first use, so importing settings creates none of the files above.
+RIOT_API_KEY = get_env_variable('RIOT_API_KEY')
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = get_env_variable('DJANGO_SECRET_KEY')
@@ -94,9 +110,24 @@ STATICFILES_DIRS = (
     os.path.join(BASE_DIR, "static"),
 )
 
-TEMPLATE_DIRS = (
-    os.path.join(BASE_DIR, 'lol_stats/templates'),
-)
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [os.path.join(BASE_DIR, 'lol_stats/templates')],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.contrib.auth.context_processors.auth',
+                'django.template.context_processors.debug',
+                'django.template.context_processors.i18n',
+                'django.template.context_processors.media',
+                'django.template.context_processors.static',
+                'django.template.context_processors.tz',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
 
 REST_FRAMEWORK = {
     # 'PAGINATE_BY': 10,
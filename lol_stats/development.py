@@ -16,12 +16,13 @@ from .base import *
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
-TEMPLATE_DEBUG = True
 
 ALLOWED_HOSTS = []
 
 CORS_ORIGIN_ALLOW_ALL = True
 
+RIOT_API_METRICS = True
+
 # Application definition
 
 INSTALLED_APPS += (
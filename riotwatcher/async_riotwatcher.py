@@ -0,0 +1,331 @@
+"""
+asyncio version of RiotWatcher, built on aiohttp.
+
+AsyncRiotWatcher has the same endpoint methods as RiotWatcher, but they return coroutines, so independent
+requests can be awaited together (e.g. with asyncio.gather) and overlap within the rate limit:
+
+    w = AsyncRiotWatcher('<your-api-key>')
+    games, leagues, teams = await asyncio.gather(
+        w.get_recent_games(summoner_id),
+        w.get_league(summoner_ids=[summoner_id]),
+        w.get_teams_for_summoner(summoner_id))
+    await w.close()
+"""
+
+import asyncio
+import json
+import time
+
+import requests
+
+from .riotwatcher import (
+    BaseRequestScheduler,
+    RiotWatcher,
+    Lane,
+    SingleFlight,
+    INTERACTIVE,
+    _current_lane,
+    _endpoint,
+    _iter_loaded,
+    _loads,
+    LoLException,
+    error_404,
+    error_429,
+    raise_status)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncResponse:
+    """The parts of a requests.Response that RiotWatcher uses, read from an aiohttp response."""
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return _loads(self.content)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError('{} Error for url: {}'.format(self.status_code, self.url), response=self)
+
+
+class AsyncSessionPool:
+    """aiohttp sessions, one per API host, each with its own keep-alive connection pool.
+
+    Sessions are created on first use, from inside the event loop they will run on.
+    """
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10, gzip=True):
+        if aiohttp is None:
+            raise ImportError('AsyncRiotWatcher requires the aiohttp package')
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.gzip = gzip
+        self._sessions = {}
+
+    def get(self, host):
+        session = self._sessions.get(host)
+        if session is None:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=self.timeout,
+                headers={'Accept-Encoding': 'gzip, deflate' if self.gzip else 'identity'})
+            self._sessions[host] = session
+        return session
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
+
+
+class AsyncRequestScheduler(BaseRequestScheduler):
+    """Request scheduler for coroutines on one event loop, see BaseRequestScheduler."""
+    def __init__(self, limiter, lanes=(Lane(INTERACTIVE), ), default_lane=None):
+        BaseRequestScheduler.__init__(self, limiter, lanes, default_lane)
+        self._lock = None
+        self._conds = {}
+
+    def _condition(self, key):
+        # Created on first use, from inside the event loop they will run on.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        cond = self._conds.get(key)
+        if cond is None:
+            cond = asyncio.Condition(self._lock)
+            self._conds[key] = cond
+        return cond
+
+    async def _try_acquire(self, pools, share):
+        if not self.limiter.blocking_io:
+            return self.limiter.try_acquire(pools, share)
+        # Let callers of other keys use the scheduler while this one waits on the limiter.
+        self._lock.release()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self.limiter.try_acquire, pools, share)
+        finally:
+            await self._lock.acquire()
+
+    async def acquire(self, pools, timeout=None, lane=None):
+        """Wait until a slot is recorded in every window of pools. Returns False if timeout expires first."""
+        lane = lane if lane is not None else self.default_lane
+        share = self._share[lane]
+        key = pools[-1][0]
+        start = time.time()
+        deadline = None if timeout is None else start + timeout
+        acquired = False
+        cond = self._condition(key)
+        async with cond:
+            ticket = self._enter(key, lane)
+            try:
+                while True:
+                    wait = None
+                    if self._is_head(key, ticket):
+                        wait = await self._try_acquire(pools, share)
+                        if wait <= 0:
+                            acquired = True
+                            return True
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    try:
+                        await asyncio.wait_for(cond.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._leave(key, ticket, lane, time.time() - start, acquired)
+                cond.notify_all()
+
+
+class AsyncSingleFlight(SingleFlight):
+    """SingleFlight for coroutines on one event loop; store calls run in an executor."""
+    def __init__(self, *args, **kwargs):
+        SingleFlight.__init__(self, *args, **kwargs)
+        self._futures = {}
+
+    async def do(self, key, fn, priority=0):
+        future = self._following(self._futures, key, priority)
+        if future is not None:
+            self._stats['followers'] += 1
+            return await asyncio.shield(future)
+        flight_key = self._flight_key(key, priority)
+        future = self._futures[flight_key] = asyncio.get_running_loop().create_future()
+        self._stats['leaders'] += 1
+        try:
+            result = await (fn() if self.store is None else self._do_shared(key, fn, priority))
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Followers are cancelled with the leader, rather than waiting for a result that never comes.
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting for it.
+            future.exception()
+            raise
+        finally:
+            del self._futures[flight_key]
+
+    async def _do_shared(self, key, fn, priority=0):
+        loop = asyncio.get_running_loop()
+        flight_key = self._flight_key(key, priority)
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            data = await loop.run_in_executor(None, self._shared_result, key, priority)
+            if data is not None:
+                self._stats['shared_followers'] += 1
+                return json.loads(data)
+            if await loop.run_in_executor(None, self.store.claim, flight_key, self.claim_ttl):
+                try:
+                    result = await fn()
+                except BaseException:
+                    # Including cancellation, so other processes don't wait for the claim to expire.
+                    await loop.run_in_executor(None, self.store.release, flight_key)
+                    raise
+                await loop.run_in_executor(None, self.store.publish, flight_key, json.dumps(result),
+                                           self.result_ttl)
+                return result
+            await asyncio.sleep(self.poll_interval)
+        return await fn()
+
+    def stats(self):
+        return dict(self._stats)
+
+
+class AsyncRiotWatcher(RiotWatcher):
+    """RiotWatcher whose endpoint methods are coroutines.
+
+    Takes the same arguments as RiotWatcher; sessions and flights, if given, must be an AsyncSessionPool
+    and an AsyncSingleFlight. Passing the limiter of a RiotWatcher (or a shared backend) makes both clients
+    count against the same windows.
+    """
+    def __init__(self, key, sessions=None, flights=None, **kwargs):
+        RiotWatcher.__init__(self, key, sessions=sessions if sessions is not None else AsyncSessionPool(),
+                             flights=flights if flights is not None else AsyncSingleFlight(), **kwargs)
+        self.scheduler = AsyncRequestScheduler(self.limiter, self.scheduler.lanes, self.scheduler.default_lane)
+
+    async def close(self):
+        await self.sessions.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _send(self, proxy, full_url, args):
+        # aiohttp only takes str, int and float query values, booleans are sent the way Riot documents them.
+        params = dict((k, str(v).lower() if isinstance(v, bool) else v) for k, v in args.items())
+        async with self.sessions.get(proxy).get(full_url, params=params) as resp:
+            content = await resp.read()
+            return AsyncResponse(str(resp.url), resp.status, resp.headers, content)
+
+    async def _cache_call(self, method, *args):
+        if self.cache.backend.blocking_io:
+            return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+        return method(*args)
+
+    async def base_request(self, url, region, static=False, **kwargs):
+        proxy, full_url, args = self._build_request(url, region, static, kwargs)
+        key = self._request_key(full_url, args)
+        ttl = self._cache_ttl(url, static)
+        if ttl > 0:
+            hit, result = await self._cache_call(self.cache.get, key)
+            if hit:
+                return result
+        return await self.flights.do(key, lambda: self._send_request(proxy, full_url, args, static, key, ttl),
+                                     self._lane_priority())
+
+    async def _send_request(self, proxy, full_url, args, static, key=None, ttl=0):
+        lane = _current_lane.get()
+        endpoint = _endpoint(full_url)
+        pools = self._rate_pools(proxy, endpoint)
+        attempt = 0
+        while True:
+            # Static requests don't count against the rate limit.
+            if not static:
+                started = time.perf_counter()
+                acquired = await self.scheduler.acquire(pools, timeout=self.queue_timeout, lane=lane)
+                self.telemetry.observe_wait(proxy, endpoint, time.perf_counter() - started)
+                if not acquired:
+                    raise error_429
+            started = time.perf_counter()
+            r = await self._send(proxy, full_url, args)
+            self.telemetry.observe(proxy, endpoint, r.status_code, len(r.content), time.perf_counter() - started)
+            delay = self._retry_delay(r, attempt)
+            if delay is None:
+                break
+            attempt += 1
+            if r.status_code == 429 and not static:
+                # Hold back every worker sharing the limiter, the retry then waits in the scheduler.
+                if self.limiter.blocking_io:
+                    await asyncio.get_running_loop().run_in_executor(None, self.limiter.block, pools[-1][0], delay)
+                else:
+                    self.limiter.block(pools[-1][0], delay)
+            else:
+                await asyncio.sleep(delay)
+        raise_status(r)
+        result = _loads(r.content)
+        if ttl > 0:
+            await self._cache_call(self.cache.set, key, result, ttl)
+        return result
+
+    async def _bulk_request(self, request, ids, max_ids):
+        chunks = self._chunks(ids, max_ids)
+        if len(chunks) <= 1:
+            return await request(chunks[0] if chunks else [])
+
+        async def run(chunk):
+            try:
+                return await request(chunk)
+            except LoLException as e:
+                if e == error_404:
+                    return None
+                raise
+
+        return self._merge(await asyncio.gather(*[run(chunk) for chunk in chunks]))
+
+    # Streaming decode is not supported here: these decode the whole response, and yield the same values
+    # as their RiotWatcher versions, for use with async for.
+    async def stream_request(self, url, region, path, static=False, **kwargs):
+        for keys, value in _iter_loaded(await self.base_request(url, region, static=static, **kwargs), path):
+            yield keys, value
+
+    async def iter_league(self, summoner_ids=None, team_ids=None, region=None):
+        for key, leagues in (await self.get_league(summoner_ids, team_ids, region)).items():
+            for league in leagues:
+                yield key, league
+
+    async def static_iter_champion_list(self, region=None, locale=None, version=None, data_by_id=None,
+                                        champ_data=None):
+        champions = await self.static_get_champion_list(region, locale, version, data_by_id, champ_data)
+        for champion in champions['data'].values():
+            yield champion
+
+    async def static_iter_item_list(self, region=None, locale=None, version=None, item_list_data=None):
+        for item in (await self.static_get_item_list(region, locale, version, item_list_data))['data'].values():
+            yield item
+
+    # Endpoints that pick one entry out of a plural endpoint's result have to await it first.
+    async def get_summoner(self, name=None, id=None, region=None):
+        if (name is None) != (id is None):
+            if name is not None:
+                return (await self.get_summoners(names=[name, ], region=region))[name]
+            else:
+                return (await self.get_summoners(ids=[id, ], region=region))[str(id)]
+        return None
+
+    async def get_teams_for_summoner(self, summoner_id, region=None):
+        return (await self.get_teams_for_summoners([summoner_id, ], region=region))[str(summoner_id)]
+
+    async def get_team(self, team_id, region=None):
+        return (await self.get_teams([team_id, ], region=region))[str(team_id)]
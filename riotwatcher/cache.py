@@ -0,0 +1,156 @@
+"""
+Response cache for RiotWatcher.
+
+    from riotwatcher.cache import ResponseCache, SQLiteCacheBackend
+
+    w = RiotWatcher('<your-api-key>', cache=ResponseCache(SQLiteCacheBackend('/tmp/riot_cache.sqlite3')))
+
+Responses are cached by request URL and parameters for a time that depends on the endpoint. Cache hits
+are answered without a request, so they don't count against the rate limit.
+"""
+
+from collections import OrderedDict
+import json
+import re
+import threading
+import time
+
+from .riotwatcher import SQLiteStore
+
+# (pattern, seconds) pairs, the first pattern found in the request path picks the TTL.
+# Paths look like 'v1.3/game/by-summoner/123/recent' or 'static-data/v1.2/champion'.
+DEFAULT_TTLS = (
+    (r'^static-data/[^/]+/versions$', 60),         # lists a new patch as soon as it is out
+    (r'^static-data/', 6 * 60 * 60),               # changes once per patch
+    (r'/champion', 60 * 60),                        # free to play rotation
+    (r'/game/by-summoner/\d+/recent$', 60),         # a new game takes 20+ minutes
+    (r'/league/', 5 * 60),
+    (r'/stats/', 5 * 60),
+    (r'/team/', 5 * 60),
+    (r'/summoner/', 60),
+)
+
+
+class MemoryCacheBackend:
+    """Cache backend that keeps up to max_entries responses in this process, evicting the least recently used."""
+    blocking_io = False
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (hit, value)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl):
+        """Stores value and returns the number of entries evicted to make room."""
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend(SQLiteStore):
+    """Cache backend shared by every process on a host through a SQLite database file.
+
+    Keeps up to max_entries responses, evicting the least recently used.
+    """
+    blocking_io = True
+
+    def __init__(self, path, max_entries=100000, busy_timeout=30):
+        self.max_entries = max_entries
+        SQLiteStore.__init__(self, path, busy_timeout)
+
+    def _create_tables(self, conn):
+        conn.execute('CREATE TABLE IF NOT EXISTS response_cache '
+                     '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, last_used REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS response_cache_last_used ON response_cache (last_used)')
+
+    def get(self, key):
+        with self._transaction() as conn:
+            now = time.time()
+            row = conn.execute('SELECT value, expires FROM response_cache WHERE key = ?', (key, )).fetchone()
+            if row is None:
+                return False, None
+            if row[1] < now:
+                conn.execute('DELETE FROM response_cache WHERE key = ?', (key, ))
+                return False, None
+            conn.execute('UPDATE response_cache SET last_used = ? WHERE key = ?', (now, key))
+            return True, json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        with self._transaction() as conn:
+            now = time.time()
+            conn.execute('INSERT OR REPLACE INTO response_cache (key, value, expires, last_used) VALUES (?, ?, ?, ?)',
+                         (key, json.dumps(value), now + ttl, now))
+            conn.execute('DELETE FROM response_cache WHERE expires < ?', (now, ))
+            excess = conn.execute('SELECT COUNT(*) FROM response_cache').fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute('DELETE FROM response_cache WHERE key IN '
+                             '(SELECT key FROM response_cache ORDER BY last_used LIMIT ?)', (excess, ))
+            return max(excess, 0)
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM response_cache')
+
+
+class ResponseCache:
+    """Caches API responses with a TTL per endpoint, see DEFAULT_TTLS.
+
+    Requests whose path matches none of the patterns use default_ttl; a TTL of 0 disables caching.
+    Cached responses are shared between callers, so don't modify them.
+    """
+    def __init__(self, backend=None, ttls=DEFAULT_TTLS, default_ttl=0):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.default_ttl = default_ttl
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    def ttl(self, path):
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return self.default_ttl
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            self._stats[counter] += n
+
+    def get(self, key):
+        """Returns (hit, value)."""
+        hit, value = self.backend.get(key)
+        self._count('hits' if hit else 'misses')
+        return hit, value
+
+    def set(self, key, value, ttl):
+        evicted = self.backend.set(key, value, ttl)
+        if evicted:
+            self._count('evictions', evicted)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
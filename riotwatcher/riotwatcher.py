@@ -1,6 +1,35 @@
+import atexit
+import bisect
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import contextvars
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+
+# Optional: orjson decodes responses faster and with fewer allocations than json,
+# ijson lets the iter_* methods decode a response while it is still being received.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
 
 # Constants
 BRAZIL = 'br'
@@ -80,6 +109,10 @@ player_stat_summary_types = [
 
 solo_queue, ranked_5s, ranked_3s = 'RANKED_SOLO_5x5', 'RANKED_TEAM_5x5', 'RANKED_TEAM_3x3'
 
+# Request lanes
+INTERACTIVE = 'interactive'     # a user is waiting on the result
+BACKGROUND = 'background'       # bulk refreshes, static data, crawling
+
 api_versions = {
     'champion': 1.2,
     'game': 1.3,
@@ -90,6 +123,13 @@ api_versions = {
     'team': 2.3
 }
 
+# Most IDs (or names) the bulk endpoints of each API accept in one request.
+max_ids = {
+    'league': 10,
+    'summoner': 40,
+    'team': 10,
+}
+
 
 class LoLException(Exception):
     def __init__(self, error):
@@ -142,40 +182,1268 @@ class RateLimit:
         self.__reload()
         return len(self.made_requests) < self.allowed_requests
 
+    def capacity(self, share=1.0, requests=1):
+        """
+        Number of requests in this window usable by a caller limited to share of it,
+        less the room the caller's other requests need if it wants to make several at once.
+        """
+        return max(int(self.allowed_requests * share) - requests + 1, 1)
+
+    def wait_time(self, share=1.0, requests=1):
+        """Seconds until this window has room for requests more requests (0 if it has room now)."""
+        self.__reload()
+        excess = len(self.made_requests) - self.capacity(share, requests)
+        if excess < 0:
+            return 0
+        return max(self.made_requests[excess] - time.time(), 0)
+
+
+class RateLimiter:
+    """Base class for rate limit backends.
+
+    A backend keeps track of the requests made under a key (one per API key and region, or method family)
+    for a set of RateLimit windows. A request counts against one or more such pools, given as a list of
+    (key, limits) pairs, and is checked or recorded against all of their windows at once.
+    Subclasses implement try_acquire, wait_time, add and block; try_acquire and wait_time return the number
+    of seconds until every window has room (0 if now).
+    A share below 1 treats each window as only that fraction full, which leaves the rest to other callers.
+    wait_time and can_make_request can also check for room for several requests at once.
+    """
+    poll_interval = 0.05
+    # Whether calls wait on disk or network, in which case asyncio callers run them in an executor.
+    blocking_io = False
+
+    def try_acquire(self, pools, share=1.0):
+        """Record a request in every window of pools if all of them have room, otherwise return the wait."""
+        raise NotImplementedError
+
+    def wait_time(self, pools, share=1.0, requests=1):
+        raise NotImplementedError
+
+    def add(self, pools):
+        """Record a request in every window of pools unconditionally."""
+        raise NotImplementedError
+
+    def block(self, key, seconds):
+        """Refuse every request under key for the next seconds (e.g. after a 429 with Retry-After)."""
+        raise NotImplementedError
+
+    def can_make_request(self, pools, share=1.0, requests=1):
+        return self.wait_time(pools, share, requests) <= 0
+
+    def acquire(self, pools, timeout=None, share=1.0):
+        """Block until a request is recorded in every window. Returns False if timeout expires first."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = self.try_acquire(pools, share)
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(max(wait, self.poll_interval))
+
+
+class LocalRateLimiter(RateLimiter):
+    """In-process backend, stores requests in a copy of the RateLimit objects for each key."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocked = {}
+        self._windows = {}
+
+    def _limits(self, key, limits):
+        windows = self._windows.get(key)
+        if windows is None:
+            windows = [RateLimit(lim.allowed_requests, lim.seconds) for lim in limits]
+            self._windows[key] = windows
+        return windows
+
+    def _wait_time(self, pools, share, requests=1):
+        now = time.time()
+        wait = 0
+        for key, limits in pools:
+            wait = max([wait, self._blocked.get(key, 0) - now] +
+                       [lim.wait_time(share, requests) for lim in self._limits(key, limits)])
+        return wait
+
+    def _add(self, pools):
+        for key, limits in pools:
+            for lim in self._limits(key, limits):
+                lim.add_request()
+
+    def try_acquire(self, pools, share=1.0):
+        with self._lock:
+            wait = self._wait_time(pools, share)
+            if wait <= 0:
+                self._add(pools)
+            return wait
+
+    def wait_time(self, pools, share=1.0, requests=1):
+        with self._lock:
+            return self._wait_time(pools, share, requests)
+
+    def add(self, pools):
+        with self._lock:
+            self._add(pools)
+
+    def block(self, key, seconds):
+        with self._lock:
+            self._blocked[key] = max(self._blocked.get(key, 0), time.time() + seconds)
+
+
+class SQLiteStore:
+    """Base class for state shared between processes through a SQLite database file.
+
+    Each thread (and each process after a fork) gets its own connection. _transaction() runs a block
+    in a write transaction, which SQLite serializes across all processes using the file.
+    """
+    def __init__(self, path, busy_timeout=30):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            self._create_tables(conn)
+
+    def _create_tables(self, conn):
+        pass
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self):
+        return _SQLiteTransaction(self._connection())
+
+
+class _SQLiteTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.conn.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+
+
+class SQLiteRateLimiter(RateLimiter, SQLiteStore):
+    """Backend shared by every process on a host through a SQLite database file.
+
+    Each check-and-record runs in a single write transaction, so concurrent workers cannot both take
+    the last slot of a window.
+    """
+    blocking_io = True
+
+    def _create_tables(self, conn):
+        conn.execute('CREATE TABLE IF NOT EXISTS rate_limit_request '
+                     '(key TEXT NOT NULL, window TEXT NOT NULL, expires REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS rate_limit_request_key '
+                     'ON rate_limit_request (key, window, expires)')
+        conn.execute('CREATE TABLE IF NOT EXISTS rate_limit_block (key TEXT PRIMARY KEY, until REAL NOT NULL)')
+
+    @staticmethod
+    def _window(lim):
+        return '{}/{}'.format(lim.allowed_requests, lim.seconds)
+
+    def _wait_time(self, conn, pools, share, now, requests=1):
+        wait = 0
+        for key, limits in pools:
+            conn.execute('DELETE FROM rate_limit_request WHERE key = ? AND expires < ?', (key, now))
+            blocked = conn.execute('SELECT until FROM rate_limit_block WHERE key = ?', (key, )).fetchone()
+            if blocked is not None:
+                wait = max(wait, blocked[0] - now)
+            for lim in limits:
+                window = self._window(lim)
+                capacity = lim.capacity(share, requests)
+                count = conn.execute('SELECT COUNT(*) FROM rate_limit_request WHERE key = ? AND window = ?',
+                                     (key, window)).fetchone()[0]
+                if count >= capacity:
+                    expires = conn.execute('SELECT expires FROM rate_limit_request WHERE key = ? AND window = ? '
+                                           'ORDER BY expires LIMIT 1 OFFSET ?',
+                                           (key, window, count - capacity)).fetchone()[0]
+                    wait = max(wait, expires - now)
+        return wait
+
+    def _add(self, conn, pools, now):
+        conn.executemany('INSERT INTO rate_limit_request (key, window, expires) VALUES (?, ?, ?)',
+                         [(key, self._window(lim), now + lim.seconds) for key, limits in pools for lim in limits])
+
+    def try_acquire(self, pools, share=1.0):
+        with self._transaction() as conn:
+            now = time.time()
+            wait = self._wait_time(conn, pools, share, now)
+            if wait <= 0:
+                self._add(conn, pools, now)
+            return wait
+
+    def wait_time(self, pools, share=1.0, requests=1):
+        with self._transaction() as conn:
+            return self._wait_time(conn, pools, share, time.time(), requests)
+
+    def add(self, pools):
+        with self._transaction() as conn:
+            self._add(conn, pools, time.time())
+
+    def block(self, key, seconds):
+        with self._transaction() as conn:
+            until = time.time() + seconds
+            blocked = conn.execute('SELECT until FROM rate_limit_block WHERE key = ?', (key, )).fetchone()
+            if blocked is None or blocked[0] < until:
+                conn.execute('INSERT OR REPLACE INTO rate_limit_block (key, until) VALUES (?, ?)', (key, until))
+
+
+class RedisRateLimiter(RateLimiter):
+    """Backend shared by every host that can reach a Redis server.
+
+    Takes a redis-py client. Each window is a sorted set of request expiry times, checked and updated by
+    a Lua script so the whole check-and-record is atomic on the server. Timestamps come from the calling
+    host, so hosts should keep their clocks in sync.
+    """
+    blocking_io = True
+    script = """
+        local now = tonumber(ARGV[1])
+        local record = ARGV[2]
+        local member = ARGV[3]
+        local blocks = tonumber(ARGV[4])
+        local wait = 0
+        for i = 1, blocks do
+            local blocked = redis.call('GET', KEYS[i])
+            if blocked then
+                wait = math.max(wait, tonumber(blocked) - now)
+            end
+        end
+        for i = blocks + 1, #KEYS do
+            local key = KEYS[i]
+            local allowed = tonumber(ARGV[3 + (i - blocks) * 2])
+            redis.call('ZREMRANGEBYSCORE', key, '-inf', '(' .. now)
+            local count = redis.call('ZCARD', key)
+            if count >= allowed then
+                local expires = redis.call('ZRANGE', key, count - allowed, count - allowed, 'WITHSCORES')[2]
+                wait = math.max(wait, tonumber(expires) - now)
+            end
+        end
+        if record == 'force' or (record == 'try' and wait <= 0) then
+            for i = blocks + 1, #KEYS do
+                local key = KEYS[i]
+                local seconds = tonumber(ARGV[4 + (i - blocks) * 2])
+                redis.call('ZADD', key, now + seconds, member)
+                redis.call('EXPIRE', key, math.ceil(seconds) + 1)
+            end
+        end
+        return tostring(wait)
+    """
+
+    def __init__(self, client, prefix='riotwatcher:'):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self.script)
+
+    def _run(self, pools, record, share=1.0, requests=1):
+        # KEYS: the block key of each pool, then every window of every pool.
+        keys = [self._block_key(key) for key, limits in pools]
+        args = [repr(time.time()), record, os.urandom(8).hex(), len(pools)]
+        for key, limits in pools:
+            for lim in limits:
+                keys.append('{}{}:{}/{}'.format(self.prefix, key, lim.allowed_requests, lim.seconds))
+                args.extend((lim.capacity(share, requests), lim.seconds))
+        return float(self._script(keys=keys, args=args))
+
+    def try_acquire(self, pools, share=1.0):
+        return self._run(pools, 'try', share)
+
+    def wait_time(self, pools, share=1.0, requests=1):
+        return self._run(pools, 'none', share, requests)
+
+    def add(self, pools):
+        self._run(pools, 'force')
+
+    def _block_key(self, key):
+        return '{}{}:blocked'.format(self.prefix, key)
+
+    def block(self, key, seconds):
+        until = time.time() + seconds
+        block_key = self._block_key(key)
+        current = self.client.get(block_key)
+        if current is None or float(current) < until:
+            self.client.set(block_key, repr(until), px=int(seconds * 1000) + 1)
+
+
+class SQLiteFlightStore(SQLiteStore):
+    """Lets SingleFlight coalesce requests between processes on a host, see SingleFlight."""
+    blocking_io = True
+
+    def _create_tables(self, conn):
+        conn.execute('CREATE TABLE IF NOT EXISTS flight '
+                     '(key TEXT PRIMARY KEY, claimed_until REAL NOT NULL, result BLOB, result_until REAL)')
+
+    def claim(self, key, ttl):
+        with self._transaction() as conn:
+            now = time.time()
+            row = conn.execute('SELECT claimed_until FROM flight WHERE key = ?', (key, )).fetchone()
+            if row is not None and row[0] > now:
+                return False
+            conn.execute('INSERT OR REPLACE INTO flight (key, claimed_until, result, result_until) '
+                         'VALUES (?, ?, NULL, NULL)', (key, now + ttl))
+            conn.execute('DELETE FROM flight WHERE claimed_until < ? AND (result_until IS NULL OR result_until < ?)',
+                         (now, now))
+            return True
+
+    def publish(self, key, data, ttl):
+        with self._transaction() as conn:
+            conn.execute('UPDATE flight SET claimed_until = 0, result = ?, result_until = ? WHERE key = ?',
+                         (data, time.time() + ttl, key))
+
+    def release(self, key):
+        with self._transaction() as conn:
+            conn.execute('UPDATE flight SET claimed_until = 0 WHERE key = ?', (key, ))
+
+    def result(self, key):
+        row = self._connection().execute('SELECT result FROM flight WHERE key = ? AND result_until > ?',
+                                         (key, time.time())).fetchone()
+        return row[0] if row is not None else None
+
+
+class RedisFlightStore:
+    """Lets SingleFlight coalesce requests between hosts through Redis, see SingleFlight."""
+    blocking_io = True
+
+    def __init__(self, client, prefix='riotwatcher:flight:'):
+        self.client = client
+        self.prefix = prefix
+
+    def claim(self, key, ttl):
+        return bool(self.client.set(self.prefix + key + ':claim', 1, nx=True, px=int(ttl * 1000)))
+
+    def publish(self, key, data, ttl):
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key + ':result', data, px=int(ttl * 1000))
+        pipe.delete(self.prefix + key + ':claim')
+        pipe.execute()
+
+    def release(self, key):
+        self.client.delete(self.prefix + key + ':claim')
+
+    def result(self, key):
+        return self.client.get(self.prefix + key + ':result')
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical requests that are in flight at the same time.
+
+    The first caller for a key runs the request and every caller that arrives before it finishes gets
+    the same result (the same object, so results should be treated as read-only) or exception.
+
+    With a store (SQLiteFlightStore, RedisFlightStore), callers in other processes are coalesced as well:
+    the first one claims the key for up to claim_ttl seconds and publishes the JSON result for result_ttl
+    seconds, while the others poll for it. If the claimant fails or takes longer than wait_timeout,
+    the others send the request themselves.
+
+    priority is the caller's lane priority (0 is the most urgent). A caller only waits for a request sent
+    at the same or a more urgent priority, so e.g. a user's lookup never waits behind a background request
+    queued for the same thing; it sends its own, which background callers arriving later can then follow.
+    """
+    def __init__(self, store=None, claim_ttl=30, result_ttl=2, wait_timeout=30, poll_interval=0.05):
+        self.store = store
+        self.claim_ttl = claim_ttl
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'followers': 0, 'shared_followers': 0}
+
+    @staticmethod
+    def _flight_key(key, priority):
+        return '{}:{}'.format(key, priority) if priority else key
+
+    def _following(self, flights, key, priority):
+        """The flight of key a caller at priority can follow, if there is one."""
+        for p in range(priority + 1):
+            flight = flights.get(self._flight_key(key, p))
+            if flight is not None:
+                return flight
+        return None
+
+    def do(self, key, fn, priority=0):
+        with self._lock:
+            flight = self._following(self._flights, key, priority)
+            leader = flight is None
+            if leader:
+                flight = self._flights[self._flight_key(key, priority)] = _Flight()
+                self._stats['leaders'] += 1
+            else:
+                self._stats['followers'] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn() if self.store is None else self._do_shared(key, fn, priority)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[self._flight_key(key, priority)]
+            flight.done.set()
+
+    def _shared_result(self, key, priority):
+        for p in range(priority + 1):
+            data = self.store.result(self._flight_key(key, p))
+            if data is not None:
+                return data
+        return None
+
+    def _do_shared(self, key, fn, priority=0):
+        flight_key = self._flight_key(key, priority)
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            data = self._shared_result(key, priority)
+            if data is not None:
+                with self._lock:
+                    self._stats['shared_followers'] += 1
+                return json.loads(data)
+            if self.store.claim(flight_key, self.claim_ttl):
+                try:
+                    result = fn()
+                except Exception:
+                    self.store.release(flight_key)
+                    raise
+                self.store.publish(flight_key, json.dumps(result), self.result_ttl)
+                return result
+            time.sleep(self.poll_interval)
+        return fn()
+
+    def stats(self):
+        """Number of requests sent by this process (leaders) and answered by another caller's request."""
+        with self._lock:
+            return dict(self._stats)
+
+
+class Lane:
+    """A named class of traffic for RequestScheduler.
+
+    reserve is the fraction of every rate limit window kept free for this lane: lanes of lower priority
+    can only fill the rest of the window.
+    """
+    def __init__(self, name, reserve=0.0):
+        self.name = name
+        self.reserve = reserve
+
+
+class BaseRequestScheduler:
+    """Lane bookkeeping shared by the thread and asyncio request schedulers.
+
+    Lanes are given highest priority first. Each limiter key has its own queue (a request is queued under its
+    most specific rate limit pool, its method family's if it has one), and only the caller at the head of
+    a queue (the oldest caller of the highest priority lane waiting) asks the limiter for a slot. When the windows are full it sleeps for exactly the time the limiter reports, so a saturated key
+    runs at its allowed rate without polling, and without holding up callers of other keys.
+    """
+    def __init__(self, limiter, lanes=(Lane(INTERACTIVE), ), default_lane=None):
+        self.limiter = limiter
+        self.lanes = lanes
+        self.lanes_by_name = dict((lane.name, lane) for lane in lanes)
+        self.default_lane = default_lane if default_lane is not None else lanes[0].name
+        self._priority = {}
+        self._share = {}
+        reserved = 0.0
+        for priority, lane in enumerate(lanes):
+            self._priority[lane.name] = priority
+            self._share[lane.name] = 1.0 - reserved
+            reserved += lane.reserve
+        self._stats = dict((lane.name, {'queued': 0, 'dispatched': 0, 'timed_out': 0,
+                                        'wait_total': 0.0, 'wait_max': 0.0}) for lane in lanes)
+        self._counter = itertools.count()
+        self._queues = {}
+
+    def _enter(self, key, lane):
+        ticket = (self._priority[lane], next(self._counter))
+        self._queues.setdefault(key, []).append(ticket)
+        self._stats[lane]['queued'] += 1
+        return ticket
+
+    def _is_head(self, key, ticket):
+        return min(self._queues[key]) == ticket
+
+    def _leave(self, key, ticket, lane, waited, acquired):
+        queue = self._queues[key]
+        queue.remove(ticket)
+        if not queue:
+            del self._queues[key]
+        stats = self._stats[lane]
+        stats['queued'] -= 1
+        if acquired:
+            stats['dispatched'] += 1
+            stats['wait_total'] += waited
+            stats['wait_max'] = max(stats['wait_max'], waited)
+        else:
+            stats['timed_out'] += 1
+
+    def share(self, lane=None):
+        """Share of each rate limit window usable by lane (default_lane if None)."""
+        return self._share[lane if lane is not None else self.default_lane]
+
+    def waiting(self, key):
+        """Number of callers queued for a slot under key."""
+        return len(self._queues.get(key, ()))
+
+    def priority(self, lane=None):
+        """Priority of lane (default_lane if None), 0 for the most urgent lane."""
+        return self._priority[lane if lane is not None else self.default_lane]
+
+    def queue_depth(self, lane=None):
+        if lane is None:
+            return sum(len(queue) for queue in self._queues.values())
+        return self._stats[lane]['queued']
+
+    def queue_depths(self):
+        """Requests queued now, per limiter key."""
+        return dict((key, len(queue)) for key, queue in self._queues.items())
+
+    def lane_stats(self):
+        """Per lane: requests queued now, dispatched and timed out so far, and total/max seconds waited."""
+        return dict((name, dict(stats)) for name, stats in self._stats.items())
+
+
+class RequestScheduler(BaseRequestScheduler):
+    """Request scheduler for callers in threads, see BaseRequestScheduler."""
+    def __init__(self, limiter, lanes=(Lane(INTERACTIVE), ), default_lane=None):
+        BaseRequestScheduler.__init__(self, limiter, lanes, default_lane)
+        self._lock = threading.Lock()
+        # One condition per key, so a slot freed in one pool only wakes the callers queued for it.
+        self._conds = {}
+
+    def _condition(self, key):
+        cond = self._conds.get(key)
+        if cond is None:
+            cond = threading.Condition(self._lock)
+            self._conds[key] = cond
+        return cond
+
+    def acquire(self, pools, timeout=None, lane=None):
+        """Block until a slot is recorded in every window of pools. Returns False if timeout expires first."""
+        lane = lane if lane is not None else self.default_lane
+        share = self._share[lane]
+        key = pools[-1][0]
+        start = time.time()
+        deadline = None if timeout is None else start + timeout
+        acquired = False
+        with self._lock:
+            cond = self._condition(key)
+            ticket = self._enter(key, lane)
+            try:
+                while True:
+                    wait = None
+                    if self._is_head(key, ticket):
+                        # The limiter may wait on disk or network, which mustn't hold up callers of other keys.
+                        self._lock.release()
+                        try:
+                            wait = self.limiter.try_acquire(pools, share)
+                        finally:
+                            self._lock.acquire()
+                        if wait <= 0:
+                            acquired = True
+                            return True
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    cond.wait(wait)
+            finally:
+                self._leave(key, ticket, lane, time.time() - start, acquired)
+                cond.notify_all()
+
+    def queue_depth(self, lane=None):
+        with self._lock:
+            return BaseRequestScheduler.queue_depth(self, lane)
+
+    def queue_depths(self):
+        with self._lock:
+            return BaseRequestScheduler.queue_depths(self)
+
+    def lane_stats(self):
+        with self._lock:
+            return BaseRequestScheduler.lane_stats(self)
+
+
+class RetryPolicy:
+    """How RiotWatcher retries requests that fail with a temporary error.
+
+    Each call is retried at most max_retries times. The wait before a retry is the response's Retry-After
+    header when present, otherwise a random time up to backoff * 2 ** attempt seconds, capped at max_backoff.
+    """
+    def __init__(self, max_retries=3, backoff=1.0, max_backoff=30.0, statuses=(429, 500, 503)):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def delay(self, attempt, response):
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+_ENDPOINT_IDS = (
+    (re.compile(r'^(static-data/)?[a-z]+/'), r'\1'),
+    (re.compile(r'/by-name/[^/]+'), '/by-name/{names}'),
+    (re.compile(r'/TEAM-[^/]+'), '/{team_ids}'),
+    (re.compile(r'/\d+(,\d+)*(?=/|$)'), '/{ids}'),
+)
+
+
+def _endpoint(full_url):
+    """The endpoint a request URL belongs to, e.g. v1.4/summoner/{ids}/masteries."""
+    endpoint = full_url.split('/api/lol/', 1)[-1]
+    for pattern, replacement in _ENDPOINT_IDS:
+        endpoint = pattern.sub(replacement, endpoint)
+    return endpoint
+
+
+def _prometheus_labels(**labels):
+    return ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                    for k, v in sorted(labels.items()))
+
+
+def _new_counters(buckets):
+    return {
+        'calls': 0,
+        'statuses': {},
+        'bytes': 0,
+        'latency_buckets': [0] * (len(buckets) + 1),
+        'latency_sum': 0.0,
+        'waits': 0,
+        'wait_seconds': 0.0,
+    }
+
+
+def _add_counters(total, delta):
+    """Adds the Telemetry counters delta to total, in place, and returns total."""
+    for name in ('calls', 'bytes', 'latency_sum', 'waits', 'wait_seconds'):
+        total[name] += delta[name]
+    for status, count in delta['statuses'].items():
+        total['statuses'][status] = total['statuses'].get(status, 0) + count
+    total['latency_buckets'] = [a + b for a, b in zip(total['latency_buckets'], delta['latency_buckets'])]
+    return total
+
+
+class SQLiteTelemetryStore(SQLiteStore):
+    """Adds up the Telemetry of every process on a host, see Telemetry."""
+    blocking_io = True
+
+    def _create_tables(self, conn):
+        conn.execute('CREATE TABLE IF NOT EXISTS telemetry '
+                     '(region TEXT NOT NULL, endpoint TEXT NOT NULL, counters TEXT NOT NULL, '
+                     'PRIMARY KEY (region, endpoint))')
+
+    @staticmethod
+    def _decode(data):
+        counters = json.loads(data)
+        counters['statuses'] = dict((int(status), count) for status, count in counters['statuses'].items())
+        return counters
+
+    def add(self, series):
+        """Adds {(region, endpoint): counters} to the stored counters."""
+        with self._transaction() as conn:
+            for (region, endpoint), delta in series.items():
+                row = conn.execute('SELECT counters FROM telemetry WHERE region = ? AND endpoint = ?',
+                                   (region, endpoint)).fetchone()
+                counters = _add_counters(self._decode(row[0]), delta) if row is not None else delta
+                conn.execute('INSERT OR REPLACE INTO telemetry (region, endpoint, counters) VALUES (?, ?, ?)',
+                             (region, endpoint, json.dumps(counters)))
+
+    def series(self):
+        rows = self._connection().execute('SELECT region, endpoint, counters FROM telemetry').fetchall()
+        return dict(((region, endpoint), self._decode(counters)) for region, endpoint, counters in rows)
+
+    def reset(self):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM telemetry')
+
+
+class RedisTelemetryStore:
+    """Adds up the Telemetry of every host through Redis, see Telemetry."""
+    blocking_io = True
+
+    def __init__(self, client, prefix='riotwatcher:telemetry:'):
+        self.client = client
+        self.prefix = prefix
+
+    def add(self, series):
+        pipe = self.client.pipeline()
+        for name, delta in series.items():
+            member = json.dumps(name)
+            key = self.prefix + member
+            pipe.sadd(self.prefix + 'series', member)
+            for counter in ('calls', 'bytes', 'waits'):
+                pipe.hincrby(key, counter, delta[counter])
+            for counter in ('latency_sum', 'wait_seconds'):
+                pipe.hincrbyfloat(key, counter, delta[counter])
+            for status, count in delta['statuses'].items():
+                pipe.hincrby(key, 'status:{}'.format(status), count)
+            for bucket, count in enumerate(delta['latency_buckets']):
+                pipe.hincrby(key, 'bucket:{}'.format(bucket), count)
+        pipe.execute()
+
+    def series(self):
+        members = sorted(self.client.smembers(self.prefix + 'series'))
+        pipe = self.client.pipeline()
+        for member in members:
+            pipe.hgetall(self.prefix + (member.decode('utf-8') if isinstance(member, bytes) else member))
+        series = {}
+        for member, fields in zip(members, pipe.execute()):
+            fields = dict((k.decode('utf-8') if isinstance(k, bytes) else k, float(v)) for k, v in fields.items())
+            buckets = sorted((int(k[len('bucket:'):]), v) for k, v in fields.items() if k.startswith('bucket:'))
+            series[tuple(json.loads(member))] = {
+                'calls': int(fields.get('calls', 0)),
+                'statuses': dict((int(k[len('status:'):]), int(v)) for k, v in fields.items()
+                                 if k.startswith('status:')),
+                'bytes': int(fields.get('bytes', 0)),
+                'latency_buckets': [int(v) for bucket, v in buckets],
+                'latency_sum': fields.get('latency_sum', 0.0),
+                'waits': int(fields.get('waits', 0)),
+                'wait_seconds': fields.get('wait_seconds', 0.0),
+            }
+        return series
+
+    def reset(self):
+        members = self.client.smembers(self.prefix + 'series')
+        keys = [self.prefix + (m.decode('utf-8') if isinstance(m, bytes) else m) for m in members]
+        self.client.delete(self.prefix + 'series', *keys)
+
+
+class Telemetry:
+    """Calls, status codes, bytes, latency and time spent waiting on the rate limit, per region and endpoint.
+
+    Counters live in the memory of each process, unless a store (SQLiteTelemetryStore, RedisTelemetryStore)
+    is given: then each process adds what it recorded to the store's counters every flush_interval seconds
+    (and on exit), and reports the totals of every process sharing the store. snapshot() returns them as
+    a dict, prometheus() renders them in the Prometheus text format.
+    """
+    # Upper bounds (seconds) of the latency histogram buckets, the last bucket is unbounded.
+    buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None, store=None, flush_interval=5.0):
+        if buckets is not None:
+            self.buckets = tuple(sorted(buckets))
+        self.store = store
+        self.flush_interval = flush_interval
+        self._next_flush = time.time() + flush_interval
+        self._series = {}
+        self._lock = threading.Lock()
+        if store is not None:
+            atexit.register(self.flush)
+
+    def _get(self, region, endpoint):
+        series = self._series.get((region, endpoint))
+        if series is None:
+            series = self._series[(region, endpoint)] = _new_counters(self.buckets)
+        return series
+
+    def observe(self, region, endpoint, status_code, size, seconds):
+        """Records one response of size bytes that took seconds to arrive."""
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._get(region, endpoint)
+            series['calls'] += 1
+            series['statuses'][status_code] = series['statuses'].get(status_code, 0) + 1
+            series['bytes'] += size
+            series['latency_buckets'][bucket] += 1
+            series['latency_sum'] += seconds
+        self._maybe_flush()
+
+    def observe_wait(self, region, endpoint, seconds):
+        """Records seconds a request waited for room in the rate limit windows."""
+        with self._lock:
+            series = self._get(region, endpoint)
+            series['waits'] += 1
+            series['wait_seconds'] += seconds
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.store is None or time.time() < self._next_flush:
+            return
+        with self._lock:
+            self._next_flush = time.time() + self.flush_interval
+        # Off the caller's thread, which may be an event loop, as the store waits on disk or network.
+        threading.Thread(target=self._flush_quietly, daemon=True).start()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logging.getLogger(__name__).warning('Could not flush telemetry: %s', e)
+
+    def flush(self):
+        """Adds the counters recorded since the last flush to the store's."""
+        if self.store is None:
+            return
+        with self._lock:
+            series, self._series = self._series, {}
+            self._next_flush = time.time() + self.flush_interval
+        if not series:
+            return
+        try:
+            self.store.add(series)
+        except Exception:
+            # Keep them for the next flush.
+            with self._lock:
+                for name, delta in series.items():
+                    _add_counters(self._get(*name), delta)
+            raise
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+        if self.store is not None:
+            self.store.reset()
+
+    def _quantile(self, counts, q):
+        """Upper bound of the latency bucket the q quantile falls in (None if it is the unbounded one)."""
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets, counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self):
+        """{region: {endpoint: counters}}, with p50/p99 latency estimated from the histogram."""
+        if self.store is not None:
+            self.flush()
+            series = self.store.series()
+        else:
+            with self._lock:
+                series = dict((key, dict(value, statuses=dict(value['statuses']),
+                                         latency_buckets=list(value['latency_buckets'])))
+                              for key, value in self._series.items())
+        snapshot = {}
+        for (region, endpoint), value in series.items():
+            value['p50'] = self._quantile(value['latency_buckets'], 0.5)
+            value['p99'] = self._quantile(value['latency_buckets'], 0.99)
+            snapshot.setdefault(region, {})[endpoint] = value
+        return snapshot
+
+    def prometheus(self):
+        lines = [
+            '# HELP riot_api_requests_total Riot API responses, by HTTP status.',
+            '# TYPE riot_api_requests_total counter',
+        ]
+        snapshot = sorted((region, endpoint, value) for region, endpoints in self.snapshot().items()
+                          for endpoint, value in endpoints.items())
+        for region, endpoint, value in snapshot:
+            for status, count in sorted(value['statuses'].items()):
+                lines.append('riot_api_requests_total{{{}}} {}'.format(
+                    _prometheus_labels(region=region, endpoint=endpoint, status=status), count))
+        lines += [
+            '# HELP riot_api_response_bytes_total Riot API response body bytes.',
+            '# TYPE riot_api_response_bytes_total counter',
+        ]
+        for region, endpoint, value in snapshot:
+            lines.append('riot_api_response_bytes_total{{{}}} {}'.format(
+                _prometheus_labels(region=region, endpoint=endpoint), value['bytes']))
+        lines += [
+            '# HELP riot_api_request_duration_seconds Riot API response latency.',
+            '# TYPE riot_api_request_duration_seconds histogram',
+        ]
+        for region, endpoint, value in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf', ), value['latency_buckets']):
+                cumulative += count
+                lines.append('riot_api_request_duration_seconds_bucket{{{}}} {}'.format(
+                    _prometheus_labels(region=region, endpoint=endpoint, le=bound), cumulative))
+            labels = _prometheus_labels(region=region, endpoint=endpoint)
+            lines.append('riot_api_request_duration_seconds_sum{{{}}} {}'.format(labels, value['latency_sum']))
+            lines.append('riot_api_request_duration_seconds_count{{{}}} {}'.format(labels, value['calls']))
+        lines += [
+            '# HELP riot_api_rate_limit_wait_seconds_total Time requests spent waiting on the rate limit windows.',
+            '# TYPE riot_api_rate_limit_wait_seconds_total counter',
+        ]
+        for region, endpoint, value in snapshot:
+            lines.append('riot_api_rate_limit_wait_seconds_total{{{}}} {}'.format(
+                _prometheus_labels(region=region, endpoint=endpoint), value['wait_seconds']))
+        return '\n'.join(lines) + '\n'
+
+
+class SessionPool:
+    """Keep-alive requests sessions, one per API host, shared between threads.
+
+    Each host ({region}.api.pvp.net, global.api.pvp.net) gets its own Session whose connection
+    pool holds at most pool_size sockets, so repeated calls reuse an open TLS connection.
+    """
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10, gzip=True):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.gzip = gzip
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Accept-Encoding'] = 'gzip, deflate' if self.gzip else 'identity'
+        return session
+
+    def get(self, host):
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._new_session()
+                    self._sessions[host] = session
+        return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_current_lane = contextvars.ContextVar('riotwatcher_lane', default=None)
+
+
+def _path_matches(path, parts):
+    return len(parts) == len(path) and all(p == '*' or p == part for p, part in zip(path, parts))
+
+
+def _iter_loaded(value, path, keys=()):
+    """Yields (keys matched by the wildcards, value) for every value at path in a decoded document."""
+    if not path:
+        yield keys, value
+        return
+    head, rest = path[0], path[1:]
+    if isinstance(value, dict):
+        if head == '*':
+            for k, v in value.items():
+                yield from _iter_loaded(v, rest, keys + (k, ))
+        elif head in value:
+            yield from _iter_loaded(value[head], rest, keys)
+    elif isinstance(value, list) and head in ('*', 'item'):
+        for v in value:
+            yield from _iter_loaded(v, rest, keys + ('item', ) if head == '*' else keys)
+
+
+def _iter_parsed(events, path):
+    """_iter_loaded for ijson parser events: each value is built on its own, the document never is."""
+    builder = None
+    depth = 0
+    keys = ()
+    for prefix, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+                if depth == 0:
+                    yield keys, builder.value
+                    builder = None
+        elif event != 'map_key' and not event.startswith('end_'):
+            parts = prefix.split('.') if prefix else []
+            if _path_matches(path, parts):
+                keys = tuple(part for p, part in zip(path, parts) if p == '*')
+                if event in ('start_map', 'start_array'):
+                    builder = ObjectBuilder()
+                    builder.event(event, value)
+                    depth = 1
+                else:
+                    yield keys, value
+
+
+class _ContentReader:
+    """File-like view of a response body, read chunk by chunk as the parser asks for it."""
+    def __init__(self, response, chunk_size=65536):
+        self._chunks = response.iter_content(chunk_size)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
 
 class RiotWatcher:
-    def __init__(self, key, default_region=NORTH_AMERICA, limits=(RateLimit(10, 10), RateLimit(500, 600), )):
+    def __init__(self, key, default_region=NORTH_AMERICA, limits=(RateLimit(10, 10), RateLimit(500, 600), ),
+                 sessions=None, limiter=None, queue_timeout=None,
+                 lanes=(Lane(INTERACTIVE, reserve=0.2), Lane(BACKGROUND), ), default_lane=INTERACTIVE,
+                 retry=None, flights=None, cache=None, bulk_workers=4,
+                 base_url='https://{proxy}.api.pvp.net', telemetry=None, region_limits=None, family_limits=None):
         self.key = key
         self.default_region = default_region
+        # Each region has its own copy of these windows, unless region_limits ({region: limits}) says otherwise.
         self.limits = limits
+        self.region_limits = region_limits if region_limits is not None else {}
+        # {endpoint prefix: limits} for method families Riot counts apart from the rest of a region's requests,
+        # e.g. {'v2.4/league': (RateLimit(...), )}. Each region has its own copy of these windows too.
+        self.family_limits = family_limits if family_limits is not None else {}
+        self.sessions = sessions if sessions is not None else SessionPool()
+        self.limiter = limiter if limiter is not None else LocalRateLimiter()
+        self.scheduler = RequestScheduler(self.limiter, lanes, default_lane)
+        # Longest time a request may wait for the rate limit before error_429 is raised (None waits forever).
+        self.queue_timeout = queue_timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.flights = flights if flights is not None else SingleFlight()
+        # Optional riotwatcher.cache.ResponseCache, hits are answered without a request.
+        self.cache = cache
+        # Number of chunks of a bulk request that may be in flight at once.
+        self.bulk_workers = bulk_workers
+        # Scheme and host requests go to, {proxy} is the region (or 'global' for static data).
+        self.base_url = base_url
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+        self._retry_stats = {'retries': {}, 'give_ups': {}}
+        self._retry_stats_lock = threading.Lock()
+        # Shared backends keep requests under a digest of the key rather than the key itself.
+        self.limit_key = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
 
-    def can_make_request(self):
-        for lim in self.limits:
-            if not lim.request_available():
-                return False
-        return True
+    def can_make_request(self, region=None, endpoint='', lane=None, requests=1):
+        """
+        Whether requests requests to endpoint in region could be sent now through lane (the current lane
+        if None), i.e. without waiting on the rate limit or behind other callers queued for it.
+        """
+        pools = self._rate_pools(region if region is not None else self.default_region, endpoint)
+        lane = lane if lane is not None else _current_lane.get()
+        if self.scheduler.waiting(pools[-1][0]):
+            return False
+        return self.limiter.can_make_request(pools, self.scheduler.share(lane), requests)
 
-    def base_request(self, url, region, static=False, **kwargs):
+    def _rate_pools(self, region, endpoint):
+        """
+        The (limiter key, rate limits) pools a request to endpoint in region counts against: the region's
+        windows, and its method family's windows if it belongs to one.
+        """
+        pools = [('{}:{}'.format(self.limit_key, region), self.region_limits.get(region, self.limits))]
+        for family, limits in self.family_limits.items():
+            if endpoint.startswith(family):
+                pools.append(('{}:{}:{}'.format(self.limit_key, region, family), limits))
+                break
+        return pools
+
+    def queue_depths(self):
+        """Requests waiting for the rate limit now, per region (and method family)."""
+        prefix = len(self.limit_key) + 1
+        return dict((key[prefix:], depth) for key, depth in self.scheduler.queue_depths().items())
+
+    @contextmanager
+    def lane(self, name):
+        """Send requests made inside this block (or decorated function) through the given lane."""
+        if name not in self.scheduler.lanes_by_name:
+            raise ValueError('Unknown lane: {}'.format(name))
+        token = _current_lane.set(name)
+        try:
+            yield
+        finally:
+            _current_lane.reset(token)
+
+    def lane_stats(self):
+        return self.scheduler.lane_stats()
+
+    def _count_retry(self, counter, status_code):
+        with self._retry_stats_lock:
+            counts = self._retry_stats[counter]
+            counts[status_code] = counts.get(status_code, 0) + 1
+
+    def retry_stats(self):
+        """Number of retries and of calls given up on after running out of retries, by HTTP status."""
+        with self._retry_stats_lock:
+            return dict((counter, dict(counts)) for counter, counts in self._retry_stats.items())
+
+    def telemetry_stats(self):
+        """Calls, statuses, bytes, latency and rate limit waits by region and endpoint (see Telemetry.snapshot)."""
+        return self.telemetry.snapshot()
+
+    def _build_request(self, url, region, static, kwargs):
+        """Returns the API host, full URL and query parameters of a request."""
         if region is None:
             region = self.default_region
         args = {'api_key': self.key}
         for k in kwargs:
             if kwargs[k] is not None:
                 args[k] = kwargs[k]
-        r = requests.get(
-            'https://{proxy}.api.pvp.net/api/lol/{static}{region}/{url}'.format(
-                proxy='global' if static else region,
-                static='static-data/' if static else '',
-                region=region,
-                url=url
-            ),
-            params=args
+        proxy = 'global' if static else region
+        full_url = (self.base_url + '/api/lol/{static}{region}/{url}').format(
+            proxy=proxy,
+            static='static-data/' if static else '',
+            region=region,
+            url=url
         )
-        if not static:
-            for lim in self.limits:
-                lim.add_request()
-        raise_status(r)
-        return r.json()
+        return proxy, full_url, args
+
+    def _retry_delay(self, response, attempt):
+        """Seconds to wait before retrying response, or None if it should not be retried."""
+        if response.status_code not in self.retry.statuses:
+            return None
+        if attempt >= self.retry.max_retries:
+            self._count_retry('give_ups', response.status_code)
+            return None
+        self._count_retry('retries', response.status_code)
+        return self.retry.delay(attempt, response)
+
+    @staticmethod
+    def _request_key(full_url, args):
+        """Identifies a request by URL and parameters, leaving out the API key."""
+        params = '&'.join('{}={}'.format(k, args[k]) for k in sorted(args) if k != 'api_key')
+        return hashlib.sha1('{}?{}'.format(full_url, params).encode('utf-8')).hexdigest()
+
+    def _cache_ttl(self, url, static):
+        if self.cache is None:
+            return 0
+        return self.cache.ttl('static-data/' + url if static else url)
+
+    def base_request(self, url, region, static=False, **kwargs):
+        proxy, full_url, args = self._build_request(url, region, static, kwargs)
+        key = self._request_key(full_url, args)
+        ttl = self._cache_ttl(url, static)
+        if ttl > 0:
+            hit, result = self.cache.get(key)
+            if hit:
+                return result
+        return self.flights.do(key, lambda: self._send_request(proxy, full_url, args, static, key, ttl),
+                               self._lane_priority())
+
+    def _lane_priority(self):
+        """Priority (0 is the most urgent) of the lane requests made now go through."""
+        return self.scheduler.priority(_current_lane.get())
+
+    def stream_request(self, url, region, path, static=False, **kwargs):
+        """
+        Yields (keys, value) for every value at path in the response, e.g. path ('data', '*') yields
+        (('Aatrox', ), champion) for each champion in the champion list. '*' matches any key (or array item).
+
+        Cacheable responses (see ResponseCache) go through base_request(), so they are cached and concurrent
+        callers share one request. Otherwise, with ijson installed, the response is decoded as it arrives, so
+        only one value is held in memory at a time.
+        """
+        if ijson is None or self._cache_ttl(url, static) > 0:
+            yield from _iter_loaded(self.base_request(url, region, static=static, **kwargs), path)
+            return
+        proxy, full_url, args = self._build_request(url, region, static, kwargs)
+        r = self._send_response(proxy, full_url, args, static, stream=True)
+        try:
+            yield from _iter_parsed(ijson.parse(_ContentReader(r), use_float=True), path)
+        finally:
+            r.close()
+
+    def _send_request(self, proxy, full_url, args, static, key=None, ttl=0):
+        r = self._send_response(proxy, full_url, args, static)
+        result = _loads(r.content)
+        if ttl > 0:
+            self.cache.set(key, result, ttl)
+        return result
+
+    def _send_response(self, proxy, full_url, args, static, stream=False):
+        """Sends a request (retrying it as the retry policy says) and returns the successful response."""
+        lane = _current_lane.get()
+        endpoint = _endpoint(full_url)
+        pools = self._rate_pools(proxy, endpoint)
+        attempt = 0
+        while True:
+            # Static requests don't count against the rate limit.
+            if not static:
+                started = time.perf_counter()
+                acquired = self.scheduler.acquire(pools, timeout=self.queue_timeout, lane=lane)
+                self.telemetry.observe_wait(proxy, endpoint, time.perf_counter() - started)
+                if not acquired:
+                    raise error_429
+            started = time.perf_counter()
+            if stream:
+                r = self.sessions.get(proxy).get(full_url, params=args, timeout=self.sessions.timeout, stream=True)
+                # The body hasn't been read yet, count what the server says it is sending.
+                size = int(r.headers.get('Content-Length') or 0)
+            else:
+                r = self.sessions.get(proxy).get(full_url, params=args, timeout=self.sessions.timeout)
+                size = len(r.content)
+            self.telemetry.observe(proxy, endpoint, r.status_code, size, time.perf_counter() - started)
+            delay = self._retry_delay(r, attempt)
+            if delay is None:
+                break
+            r.close()
+            attempt += 1
+            if r.status_code == 429 and not static:
+                # Hold back every worker sharing the limiter, the retry then waits in the scheduler.
+                self.limiter.block(pools[-1][0], delay)
+            else:
+                time.sleep(delay)
+        try:
+            raise_status(r)
+        except Exception:
+            r.close()
+            raise
+        return r
+
+    @staticmethod
+    def _chunks(ids, n):
+        ids = list(ids)
+        return [ids[i:i + n] for i in range(0, len(ids), n)]
+
+    def _bulk_request(self, request, ids, max_ids):
+        """
+        Calls request with lists of at most max_ids of ids, concurrently, and merges the resulting dicts.
+
+        A chunk that fails with error_404 (none of its IDs were found) adds nothing to the result,
+        error_404 is only raised if every chunk failed that way.
+        """
+        chunks = self._chunks(ids, max_ids)
+        if len(chunks) <= 1:
+            return request(chunks[0] if chunks else [])
+
+        def run(chunk):
+            try:
+                return request(chunk)
+            except LoLException as e:
+                if e == error_404:
+                    return None
+                raise
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.bulk_workers)) as executor:
+            # Each chunk runs in a copy of the caller's context, so it keeps the caller's lane. The copies are
+            # taken here, in the caller's thread: copied in a worker, they would be the worker's (empty) context.
+            contexts = [contextvars.copy_context() for _ in chunks]
+            results = list(executor.map(lambda context, chunk: context.run(run, chunk), contexts, chunks))
+        return self._merge(results)
+
+    @staticmethod
+    def _merge(results):
+        merged = {}
+        found = False
+        for result in results:
+            if result is not None:
+                merged.update(result)
+                found = True
+        if not found:
+            raise error_404
+        return merged
 
     # champion-v1.2
     def _champion_request(self, end_url, region, **kwargs):
@@ -202,29 +1470,51 @@ class RiotWatcher:
         """summoner_ids and team_ids arguments must be iterable, only one should be specified, not both"""
         if (summoner_ids is None) != (team_ids is None):
             if summoner_ids is not None:
-                return self._league_request(
-                    'league/by-summoner/{summoner_ids}'.format(summoner_ids=','.join([str(s) for s in summoner_ids])),
+                return self._bulk_request(lambda ids: self._league_request(
+                    'league/by-summoner/{summoner_ids}'.format(summoner_ids=','.join([str(s) for s in ids])),
                     region
-                )
+                ), summoner_ids, max_ids['league'])
             else:
-                return self._league_request(
-                    'league/by-team/{team_ids}'.format(team_ids=','.join([str(t) for t in team_ids])),
+                return self._bulk_request(lambda ids: self._league_request(
+                    'league/by-team/{team_ids}'.format(team_ids=','.join([str(t) for t in ids])),
                     region
-                )
+                ), team_ids, max_ids['league'])
+
+    def iter_league(self, summoner_ids=None, team_ids=None, region=None):
+        """
+        Yields (summoner or team ID, league) for every league of get_league(), see stream_request().
+        IDs are requested max_ids['league'] at a time, one request after the other.
+        """
+        if (summoner_ids is None) == (team_ids is None):
+            return
+        by, ids = ('summoner', summoner_ids) if summoner_ids is not None else ('team', team_ids)
+        found = False
+        for chunk in self._chunks(ids, max_ids['league']):
+            url = 'v{version}/league/by-{by}/{ids}'.format(version=api_versions['league'], by=by,
+                                                          ids=','.join([str(i) for i in chunk]))
+            try:
+                for keys, league in self.stream_request(url, region, ('*', '*')):
+                    found = True
+                    yield keys[0], league
+            except LoLException as e:
+                if e != error_404:
+                    raise
+        if not found:
+            raise error_404
 
     def get_league_entry(self, summoner_ids=None, team_ids=None, region=None):
         """summoner_ids and team_ids arguments must be iterable, only one should be specified, not both"""
         if (summoner_ids is None) != (team_ids is None):
             if summoner_ids is not None:
-                return self._league_request(
-                    'league/by-summoner/{summoner_ids}/entry'.format(summoner_ids=','.join([str(s) for s in summoner_ids])),
+                return self._bulk_request(lambda ids: self._league_request(
+                    'league/by-summoner/{summoner_ids}/entry'.format(summoner_ids=','.join([str(s) for s in ids])),
                     region
-                )
+                ), summoner_ids, max_ids['league'])
             else:
-                return self._league_request(
-                    'league/by-team/{team_ids}/entry'.format(team_ids=','.join([str(t) for t in team_ids])),
+                return self._bulk_request(lambda ids: self._league_request(
+                    'league/by-team/{team_ids}/entry'.format(team_ids=','.join([str(t) for t in ids])),
                     region
-                )
+                ), team_ids, max_ids['league'])
 
     def get_challenger(self, region=None, queue=solo_queue):
         return self._league_request('league/challenger', region, type=queue)
@@ -249,6 +1539,22 @@ class RiotWatcher:
             champData=champ_data
         )
 
+    def _static_stream(self, end_url, path, region, **kwargs):
+        return self.stream_request('v{version}/{end_url}'.format(
+            version=api_versions['lol-static-data'],
+            end_url=end_url),
+            region,
+            path,
+            static=True,
+            **kwargs
+        )
+
+    def static_iter_champion_list(self, region=None, locale=None, version=None, data_by_id=None, champ_data=None):
+        """Yields the champions of static_get_champion_list() one by one."""
+        for keys, champion in self._static_stream('champion', ('data', '*'), region, locale=locale, version=version,
+                                                  dataById=data_by_id, champData=champ_data):
+            yield champion
+
     def static_get_champion(self, champ_id, region=None, locale=None, version=None, champ_data=None):
         return self._static_request(
             'champion/{id}'.format(id=champ_id),
@@ -261,6 +1567,12 @@ class RiotWatcher:
     def static_get_item_list(self, region=None, locale=None, version=None, item_list_data=None):
         return self._static_request('item', region, locale=locale, version=version, itemListData=item_list_data)
 
+    def static_iter_item_list(self, region=None, locale=None, version=None, item_list_data=None):
+        """Yields the items of static_get_item_list() one by one."""
+        for keys, item in self._static_stream('item', ('data', '*'), region, locale=locale, version=version,
+                                              itemListData=item_list_data):
+            yield item
+
     def static_get_item(self, item_id, region=None, locale=None, version=None, item_data=None):
         return self._static_request(
             'item/{id}'.format(id=item_id),
@@ -351,25 +1663,30 @@ class RiotWatcher:
             **kwargs
         )
 
+    # Bulk methods take any number of IDs (or names) and make one request per max_ids of them.
     def get_mastery_pages(self, summoner_ids, region=None):
-        return self._summoner_request(
-            'summoner/{summoner_ids}/masteries'.format(summoner_ids=','.join([str(s) for s in summoner_ids])),
+        return self._bulk_request(lambda ids: self._summoner_request(
+            'summoner/{summoner_ids}/masteries'.format(summoner_ids=','.join([str(s) for s in ids])),
             region
-        )
+        ), summoner_ids, max_ids['summoner'])
 
     def get_rune_pages(self, summoner_ids, region=None):
-        return self._summoner_request(
-            'summoner/{summoner_ids}/runes'.format(summoner_ids=','.join([str(s) for s in summoner_ids])),
+        return self._bulk_request(lambda ids: self._summoner_request(
+            'summoner/{summoner_ids}/runes'.format(summoner_ids=','.join([str(s) for s in ids])),
             region
-        )
+        ), summoner_ids, max_ids['summoner'])
 
     def get_summoners(self, names=None, ids=None, region=None):
         if (names is None) != (ids is None):
-            return self._summoner_request(
-                'summoner/by-name/{summoner_names}'.format(summoner_names=','.join(names)) if names is not None
-                else 'summoner/{summoner_ids}'.format(summoner_ids=','.join([str(i) for i in ids])),
+            if names is not None:
+                return self._bulk_request(lambda chunk: self._summoner_request(
+                    'summoner/by-name/{summoner_names}'.format(summoner_names=','.join(chunk)),
+                    region
+                ), names, max_ids['summoner'])
+            return self._bulk_request(lambda chunk: self._summoner_request(
+                'summoner/{summoner_ids}'.format(summoner_ids=','.join([str(i) for i in chunk])),
                 region
-            )
+            ), ids, max_ids['summoner'])
         else:
             return None
 
@@ -382,10 +1699,10 @@ class RiotWatcher:
         return None
 
     def get_summoner_name(self, summoner_ids, region=None):
-        return self._summoner_request(
-            'summoner/{summoner_ids}/name'.format(summoner_ids=','.join([str(s) for s in summoner_ids])),
+        return self._bulk_request(lambda ids: self._summoner_request(
+            'summoner/{summoner_ids}/name'.format(summoner_ids=','.join([str(s) for s in ids])),
             region
-        )
+        ), summoner_ids, max_ids['summoner'])
 
     # team-v2.3
     def _team_request(self, end_url, region, **kwargs):
@@ -400,13 +1717,16 @@ class RiotWatcher:
         return self.get_teams_for_summoners([summoner_id, ], region=region)[str(summoner_id)]
 
     def get_teams_for_summoners(self, summoner_ids, region=None):
-        return self._team_request(
-            'team/by-summoner/{summoner_id}'.format(summoner_id=','.join([str(s) for s in summoner_ids])),
+        return self._bulk_request(lambda ids: self._team_request(
+            'team/by-summoner/{summoner_id}'.format(summoner_id=','.join([str(s) for s in ids])),
             region
-        )
+        ), summoner_ids, max_ids['team'])
 
     def get_team(self, team_id, region=None):
         return self.get_teams([team_id, ], region=region)[str(team_id)]
 
     def get_teams(self, team_ids, region=None):
-        return self._team_request('team/{team_ids}'.format(team_ids=','.join(str(t) for t in team_ids)), region)
+        return self._bulk_request(lambda ids: self._team_request(
+            'team/{team_ids}'.format(team_ids=','.join(str(t) for t in ids)),
+            region
+        ), team_ids, max_ids['team'])
@@ -1,8 +1,50 @@
 
 # these tests are pretty bad, mostly to make sure no exceptions are thrown
 
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
 import time
-from .riotwatcher import RiotWatcher
+import unittest
+
+from .cache import DEFAULT_TTLS, MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from .riotwatcher import (
+    RiotWatcher,
+    RateLimit,
+    LocalRateLimiter,
+    SQLiteRateLimiter,
+    RedisRateLimiter,
+    RequestScheduler,
+    Lane,
+    RetryPolicy,
+    SingleFlight,
+    SQLiteFlightStore,
+    Telemetry,
+    SQLiteTelemetryStore,
+    RedisTelemetryStore,
+    INTERACTIVE,
+    BACKGROUND,
+    error_404,
+    error_429,
+    _iter_loaded,
+    _iter_parsed,
+    ijson)
+from .transport import (
+    CassetteStore,
+    RecordingTransport,
+    ReplayTransport,
+    StandInServer,
+    GENERATORS,
+    generate_summoners)
+
+try:
+    from .async_riotwatcher import AsyncRiotWatcher, AsyncSingleFlight, aiohttp
+except ImportError:
+    aiohttp = None
 
 key = '<ENTER-YOUR-KEY-HERE>'
 # if summoner doesnt have ranked teams, teams tests will fail
@@ -10,32 +52,28 @@ key = '<ENTER-YOUR-KEY-HERE>'
 # these are not graceful failures, so try to use a summoner that has them
 summoner_name = 'YOUR NAME HERE'
 
-w = RiotWatcher(key)
-
-
-def wait():
-    while not w.can_make_request():
-        time.sleep(1)
+# set RIOTWATCHER_RECORD to a directory to save the responses there,
+# then set RIOTWATCHER_REPLAY to it to run the tests again offline (no key needed)
+if os.environ.get('RIOTWATCHER_REPLAY'):
+    w = RiotWatcher(key, sessions=ReplayTransport(CassetteStore(os.environ['RIOTWATCHER_REPLAY'])))
+elif os.environ.get('RIOTWATCHER_RECORD'):
+    w = RiotWatcher(key, sessions=RecordingTransport(CassetteStore(os.environ['RIOTWATCHER_RECORD'])))
+else:
+    w = RiotWatcher(key)
 
 
 def champion_tests():
-    wait()
     temp = w.get_all_champions()
-    wait()
     w.get_champion(temp['champions'][0]['id'])
 
 
 def game_tests(summoner):
-    wait()
     w.get_recent_games(summoner['id'])
 
 
 def league_tests(summoner):
-    wait()
     w.get_league(summoner_ids=[summoner['id'], ])
-    wait()
     w.get_league_entry(summoner_ids=[summoner['id'], ])
-    wait()
     w.get_challenger()
 
 
@@ -55,30 +93,21 @@ def static_tests():
 
 
 def stats_tests(summoner):
-    wait()
     w.get_stat_summary(summoner['id'])
-    wait()
     w.get_ranked_stats(summoner['id'])
 
 
 def summoner_tests(summoner_name):
-    wait()
     s = w.get_summoner(name=summoner_name)
-    wait()
     w.get_summoner(id=s['id'])
-    wait()
     w.get_mastery_pages([s['id'], ])
-    wait()
     w.get_rune_pages([s['id'], ])
-    wait()
     w.get_summoner_name([s['id'], ])
     return s
 
 
 def team_tests(summoner):
-    wait()
     t = w.get_teams_for_summoner(summoner['id'])
-    wait()
     w.get_team(t[0]['fullId'])
 
 
@@ -99,6 +128,554 @@ def main():
     print('team tests passed')
     print('all tests passed, w00t. if only they were better tests...')
 
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+# Offline tests, answered by ReplayTransport: python -m unittest riotwatcher.tests
+
+def replay_watcher(generators=GENERATORS, **kwargs):
+    """A RiotWatcher answered by a ReplayTransport of generators, with room for 100 requests a second."""
+    transport = ReplayTransport(generators=generators)
+    return RiotWatcher('key', sessions=transport, limits=(RateLimit(100, 1), ), **kwargs), transport
+
+
+class TransportTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_record_and_replay(self):
+        store = CassetteStore(self.dir)
+        w = RiotWatcher('key', sessions=RecordingTransport(store, ReplayTransport(generators=GENERATORS)),
+                        limits=(RateLimit(100, 1), ))
+        recorded = w.get_summoners(ids=[1, 2])
+        self.assertEqual(len(store), 1)
+
+        transport = ReplayTransport(CassetteStore(self.dir))
+        w = RiotWatcher('other key', sessions=transport, limits=(RateLimit(100, 1), ))
+        self.assertEqual(w.get_summoners(ids=[1, 2]), recorded)
+        with self.assertRaises(type(error_404)):
+            w.get_summoners(ids=[3])
+        self.assertEqual((transport.stats()['recorded'], transport.stats()['missing']), (1, 1))
+
+    def test_stand_in_server(self):
+        server = StandInServer(ReplayTransport(generators=GENERATORS)).start()
+        self.addCleanup(server.stop)
+        w = RiotWatcher('key', base_url=server.url, limits=(RateLimit(100, 1), ))
+        self.assertEqual(w.get_summoner(id=7)['id'], 7)
+
+
+class LimiterTests:
+    """Checks shared by every rate limiter backend, mixed into a TestCase that sets self.limiter."""
+    def pools(self, allowed=4, seconds=1):
+        return [('k:na', [RateLimit(allowed, seconds)])]
+
+    def test_acquire_until_full(self):
+        pools = self.pools()
+        self.assertEqual([self.limiter.try_acquire(pools) <= 0 for _ in range(5)], [True] * 4 + [False])
+        self.assertGreater(self.limiter.wait_time(pools), 0)
+
+    def test_windows_expire(self):
+        pools = self.pools(seconds=0.2)
+        for _ in range(4):
+            self.limiter.add(pools)
+        self.assertFalse(self.limiter.can_make_request(pools))
+        time.sleep(0.25)
+        self.assertTrue(self.limiter.can_make_request(pools))
+
+    def test_share_and_requests(self):
+        pools = self.pools(allowed=10)
+        for _ in range(4):
+            self.limiter.add(pools)
+        self.assertTrue(self.limiter.can_make_request(pools, 0.8, 4))
+        self.assertFalse(self.limiter.can_make_request(pools, 0.8, 5))
+        self.assertTrue(self.limiter.can_make_request(pools, 1.0, 6))
+        self.assertFalse(self.limiter.can_make_request(pools, 0.4))
+
+    def test_block(self):
+        pools = self.pools()
+        self.limiter.block('k:na', 0.2)
+        self.assertGreater(self.limiter.try_acquire(pools), 0)
+        time.sleep(0.25)
+        self.assertLessEqual(self.limiter.try_acquire(pools), 0)
+
+    def test_family_counts_against_region(self):
+        region = ('k:na', [RateLimit(3, 1)])
+        family = ('k:na:league', [RateLimit(10, 1)])
+        for _ in range(3):
+            self.assertLessEqual(self.limiter.try_acquire([region, family]), 0)
+        self.assertGreater(self.limiter.wait_time([region]), 0)
+        self.assertGreater(self.limiter.try_acquire([region, family]), 0)
+        # A refused request isn't recorded in any window.
+        self.assertTrue(self.limiter.can_make_request([family], requests=7))
+
+
+class LocalRateLimiterTests(LimiterTests, unittest.TestCase):
+    def setUp(self):
+        self.limiter = LocalRateLimiter()
+
+
+class SQLiteRateLimiterTests(LimiterTests, unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.limiter = SQLiteRateLimiter(os.path.join(self.dir, 'limits.sqlite3'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_shared_between_limiters(self):
+        other = SQLiteRateLimiter(self.limiter.path)
+        pools = self.pools()
+        for _ in range(4):
+            other.add(pools)
+        self.assertFalse(self.limiter.can_make_request(pools))
+
+
+@unittest.skipIf(fakeredis is None, 'needs fakeredis')
+class RedisRateLimiterTests(LimiterTests, unittest.TestCase):
+    def setUp(self):
+        self.limiter = RedisRateLimiter(fakeredis.FakeStrictRedis())
+
+
+class RegionLimitTests(unittest.TestCase):
+    def test_regions_have_their_own_windows(self):
+        w = RiotWatcher('key', sessions=ReplayTransport(generators=GENERATORS), limits=(RateLimit(2, 10), ),
+                        region_limits={'kr': (RateLimit(5, 10), )})
+        for i in range(2):
+            w.get_summoner(id=i + 1)
+        self.assertFalse(w.can_make_request(region='na'))
+        self.assertTrue(w.can_make_request(region='euw', requests=2))
+        self.assertTrue(w.can_make_request(region='kr', requests=5))
+
+    def test_families(self):
+        limits, league = (RateLimit(2, 10), ), (RateLimit(1, 10), )
+        w = RiotWatcher('key', limits=limits, family_limits={'v2.4/league': league})
+        prefix = w.limit_key + ':na'
+        self.assertEqual(w._rate_pools('na', 'v2.4/league/by-summoner'),
+                         [(prefix, limits), (prefix + ':v2.4/league', league)])
+        self.assertEqual(w._rate_pools('na', 'v1.4/summoner'), [(prefix, limits)])
+
+
+class RequestSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.pools = [('k:na', [RateLimit(2, 0.3)])]
+
+    def test_waits_for_room(self):
+        scheduler = RequestScheduler(LocalRateLimiter())
+        started = time.time()
+        for _ in range(4):
+            self.assertTrue(scheduler.acquire(self.pools))
+        self.assertGreater(time.time() - started, 0.25)
+        self.assertFalse(scheduler.acquire(self.pools, timeout=0.05))
+
+    def test_first_in_first_out(self):
+        scheduler = RequestScheduler(LocalRateLimiter())
+        for _ in range(2):
+            scheduler.acquire(self.pools)
+        order = []
+
+        def acquire(i):
+            scheduler.acquire(self.pools)
+            order.append(i)
+
+        threads = []
+        for i in range(4):
+            threads.append(threading.Thread(target=acquire, args=(i, )))
+            threads[-1].start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, [0, 1, 2, 3])
+
+    def lanes(self):
+        return RequestScheduler(LocalRateLimiter(), (Lane(INTERACTIVE, reserve=0.5), Lane(BACKGROUND)))
+
+    def test_interactive_goes_first(self):
+        scheduler = self.lanes()
+        for _ in range(2):
+            self.assertTrue(scheduler.acquire(self.pools, lane=INTERACTIVE))
+        order = []
+
+        def acquire(lane):
+            scheduler.acquire(self.pools, lane=lane)
+            order.append(lane)
+
+        threads = [threading.Thread(target=acquire, args=(BACKGROUND, ))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=acquire, args=(INTERACTIVE, )))
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, [INTERACTIVE, BACKGROUND])
+
+    def test_background_share(self):
+        # The background lane may only use half of the window.
+        scheduler = self.lanes()
+        self.assertTrue(scheduler.acquire(self.pools, timeout=0, lane=BACKGROUND))
+        self.assertFalse(scheduler.acquire(self.pools, timeout=0.05, lane=BACKGROUND))
+        self.assertTrue(scheduler.acquire(self.pools, timeout=0, lane=INTERACTIVE))
+        stats = scheduler.lane_stats()
+        self.assertEqual((stats[BACKGROUND]['dispatched'], stats[BACKGROUND]['timed_out']), (1, 1))
+
+
+class RetryTests(unittest.TestCase):
+    def watcher(self, retry, **kwargs):
+        self.transport = ReplayTransport(generators=GENERATORS, retry_after=0.01, seed=1, **kwargs)
+        return RiotWatcher('key', sessions=self.transport, limits=(RateLimit(100, 1), ), retry=retry)
+
+    def test_throttled_requests_are_retried(self):
+        w = self.watcher(RetryPolicy(max_retries=10), throttle_rate=0.5)
+        for i in range(1, 11):
+            self.assertEqual(w.get_summoner(id=i)['id'], i)
+        self.assertGreater(self.transport.stats()['throttled'], 0)
+
+    def test_retries_run_out(self):
+        w = self.watcher(RetryPolicy(max_retries=2), throttle_rate=1.0)
+        with self.assertRaises(type(error_429)) as raised:
+            w.get_summoner(id=1)
+        self.assertIs(raised.exception, error_429)
+        self.assertEqual(self.transport.stats()['requests'], 3)
+
+
+class SingleFlightTests(unittest.TestCase):
+    def run_together(self, flights, calls):
+        """Starts each (fn, priority) of calls 20ms apart, returns their results."""
+        results = [None] * len(calls)
+
+        def run(i, fn, priority):
+            results[i] = flights.do('key', fn, priority)
+
+        threads = []
+        for i, (fn, priority) in enumerate(calls):
+            threads.append(threading.Thread(target=run, args=(i, fn, priority)))
+            threads[-1].start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def slow(calls, value, seconds=0.2):
+        def fn():
+            calls.append(value)
+            time.sleep(seconds)
+            return value
+        return fn
+
+    def test_followers_share_the_call(self):
+        calls = []
+        results = self.run_together(SingleFlight(), [(self.slow(calls, i), 0) for i in range(5)])
+        self.assertEqual((calls, results), ([0], [0] * 5))
+
+    def test_errors_reach_followers(self):
+        flights = SingleFlight()
+        errors = []
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError('failed')
+
+        def run():
+            try:
+                flights.do('key', fail)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 3)
+
+    def test_interactive_does_not_follow_background(self):
+        calls = []
+        results = self.run_together(SingleFlight(), [(self.slow(calls, 'background'), 1),
+                                                     (self.slow(calls, 'interactive'), 0),
+                                                     (self.slow(calls, 'later background'), 1)])
+        # Background callers may follow either flight.
+        self.assertEqual(calls, ['background', 'interactive'])
+        self.assertEqual(results[:2], ['background', 'interactive'])
+
+    def test_shared_store(self):
+        path = os.path.join(tempfile.mkdtemp(), 'flights.sqlite3')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        calls = []
+        first, second = SingleFlight(store=SQLiteFlightStore(path)), SingleFlight(store=SQLiteFlightStore(path))
+        results = [None, None]
+
+        def run(i, flights):
+            results[i] = flights.do('key', self.slow(calls, i))
+
+        threads = [threading.Thread(target=run, args=(0, first))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=run, args=(1, second)))
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((calls, results), ([0], [0, 0]))
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_ttls(self):
+        cache = ResponseCache()
+        self.assertEqual(cache.ttl('v1.4/summoner/1'), 60)
+        self.assertEqual(cache.ttl('static-data/v1.2/champion'), 6 * 60 * 60)
+        self.assertEqual(cache.ttl('static-data/v1.2/versions'), 60)
+        self.assertEqual(cache.ttl('v2.2/matchhistory/1'), 0)
+
+    def test_hits_skip_the_request(self):
+        w, transport = replay_watcher(cache=ResponseCache(MemoryCacheBackend()))
+        first = w.get_summoner(id=1)
+        self.assertEqual(w.get_summoner(id=1), first)
+        self.assertEqual(transport.stats()['requests'], 1)
+        self.assertEqual(w.cache.stats()['hits'], 1)
+        w.get_summoner(id=2)
+        self.assertEqual(transport.stats()['requests'], 2)
+
+    def test_sqlite_backend(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        backend = SQLiteCacheBackend(path)
+        backend.set('a', {'id': 1}, 0.1)
+        self.assertEqual(SQLiteCacheBackend(path).get('a'), (True, {'id': 1}))
+        time.sleep(0.15)
+        self.assertFalse(backend.get('a')[0])
+
+
+class BulkRequestTests(unittest.TestCase):
+    def test_chunks_are_merged(self):
+        w, transport = replay_watcher()
+        summoners = w.get_summoners(ids=list(range(1, 95)))
+        self.assertEqual(sorted(int(i) for i in summoners), list(range(1, 95)))
+        # 40 IDs per request.
+        self.assertEqual(transport.stats()['requests'], 3)
+
+    def test_chunks_keep_the_lane(self):
+        w, transport = replay_watcher(default_lane=BACKGROUND)
+        with w.lane(INTERACTIVE):
+            w.get_summoners(ids=list(range(1, 95)))
+        stats = w.lane_stats()
+        self.assertEqual((stats[INTERACTIVE]['dispatched'], stats[BACKGROUND]['dispatched']), (3, 0))
+
+    def test_missing_chunks(self):
+        def first_40(match, params):
+            return generate_summoners(match, params) if int(match.group('ids').split(',')[0]) <= 40 else None
+
+        w, transport = replay_watcher(((r'^v1\.4/summoner/(?P<ids>\d+(,\d+)*)$', first_40), ))
+        self.assertEqual(len(w.get_summoners(ids=list(range(1, 95)))), 40)
+        with self.assertRaises(type(error_404)) as raised:
+            w.get_summoners(ids=list(range(41, 135)))
+        self.assertIs(raised.exception, error_404)
+
+
+@unittest.skipIf(aiohttp is None, 'needs aiohttp')
+class AsyncRiotWatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.params = []
+
+        def champions(match, params):
+            self.params.append(params)
+            return {'type': 'champion', 'data': {'Annie': {'id': 1, 'key': 'Annie', 'name': 'Annie'}}}
+
+        self.transport = ReplayTransport(generators=GENERATORS + ((r'^v1\.2/champion$', champions), ))
+        self.server = StandInServer(self.transport).start()
+        self.addCleanup(self.server.stop)
+
+    def run_watcher(self, coroutine):
+        """Runs coroutine(w) with an AsyncRiotWatcher pointed at the stand-in server, returns its result."""
+        async def run():
+            async with AsyncRiotWatcher('key', base_url=self.server.url, limits=(RateLimit(100, 1), )) as w:
+                return await coroutine(w)
+        return asyncio.run(run())
+
+    def test_requests_run_together(self):
+        async def lookups(w):
+            return await asyncio.gather(w.get_summoner(id=1), w.get_summoners(ids=list(range(1, 95))))
+
+        summoner, summoners = self.run_watcher(lookups)
+        self.assertEqual(summoner['id'], 1)
+        self.assertEqual(len(summoners), 94)
+        self.assertEqual(self.transport.stats()['requests'], 4)
+
+    def test_boolean_params(self):
+        async def champions(w):
+            return await w.static_get_champion_list(data_by_id=True)
+
+        self.assertEqual(self.run_watcher(champions)['data']['Annie']['id'], 1)
+        self.assertEqual(self.params[0]['dataById'], 'true')
+
+    def test_identical_requests_are_sent_once(self):
+        async def lookups(w):
+            return await asyncio.gather(*[w.get_summoner(id=1) for _ in range(5)])
+
+        self.assertEqual([summoner['id'] for summoner in self.run_watcher(lookups)], [1] * 5)
+        self.assertEqual(self.transport.stats()['requests'], 1)
+
+
+@unittest.skipIf(aiohttp is None, 'needs aiohttp')
+class AsyncSingleFlightTests(unittest.TestCase):
+    def cancel_leader(self, flights, followers=1):
+        """Cancels a flight's leader while followers wait on it, returns how each of them ended."""
+        async def run():
+            started = asyncio.Event()
+
+            async def slow():
+                started.set()
+                await asyncio.sleep(10)
+
+            leader = asyncio.ensure_future(flights.do('key', slow))
+            await started.wait()
+            waiting = [asyncio.ensure_future(flights.do('key', slow)) for _ in range(followers)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            ends = []
+            for task in [leader] + waiting:
+                try:
+                    await asyncio.wait_for(task, 1)
+                    ends.append('done')
+                except asyncio.CancelledError:
+                    ends.append('cancelled')
+                except asyncio.TimeoutError:
+                    ends.append('hung')
+            return ends
+        return asyncio.run(run())
+
+    def test_followers_of_a_cancelled_leader(self):
+        self.assertEqual(self.cancel_leader(AsyncSingleFlight(), followers=2), ['cancelled'] * 3)
+
+    def test_cancelled_leader_releases_its_claim(self):
+        path = os.path.join(tempfile.mkdtemp(), 'flights.sqlite3')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        store = SQLiteFlightStore(path)
+        self.cancel_leader(AsyncSingleFlight(store=store), followers=0)
+        self.assertTrue(store.claim('key', 10))
+
+
+def items(match, params):
+    return {'type': 'item', 'version': '4.14.1',
+            'data': dict((str(i), {'id': i, 'name': 'Item {}'.format(i), 'gold': {'base': 12.5 * i, 'purchasable': True},
+                                   'tags': ['Boots', 'Health'][:i % 3], 'plaintext': None})
+                         for i in range(1001, 1021))}
+
+
+def leagues(match, params):
+    return dict((summoner_id, [{'name': 'League', 'queue': 'RANKED_SOLO_5x5', 'tier': 'GOLD',
+                                'entries': [{'playerOrTeamId': str(i), 'leaguePoints': i} for i in range(200)]}])
+                for summoner_id in match.group('ids').split(','))
+
+
+STREAM_GENERATORS = GENERATORS + (
+    (r'^v1\.2/item$', items),
+    (r'^v2\.4/league/by-summoner/(?P<ids>\d+(,\d+)*)$', leagues),
+)
+
+
+class StreamRequestTests(unittest.TestCase):
+    @unittest.skipIf(ijson is None, 'needs ijson')
+    def test_parsed_values_match_loaded_ones(self):
+        document = items(None, None)
+        for path in (('data', '*'), ('data', '*', 'tags'), ('data', '1002', 'gold'), ('version', ), ('missing', '*')):
+            events = ijson.parse(json.dumps(document).encode('utf-8'), use_float=True)
+            self.assertEqual(list(_iter_parsed(events, path)), list(_iter_loaded(document, path)), path)
+
+    def test_streamed_list_matches_the_whole_one(self):
+        w, transport = replay_watcher(STREAM_GENERATORS)
+        self.assertEqual(list(w.static_iter_item_list()), list(w.static_get_item_list()['data'].values()))
+
+    def test_cached_responses_are_shared(self):
+        w, transport = replay_watcher(STREAM_GENERATORS, cache=ResponseCache(MemoryCacheBackend()))
+        first = list(w.iter_league(summoner_ids=[1]))
+        self.assertEqual(list(w.iter_league(summoner_ids=[1])), first)
+        self.assertEqual(len(first[0][1]['entries']), 200)
+        self.assertEqual(transport.stats()['requests'], 1)
+
+    def test_uncached_responses_are_streamed(self):
+        ttls = ((r'^static-data/[^/]+/item$', 0), ) + DEFAULT_TTLS
+        w, transport = replay_watcher(STREAM_GENERATORS, cache=ResponseCache(MemoryCacheBackend(), ttls))
+        self.assertEqual(len(list(w.static_iter_item_list())), 20)
+        self.assertEqual(w.cache.stats()['misses'], 0)
+
+
+class TelemetryTests(unittest.TestCase):
+    def record(self, telemetry):
+        telemetry.observe('na', 'v1.4/summoner', 200, 100, 0.07)
+        telemetry.observe('na', 'v1.4/summoner', 429, 10, 3.0)
+        telemetry.observe_wait('na', 'v1.4/summoner', 0.5)
+
+    def test_counters(self):
+        telemetry = Telemetry()
+        self.record(telemetry)
+        counters = telemetry.snapshot()['na']['v1.4/summoner']
+        self.assertEqual(counters['calls'], 2)
+        self.assertEqual(counters['statuses'], {200: 1, 429: 1})
+        self.assertEqual(counters['bytes'], 110)
+        self.assertEqual(counters['latency_buckets'], [0, 1, 0, 0, 0, 0, 1, 0, 0])
+        self.assertEqual((counters['waits'], counters['wait_seconds']), (1, 0.5))
+        self.assertEqual((counters['p50'], counters['p99']), (0.1, 5.0))
+
+    def test_requests_are_recorded(self):
+        w, transport = replay_watcher()
+        w.get_summoners(ids=[1, 2])
+        w.get_summoners(ids=[3])
+        calls = sum(counters['calls'] for counters in w.telemetry_stats()['na'].values())
+        self.assertEqual(calls, 2)
+
+    def check_shared(self, make_store):
+        first, second = Telemetry(store=make_store()), Telemetry(store=make_store())
+        self.record(first)
+        self.record(second)
+        first.flush()
+        counters = second.snapshot()['na']['v1.4/summoner']
+        self.assertEqual(counters['calls'], 4)
+        self.assertEqual(counters['statuses'], {200: 2, 429: 2})
+        self.assertEqual(counters['latency_buckets'], [0, 2, 0, 0, 0, 0, 2, 0, 0])
+        self.assertEqual(counters['wait_seconds'], 1.0)
+
+    def test_sqlite_store(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'telemetry.sqlite3')
+        self.check_shared(lambda: SQLiteTelemetryStore(path))
+
+    @unittest.skipIf(fakeredis is None, 'needs fakeredis')
+    def test_redis_store(self):
+        server = fakeredis.FakeServer()
+        self.check_shared(lambda: RedisTelemetryStore(fakeredis.FakeStrictRedis(server=server)))
+
+    def test_failed_flush_keeps_counters(self):
+        class BrokenStore:
+            def add(self, series):
+                raise IOError('disk full')
+
+        telemetry = Telemetry(store=BrokenStore())
+        self.addCleanup(atexit.unregister, telemetry.flush)
+        self.record(telemetry)
+        with self.assertLogs('riotwatcher.riotwatcher', 'WARNING'):
+            telemetry._flush_quietly()
+        self.assertEqual(telemetry._series[('na', 'v1.4/summoner')]['calls'], 2)
+
+    def test_prometheus(self):
+        telemetry = Telemetry(buckets=(0.1, 1.0))
+        self.record(telemetry)
+        lines = telemetry.prometheus().splitlines()
+        labels = 'endpoint="v1.4/summoner",region="na"'
+        for line in ('# TYPE riot_api_requests_total counter',
+                     'riot_api_requests_total{{{},status="200"}} 1'.format(labels),
+                     'riot_api_requests_total{{{},status="429"}} 1'.format(labels),
+                     'riot_api_response_bytes_total{{{}}} 110'.format(labels),
+                     '# TYPE riot_api_request_duration_seconds histogram',
+                     'riot_api_request_duration_seconds_bucket{endpoint="v1.4/summoner",le="0.1",region="na"} 1',
+                     'riot_api_request_duration_seconds_bucket{endpoint="v1.4/summoner",le="1.0",region="na"} 1',
+                     'riot_api_request_duration_seconds_bucket{endpoint="v1.4/summoner",le="+Inf",region="na"} 2',
+                     'riot_api_request_duration_seconds_count{{{}}} 2'.format(labels),
+                     'riot_api_rate_limit_wait_seconds_total{{{}}} 0.5'.format(labels)):
+            self.assertIn(line, lines)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,313 @@
+"""
+Record/replay transports for RiotWatcher, and a local stand-in for the Riot API.
+
+A transport is passed as `sessions`, in place of a SessionPool. Record real responses once:
+
+    w = RiotWatcher('<your-api-key>', sessions=RecordingTransport(CassetteStore('fixtures')))
+
+then replay them without a network, optionally with latency and injected 429s:
+
+    w = RiotWatcher('offline', sessions=ReplayTransport(CassetteStore('fixtures'), latency=0.05, throttle_rate=0.1))
+
+or serve them over HTTP, e.g. to load test several processes (or AsyncRiotWatcher) at once:
+
+    server = StandInServer(ReplayTransport(CassetteStore('fixtures'), generators=GENERATORS))
+    server.start()
+    w = RiotWatcher('offline', base_url=server.url)
+
+The stand-in server can also be run on its own: python -m riotwatcher.transport fixtures --port 8001
+"""
+
+import argparse
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import requests
+
+from .riotwatcher import SessionPool
+
+
+def _cassette_key(url, params):
+    """Identifies a request by path and parameters, so the same request matches on any host and with any API key."""
+    path = unquote(urlsplit(url).path)
+    params = '&'.join('{}={}'.format(k, params[k]) for k in sorted(params or {}) if k != 'api_key')
+    return '{}?{}'.format(path, params)
+
+
+class CassetteStore:
+    """Recorded responses, one gzipped JSON file per request in a directory."""
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json.gz')
+
+    def get(self, url, params):
+        """Returns the recorded (status_code, headers, content) of a request, or None."""
+        try:
+            with gzip.open(self._file(_cassette_key(url, params)), 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        return entry['status_code'], entry['headers'], entry['content'].encode('utf-8')
+
+    def put(self, url, params, status_code, headers, content):
+        key = _cassette_key(url, params)
+        entry = {
+            'request': key,
+            'status_code': status_code,
+            'headers': {'Content-Type': headers.get('Content-Type', 'application/json;charset=utf-8')},
+            'content': content.decode('utf-8'),
+        }
+        # Written to a temporary file first, so concurrent readers never see half an entry.
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            f.write(json.dumps(entry).encode('utf-8'))
+        os.replace(tmp, self._file(key))
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.path) if name.endswith('.json.gz'))
+
+
+class FixtureResponse:
+    """The parts of a requests.Response that RiotWatcher uses."""
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError('{} Error for url: {}'.format(self.status_code, self.url), response=self)
+
+
+class _RecordingSession:
+    def __init__(self, store, session):
+        self.store = store
+        self.session = session
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        # Always read the whole body, it is saved before the caller reads it.
+        r = self.session.get(url, params=params, timeout=timeout)
+        # Throttling and outages are not part of the fixture, ReplayTransport injects those itself.
+        if r.status_code not in (429, 500, 503):
+            self.store.put(url, params, r.status_code, r.headers, r.content)
+        return r
+
+
+class RecordingTransport:
+    """Sends requests through a SessionPool and saves every response to a CassetteStore."""
+    def __init__(self, store, sessions=None):
+        self.store = store
+        self.sessions = sessions if sessions is not None else SessionPool()
+        self.timeout = self.sessions.timeout
+
+    def get(self, host):
+        return _RecordingSession(self.store, self.sessions.get(host))
+
+    def close(self):
+        self.sessions.close()
+
+
+def _summoner(summoner_id, name=None):
+    return {
+        'id': summoner_id,
+        'name': name if name is not None else 'Summoner{}'.format(summoner_id),
+        'profileIconId': summoner_id % 28,
+        'revisionDate': 1400000000000 + summoner_id,
+        'summonerLevel': 30,
+    }
+
+
+def generate_summoners(match, params):
+    return dict((str(i), _summoner(int(i))) for i in match.group('ids').split(','))
+
+
+def generate_summoners_by_name(match, params):
+    summoners = {}
+    for name in match.group('names').split(','):
+        std_name = name.replace(' ', '').lower()
+        summoners[std_name] = _summoner(int(hashlib.sha1(std_name.encode('utf-8')).hexdigest()[:7], 16), name)
+    return summoners
+
+
+# (path pattern, function) pairs that answer requests no cassette has. Patterns are matched against the path
+# after /api/lol/{region}/, functions get the match and query parameters and return the response body
+# (or None for a 404).
+GENERATORS = (
+    (r'^v1\.4/summoner/(?P<ids>\d+(,\d+)*)$', generate_summoners),
+    (r'^v1\.4/summoner/by-name/(?P<names>[^/]+)$', generate_summoners_by_name),
+)
+
+
+class _ReplaySession:
+    def __init__(self, transport):
+        self.transport = transport
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        return self.transport.respond(url, params)
+
+
+class ReplayTransport:
+    """Answers requests from a CassetteStore (or generators), without a network.
+
+    Each response is delayed by latency plus up to jitter seconds, and a throttle_rate fraction of them
+    are answered with a 429 and a Retry-After of retry_after seconds instead.
+    Requests that are neither recorded nor generated get a 404.
+    """
+    timeout = None
+
+    def __init__(self, store=None, generators=(), latency=0.0, jitter=0.0, throttle_rate=0.0, retry_after=1,
+                 seed=None):
+        self.store = store
+        self.generators = [(re.compile(pattern), fn) for pattern, fn in generators]
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._stats = {'requests': 0, 'recorded': 0, 'generated': 0, 'missing': 0, 'throttled': 0}
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        return _ReplaySession(self)
+
+    def close(self):
+        pass
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats[counter] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _generate(self, url, params):
+        path = re.sub(r'^/api/lol/(static-data/)?[a-z]+/', '', unquote(urlsplit(url).path))
+        for pattern, fn in self.generators:
+            match = pattern.match(path)
+            if match:
+                return fn(match, params)
+        return None
+
+    def respond(self, url, params):
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            throttled = self._random.random() < self.throttle_rate
+        if delay > 0:
+            time.sleep(delay)
+        if throttled:
+            self._count('throttled')
+            return FixtureResponse(url, 429, {'Retry-After': str(self.retry_after)}, b'')
+        recorded = self.store.get(url, params) if self.store is not None else None
+        if recorded is not None:
+            self._count('recorded')
+            return FixtureResponse(url, *recorded)
+        body = self._generate(url, params)
+        if body is not None:
+            self._count('generated')
+            return FixtureResponse(url, 200, {'Content-Type': 'application/json;charset=utf-8'},
+                                   json.dumps(body).encode('utf-8'))
+        self._count('missing')
+        return FixtureResponse(url, 404, {}, b'')
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        r = self.server.transport.respond(self.path, dict(parse_qsl(parts.query)))
+        self.send_response(r.status_code)
+        for header, value in r.headers.items():
+            self.send_header(header, value)
+        self.send_header('Content-Length', str(len(r.content)))
+        self.end_headers()
+        self.wfile.write(r.content)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StandInServer:
+    """A local HTTP server implementing the /api/lol/{region}/... routes with a ReplayTransport.
+
+    Point RiotWatcher at it with base_url=server.url. port=0 picks a free port.
+    """
+    def __init__(self, transport, host='127.0.0.1', port=0, verbose=False):
+        self.httpd = ThreadingHTTPServer((host, port), _StandInHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.transport = transport
+        self.httpd.verbose = verbose
+        self.transport = transport
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded Riot API responses locally.')
+    parser.add_argument('cassettes', help='CassetteStore directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--no-generators', action='store_true', help='404 on requests that were not recorded')
+    args = parser.parse_args()
+
+    transport = ReplayTransport(CassetteStore(args.cassettes), generators=() if args.no_generators else GENERATORS,
+                                latency=args.latency, jitter=args.jitter, throttle_rate=args.throttle_rate)
+    server = StandInServer(transport, host=args.host, port=args.port, verbose=True)
+    print('serving {} recorded responses on {}'.format(len(transport.store), server.url))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(transport.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@ setup(name='lol_stats',
       description='A Django project to collect and analyze data for League of Legends.',
       long_description=README,
       url='https://bitbucket.org/kreychek/lol_stats',
+      python_requires='>=3.7',
       author='Edward Chen',
       author_email='chenward.t@gmail.com',
       install_requires=[
@@ -24,13 +25,19 @@ setup(name='lol_stats',
           'psycopg2',
           'django-cors-headers',
       ],
+      extras_require={
+          # riotwatcher decodes responses with orjson and streams large uncached ones with ijson when installed.
+          'speedups': ['orjson', 'ijson'],
+      },
       classifiers=[
           'Environment :: Web Environment',
           'Framework :: Django',
+          'Framework :: Django :: 1.11',
           'Intended Audience :: Developers',
           'Operating System :: OS Independent',
           'Programming Language :: Python',
-          'Programming Language :: Python :: 2.7',
+          'Programming Language :: Python :: 3',
+          'Programming Language :: Python :: 3.7',
           'Topic :: Internet :: WWW/HTTP',
           'Topic :: Internet :: WWW/HTTP :: Dynamic Content',
       ],
@@ -1,6 +1,8 @@
-from django.conf.urls import url, patterns
+from django.conf.urls import url
 
-urlpatterns = patterns('summoner',
+from summoner import views
+
+urlpatterns = [
     # These regex are not robust.
     # This requires a string after summoner_info/ (consider pointing to blank search page when no arg)
     # url(r'^info/(?P<summoner_name>\w+( \w+)*$)', 'views.summoner_info', name='summoner_info'),
@@ -8,6 +10,6 @@ urlpatterns = patterns('summoner',
     # url(r'^ajax_summoner_info/', 'views.ajax_summoner_info', name='ajax_summoner_info'),
     # url(r'^recent/(?P<summoner_name>\w+( \w+)*$)', 'views.recent_games', name='recent_games'),
     # url(r'^do_task$', 'views.ajax_query_start', name='do_task'),
-    url(r'^ajax_query_start$', 'views.ajax_query_start', name='ajax_query_start'),
+    url(r'^ajax_query_start$', views.ajax_query_start, name='ajax_query_start'),
     # url(r'^sum_info$', 'views.summoner_info', name='base_summoner_info'),
-)
\ No newline at end of file
+]
\ No newline at end of file